@@ -1,5 +1,6 @@
 from .cmake import CMakeProject
+from .cmake_cache import CMakeCacheFile
 from .errors import CMakeException
 from .kinds.kind import ObjectKind
 
-__all__ = ["CMakeProject", "CMakeException", "ObjectKind"]
+__all__ = ["CMakeProject", "CMakeCacheFile", "CMakeException", "ObjectKind"]
@@ -1,15 +1,17 @@
+import asyncio
 from pathlib import Path
 import subprocess
-from typing import Optional, Union
+from typing import Callable, Optional
 
+from .cmake_cache import CMakeCacheFile, PathLike
 from .reply.api import REPLY_API
 from .reply.v1.api import CMakeFileApiV1
 
-PathLike = Union[Path, str]
+OutputCallback = Callable[[str], None]
 
 
 class CMakeProject:
-    __slots__ = ("_source_path", "_build_path", "_api_version", "_cmake")
+    __slots__ = ("_source_path", "_build_path", "_api_version", "_cmake", "_cmake_file_api", "_cache", "_cache_stamp")
 
     def __init__(self, build_path: PathLike, source_path: Optional[PathLike]=None, api_version: Optional[int]=None, cmake: Optional[str]=None):
         if not build_path:
@@ -17,21 +19,24 @@ class CMakeProject:
         if isinstance(build_path, str):
             build_path = Path(build_path).resolve()
         self._build_path = build_path
+        self._cache: Optional[CMakeCacheFile] = None
+        self._cache_stamp: Optional[tuple[int, int]] = None
 
-        cache = self.build_path / "CMakeCache.txt"
+        cache = self.cache
 
-        if source_path is None and cache.exists():
-            source_path = self._cache_lookup("CMAKE_HOME_DIRECTORY", cache)
+        if source_path is None and cache is not None:
+            source_path = cache.get("CMAKE_HOME_DIRECTORY")
         if isinstance(source_path, str):
             source_path = Path(source_path).resolve()
         self._source_path = source_path.resolve() if source_path else None
 
         self._api_version = api_version if api_version is not None else self.most_recent_api_version()
 
-        if cmake is None and cache.exists():
-            cmake = self._cache_lookup("CMAKE_COMMAND", cache)
+        if cmake is None and cache is not None:
+            cmake = cache.get("CMAKE_COMMAND")
 
         self._cmake = cmake or "cmake"
+        self._cmake_file_api: Optional[CMakeFileApiV1] = None
 
     @property
     def source_path(self) -> Optional[Path]:
@@ -45,35 +50,85 @@ class CMakeProject:
     def most_recent_api_version() -> int:
         return max(list(REPLY_API.keys()))
 
-    @staticmethod
-    def _cache_lookup(name: str, cache: PathLike) -> str:
-        # Cache entries are formatted like:
-        # <variable>:<type>=<value>
-        with open(cache) as f:
-            line = next(
-                line
-                for line in f.read().splitlines()
-                if line.startswith(name + ":")
-            )
-        _, value = line.split("=", 1)
-        return value
-
-    def configure(self, args: Optional[list[str]]=None, quiet: bool = False) -> None:
+    @property
+    def cache(self) -> Optional[CMakeCacheFile]:
+        # Parsed once, and again only after cmake rewrote CMakeCache.txt
+        cache_path = self._build_path / "CMakeCache.txt"
+        try:
+            stat = cache_path.stat()
+        except FileNotFoundError:
+            self._cache = self._cache_stamp = None
+            return None
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if self._cache is None or stamp != self._cache_stamp:
+            self._cache = CMakeCacheFile.from_path(cache_path)
+            self._cache_stamp = stamp
+        return self._cache
+
+    def _configure_args(self, args: Optional[list[str]]) -> list[str]:
         if self._source_path is None:
             raise ValueError("Cannot configure with no source path")
-        stdout = subprocess.DEVNULL if quiet else None
-        args = [str(self._cmake), str(self._source_path)] + (args if args else [])
-        subprocess.check_call(args, cwd=str(self._build_path), stdout=stdout)
+        return [str(self._cmake), str(self._source_path)] + (args if args else [])
 
-    def reconfigure(self, quiet: bool = False) -> None:
-        stdout = subprocess.DEVNULL if quiet else None
+    def _reconfigure_args(self) -> list[str]:
         args = [str(self._cmake)]
         if self._source_path:
             args.append(str(self._source_path))
         else:
             args.append(".")
-        subprocess.check_call(args, cwd=str(self._build_path), stdout=stdout)
+        return args
+
+    def configure(self, args: Optional[list[str]]=None, quiet: bool = False) -> None:
+        stdout = subprocess.DEVNULL if quiet else None
+        subprocess.check_call(self._configure_args(args), cwd=str(self._build_path), stdout=stdout)
+
+    def reconfigure(self, quiet: bool = False) -> None:
+        stdout = subprocess.DEVNULL if quiet else None
+        subprocess.check_call(self._reconfigure_args(), cwd=str(self._build_path), stdout=stdout)
+
+    @staticmethod
+    async def _forward_lines(stream: Optional[asyncio.StreamReader], callback: OutputCallback) -> None:
+        assert stream is not None
+        while True:
+            line = await stream.readline()
+            if not line:
+                break
+            callback(line.decode(errors="replace").rstrip("\r\n"))
+
+    async def _run_async(self, args: list[str], quiet: bool, on_stdout: Optional[OutputCallback], on_stderr: Optional[OutputCallback]) -> None:
+        stdout: Optional[int] = subprocess.DEVNULL if quiet else None
+        if on_stdout is not None and not quiet:
+            stdout = asyncio.subprocess.PIPE
+        stderr = asyncio.subprocess.PIPE if on_stderr is not None else None
+        process = await asyncio.create_subprocess_exec(*args, cwd=str(self._build_path), stdout=stdout, stderr=stderr)
+        try:
+            forwarders = []
+            if stdout == asyncio.subprocess.PIPE:
+                assert on_stdout is not None
+                forwarders.append(self._forward_lines(process.stdout, on_stdout))
+            if on_stderr is not None:
+                forwarders.append(self._forward_lines(process.stderr, on_stderr))
+            await asyncio.gather(*forwarders)
+            returncode = await process.wait()
+        except BaseException:
+            # Cancelled: do not leave a cmake process behind
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+            raise
+        if returncode:
+            raise subprocess.CalledProcessError(returncode, args)
+
+    async def configure_async(self, args: Optional[list[str]]=None, quiet: bool = False,
+                              on_stdout: Optional[OutputCallback] = None, on_stderr: Optional[OutputCallback] = None) -> None:
+        await self._run_async(self._configure_args(args), quiet, on_stdout, on_stderr)
+
+    async def reconfigure_async(self, quiet: bool = False,
+                                on_stdout: Optional[OutputCallback] = None, on_stderr: Optional[OutputCallback] = None) -> None:
+        await self._run_async(self._reconfigure_args(), quiet, on_stdout, on_stderr)
 
     @property
     def cmake_file_api(self) -> CMakeFileApiV1:
-        return REPLY_API[self._api_version](self._build_path)
+        if self._cmake_file_api is None:
+            self._cmake_file_api = REPLY_API[self._api_version](self._build_path)
+        return self._cmake_file_api
@@ -0,0 +1,103 @@
+from pathlib import Path
+import re
+from typing import Iterator, Optional, Union
+
+from .kinds.cache.v2 import CacheEntryType
+
+PathLike = Union[Path, str]
+
+
+class CMakeCacheFileEntry:
+    __slots__ = ("name", "type", "value")
+
+    def __init__(self, name: str, type: CacheEntryType, value: str):
+        self.name = name
+        self.type = type
+        self.value = value
+
+    def __repr__(self) -> str:
+        return "{}(name='{}', type={}, value='{}')".format(
+            type(self).__name__,
+            self.name,
+            self.type.name,
+            self.value,
+        )
+
+
+class CMakeCacheFile:
+    __slots__ = ("path", "entries")
+
+    # Same grammar as cmake's cmCacheManager::ParseEntry: <name>:<type>=<value> or <name>=<value>,
+    # where names may be double-quoted and values single-quoted to preserve surrounding whitespace.
+    TYPED_ENTRY_RE = re.compile(r'^("[^"]*"|[^"=:]*):([^=]*)=(.*[^\r\t ]|[\r\t ]*)[\r\t ]*$')
+    UNTYPED_ENTRY_RE = re.compile(r'^("[^"]*"|[^"=]*)=(.*[^\r\t ]|[\r\t ]*)[\r\t ]*$')
+
+    def __init__(self, path: Path, entries: dict[str, CMakeCacheFileEntry]):
+        self.path = path
+        self.entries = entries
+
+    @staticmethod
+    def _unquote(text: str, quote: str) -> str:
+        if len(text) >= 2 and text[0] == quote and text[-1] == quote:
+            return text[1:-1]
+        return text
+
+    @classmethod
+    def _entry_type(cls, text: str) -> CacheEntryType:
+        try:
+            return CacheEntryType(text)
+        except ValueError:
+            return CacheEntryType.TYPE_UNINITIALIZED
+
+    @classmethod
+    def from_text(cls, path: Path, text: str) -> "CMakeCacheFile":
+        entries: dict[str, CMakeCacheFileEntry] = {}
+        last_entry: Optional[CMakeCacheFileEntry] = None
+        for line in text.splitlines():
+            stripped = line.lstrip()
+            if not stripped or stripped.startswith("#") or stripped.startswith("//"):
+                last_entry = None
+                continue
+            # cmake skips the indentation of entries too
+            typed_match = cls.TYPED_ENTRY_RE.match(stripped)
+            if typed_match:
+                name, entry_type, value = typed_match.group(1), cls._entry_type(typed_match.group(2)), typed_match.group(3)
+            else:
+                untyped_match = cls.UNTYPED_ENTRY_RE.match(stripped)
+                if not untyped_match:
+                    if last_entry is not None:
+                        # Continuation of a value spanning multiple lines (hand-edited or written by other tools)
+                        last_entry.value += "\n" + line
+                    continue
+                name, entry_type, value = untyped_match.group(1), CacheEntryType.TYPE_UNINITIALIZED, untyped_match.group(2)
+            name = cls._unquote(name, '"')
+            last_entry = entries[name] = CMakeCacheFileEntry(name, entry_type, cls._unquote(value, "'"))
+        return cls(path, entries)
+
+    @classmethod
+    def from_path(cls, path: PathLike) -> "CMakeCacheFile":
+        path = Path(path)
+        return cls.from_text(path, path.read_text(errors="replace"))
+
+    def get(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        entry = self.entries.get(name)
+        return entry.value if entry is not None else default
+
+    def __getitem__(self, name: str) -> str:
+        return self.entries[name].value
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.entries
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.entries)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __repr__(self) -> str:
+        return "{}(path='{}', #entries={})".format(
+            type(self).__name__,
+            self.path,
+            len(self.entries),
+        )
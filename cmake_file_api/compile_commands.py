@@ -0,0 +1,137 @@
+from __future__ import annotations
+import json
+import os
+from pathlib import Path
+import shlex
+import subprocess
+from typing import Any, Iterator, Optional, TextIO, Union
+
+from .kinds.codemodel.target.v2 import TargetCompileSettings
+from .kinds.codemodel.v2 import CodemodelV2
+from .kinds.toolchains.v1 import ToolchainsV1
+
+PathLike = Union[Path, str]
+
+# Compiler used for a language when no toolchains reply is given
+DEFAULT_COMPILERS = {
+    "C": "cc",
+    "CXX": "c++",
+    "CUDA": "nvcc",
+    "Fortran": "gfortran",
+    "OBJC": "cc",
+    "OBJCXX": "c++",
+}
+
+MSVC_COMPILER_IDS = {"MSVC"}
+MSVC_COMPILER_NAMES = {"cl", "clang-cl"}
+
+
+class CompileCommandsGenerator:
+    __slots__ = ("codemodel", "configuration", "toolchains", "use_command", "_compilers", "_arguments", "_commands")
+
+    def __init__(self, codemodel: CodemodelV2, configuration: str, toolchains: Optional[ToolchainsV1] = None,
+                 use_command: bool = False):
+        self.codemodel = codemodel
+        self.configuration = codemodel.get_configuration(configuration)
+        self.toolchains = toolchains
+        # Emit a shell "command" string instead of an "arguments" list
+        self.use_command = use_command
+        self._compilers: dict[str, tuple[str, bool]] = {}
+        # Command prefixes only depend on the compile settings, which are shared by equal compile groups
+        self._arguments: dict[TargetCompileSettings, list[str]] = {}
+        self._commands: dict[TargetCompileSettings, str] = {}
+
+    def _compiler(self, language: str) -> tuple[str, bool]:
+        # Compiler path and whether it takes MSVC style (/I, /D) flags
+        try:
+            return self._compilers[language]
+        except KeyError:
+            pass
+        compiler_path = DEFAULT_COMPILERS.get(language, language.lower())
+        msvc = False
+        if self.toolchains is not None:
+            for toolchain in self.toolchains.toolchains:
+                if toolchain.language != language:
+                    continue
+                if toolchain.compiler.path is not None:
+                    compiler_path = str(toolchain.compiler.path)
+                msvc = toolchain.compiler.id in MSVC_COMPILER_IDS
+                break
+        msvc = msvc or Path(compiler_path).stem.lower() in MSVC_COMPILER_NAMES
+        compiler = self._compilers[language] = compiler_path, msvc
+        return compiler
+
+    def _settings_arguments(self, settings: TargetCompileSettings) -> list[str]:
+        try:
+            return self._arguments[settings]
+        except KeyError:
+            pass
+        compiler, msvc = self._compiler(settings.language)
+        arguments = [compiler]
+        include_flag, system_include_flag, define_flag = ("/I", "/I", "/D") if msvc else ("-I", "-isystem", "-D")
+        for define in settings.defines:
+            arguments.append(define_flag + define)
+        for path, isSystem in settings.includes:
+            if isSystem and not msvc:
+                arguments.extend((system_include_flag, str(path)))
+            else:
+                arguments.append(include_flag + str(path))
+        if settings.sysroot is not None and not msvc:
+            arguments.append(f"--sysroot={settings.sysroot}")
+        # Fragments are shell quoted by CMake, they already include the language standard flags
+        for fragment in settings.compileCommandFragments:
+            arguments.extend(shlex.split(fragment, posix=not msvc))
+        arguments.append("/c" if msvc else "-c")
+        self._arguments[settings] = arguments
+        return arguments
+
+    def _settings_command(self, settings: TargetCompileSettings) -> str:
+        try:
+            return self._commands[settings]
+        except KeyError:
+            command = self._commands[settings] = self._join(self._settings_arguments(settings), self._compiler(settings.language)[1])
+            return command
+
+    @staticmethod
+    def _join(arguments: list[str], msvc: bool) -> str:
+        return subprocess.list2cmdline(arguments) if msvc else shlex.join(arguments)
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        source_root = os.fspath(self.codemodel.paths.source)
+        build_root = os.fspath(self.codemodel.paths.build)
+        for cmake_target in self.configuration.targets:
+            target = cmake_target.target
+            directory = os.path.normpath(os.path.join(build_root, target.paths.build))
+            for source in target.sources:
+                group = source.compileGroup
+                if group is None:
+                    continue
+                file = os.path.normpath(os.path.join(source_root, source.path))
+                if not self.use_command:
+                    yield {"directory": directory, "arguments": self._settings_arguments(group.settings) + [file], "file": file}
+                    continue
+                msvc = self._compiler(group.language)[1]
+                command = "{} {}".format(self._settings_command(group.settings), self._join([file], msvc))
+                yield {"directory": directory, "command": command, "file": file}
+
+    def dump(self, fp: TextIO) -> int:
+        # Entries are written as they are generated, the database is never held in memory
+        count = 0
+        fp.write("[")
+        for entry in self:
+            fp.write(",\n" if count else "\n")
+            fp.write(json.dumps(entry, indent=2))
+            count += 1
+        fp.write("\n]\n")
+        return count
+
+    def write(self, path: PathLike) -> int:
+        with open(path, "w", encoding="utf-8") as fp:
+            return self.dump(fp)
+
+    def __repr__(self) -> str:
+        return "{}(configuration='{}', use_command={})".format(
+            type(self).__name__,
+            self.configuration.name,
+            self.use_command,
+        )
@@ -1,2 +1,6 @@
 class CMakeException(Exception):
     pass
+
+
+class FieldNotLoadedError(CMakeException, AttributeError):
+    pass
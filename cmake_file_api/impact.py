@@ -0,0 +1,95 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+from .kinds.cmakeFiles.v1 import CMakeFilesInput, CMakeFilesV1
+from .kinds.codemodel.graph import TargetDependencyGraph
+from .kinds.codemodel.sources import SourceOwner, SourceOwnershipIndex, normalize_source_path
+from .kinds.codemodel.v2 import CMakeTarget, CodemodelV2
+
+PathLike = Union[Path, str]
+
+
+class ChangeImpact:
+    __slots__ = ("reconfigure_required", "cmake_inputs", "sources", "owners", "targets", "unknown")
+
+    def __init__(self, reconfigure_required: bool, cmake_inputs: list[CMakeFilesInput], sources: list[SourceOwner],
+                 owners: list[CMakeTarget], targets: list[CMakeTarget], unknown: list[str]):
+        # Changed CMakeLists.txt/.cmake files: the codemodel (and so the targets below) may be outdated
+        self.reconfigure_required = reconfigure_required
+        self.cmake_inputs = cmake_inputs
+        self.sources = sources
+        # Targets owning a changed source, and those plus everything depending on them
+        self.owners = owners
+        self.targets = targets
+        # Changed paths that are neither a target source nor a cmake input (e.g. unlisted headers)
+        self.unknown = unknown
+
+    def __repr__(self) -> str:
+        return "{}(reconfigure_required={}, #cmake_inputs={}, #sources={}, #owners={}, #targets={}, #unknown={})".format(
+            type(self).__name__,
+            self.reconfigure_required,
+            len(self.cmake_inputs),
+            len(self.sources),
+            len(self.owners),
+            len(self.targets),
+            len(self.unknown),
+        )
+
+
+class ImpactAnalysis:
+    __slots__ = ("source_index", "graph", "_lut_path_cmake_input")
+
+    def __init__(self, source_index: SourceOwnershipIndex, graph: TargetDependencyGraph,
+                 cmake_inputs: dict[str, CMakeFilesInput]):
+        self.source_index = source_index
+        self.graph = graph
+        self._lut_path_cmake_input = cmake_inputs
+
+    @classmethod
+    def from_codemodel(cls, codemodel: CodemodelV2, configuration: str,
+                       cmake_files: Optional[CMakeFilesV1] = None) -> ImpactAnalysis:
+        source_index = codemodel.get_source_index(configuration)
+        graph = codemodel.get_configuration(configuration).get_dependency_graph()
+        cmake_inputs: dict[str, CMakeFilesInput] = {}
+        if cmake_files is not None:
+            for cmake_input in cmake_files.inputs:
+                cmake_inputs[normalize_source_path(cmake_input.path, cmake_files.paths.source)] = cmake_input
+        return cls(source_index, graph, cmake_inputs)
+
+    def analyze(self, changed: Iterable[PathLike]) -> ChangeImpact:
+        # Relative paths are relative to the top level source directory.
+        # Everything is keyed by normalized path strings: one dict lookup per changed path.
+        source_root = self.source_index.source_root
+        lut_path_owners = self.source_index.owners
+        lut_path_cmake_input = self._lut_path_cmake_input
+        cmake_inputs: list[CMakeFilesInput] = []
+        sources: list[SourceOwner] = []
+        unknown: list[str] = []
+        seen: set[str] = set()
+        for path in changed:
+            key = normalize_source_path(path, source_root)
+            if key in seen:
+                continue
+            seen.add(key)
+            path_owners = lut_path_owners.get(key)
+            if path_owners is not None:
+                sources.extend(path_owners)
+                continue
+            cmake_input = lut_path_cmake_input.get(key)
+            if cmake_input is not None:
+                cmake_inputs.append(cmake_input)
+                continue
+            unknown.append(key)
+
+        owners = list({id(owner.target): owner.target for owner in sources}.values())
+        targets = self.graph.transitive_dependents_of(owners)
+        return ChangeImpact(bool(cmake_inputs), cmake_inputs, sources, owners, targets, unknown)
+
+    def __repr__(self) -> str:
+        return "{}(#sources={}, #targets={}, #cmake_inputs={})".format(
+            type(self).__name__,
+            len(self.source_index),
+            len(self.graph.targets),
+            len(self._lut_path_cmake_input),
+        )
@@ -0,0 +1,45 @@
+import json
+from pathlib import Path
+from typing import Any, Callable
+
+
+JsonDecoder = Callable[[bytes], Any]
+
+JSON_DECODERS: dict[str, JsonDecoder] = {}
+
+try:
+    import orjson
+    JSON_DECODERS["orjson"] = orjson.loads
+except ImportError:
+    pass
+
+try:
+    import msgspec
+
+    def _msgspec_loads(data: bytes) -> Any:
+        # Report invalid documents like the other backends do, orjson.JSONDecodeError also subclasses it
+        try:
+            return msgspec.json.decode(data)
+        except msgspec.DecodeError as e:
+            raise json.JSONDecodeError(str(e), "", 0) from e
+
+    JSON_DECODERS["msgspec"] = _msgspec_loads
+except ImportError:
+    pass
+
+JSON_DECODERS["json"] = json.loads
+
+# The first available decoder is the fastest one
+JSON_BACKEND = next(iter(JSON_DECODERS))
+
+
+def loads_json(data: bytes, backend: str = JSON_BACKEND) -> Any:
+    try:
+        decoder = JSON_DECODERS[backend]
+    except KeyError:
+        raise ValueError(f"Unknown or unavailable JSON backend '{backend}'")
+    return decoder(data)
+
+
+def load_json(path: Path, backend: str = JSON_BACKEND) -> Any:
+    return loads_json(path.read_bytes(), backend)
@@ -1,9 +1,9 @@
 import dataclasses
 from enum import Enum
-import json
 from pathlib import Path
 from typing import Any
 
+from cmake_file_api.json_decode import load_json
 from cmake_file_api.kinds.common import VersionMajorMinor
 from cmake_file_api.kinds.kind import ObjectKind
 
@@ -62,8 +62,7 @@ class CacheV2:
 
     @classmethod
     def from_path(cls, path: Path, reply_path: Path) -> "CacheV2":
-        with path.open() as file:
-            dikt = json.load(file)
+        dikt = load_json(path)
         return cls.from_dict(dikt, reply_path)
 
     def __repr__(self) -> str:
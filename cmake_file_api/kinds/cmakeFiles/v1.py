@@ -1,7 +1,8 @@
-import json
+import os
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Iterator, Optional
 
+from cmake_file_api.json_decode import load_json
 from cmake_file_api.kinds.common import CMakeSourceBuildPaths, VersionMajorMinor
 from cmake_file_api.kinds.kind import ObjectKind
 
@@ -20,7 +21,7 @@ class CMakeFilesInput:
         path = Path(dikt["path"])
         isGenerator = dikt.get("isGenerator")
         isExternal = dikt.get("isExternal")
-        isCMake = dikt.get("isExternal")
+        isCMake = dikt.get("isCMake")
         return cls(path, isGenerator, isExternal, isCMake)
 
     def __repr__(self) -> str:
@@ -52,10 +53,54 @@ class CMakeFilesV1:
 
     @classmethod
     def from_path(cls, path: Path, reply_path: Path) -> "CMakeFilesV1":
-        with path.open() as file:
-            dikt = json.load(file)
+        dikt = load_json(path)
         return cls.from_dict(dikt, reply_path)
 
+    def _input_paths(self, skip_cmake: bool, skip_external: bool) -> dict[str, list[CMakeFilesInput]]:
+        # Absolute input paths, grouped by directory
+        source = os.fspath(self.paths.source)
+        directories: dict[str, list[CMakeFilesInput]] = {}
+        for input in self.inputs:
+            if (skip_cmake and input.isCMake) or (skip_external and input.isExternal):
+                continue
+            path = os.path.join(source, input.path)
+            directories.setdefault(os.path.dirname(path), []).append(input)
+        return directories
+
+    def _changed_inputs(self, mtime_ns: int, skip_cmake: bool, skip_external: bool) -> Iterator[CMakeFilesInput]:
+        source = os.fspath(self.paths.source)
+        for directory, inputs in self._input_paths(skip_cmake, skip_external).items():
+            if os.name == "nt":
+                # The entries of a directory listing come with their stat results on Windows: one call per directory
+                try:
+                    with os.scandir(directory) as it:
+                        lut_name_mtime = {entry.name: entry.stat().st_mtime_ns for entry in it}
+                except OSError:
+                    lut_name_mtime = {}
+                for input in inputs:
+                    input_mtime = lut_name_mtime.get(os.path.basename(input.path))
+                    if input_mtime is None or input_mtime > mtime_ns:
+                        yield input
+                continue
+            # Elsewhere listing a directory does not save any stat calls
+            for input in inputs:
+                try:
+                    input_mtime = os.stat(os.path.join(source, input.path)).st_mtime_ns
+                except OSError:
+                    # Removed inputs need a reconfigure too
+                    yield input
+                    continue
+                if input_mtime > mtime_ns:
+                    yield input
+
+    def changed_inputs(self, mtime_ns: int, skip_cmake: bool = False, skip_external: bool = False) -> list[CMakeFilesInput]:
+        # Inputs modified after mtime_ns (e.g. of the reply index file), or removed
+        return list(self._changed_inputs(mtime_ns, skip_cmake, skip_external))
+
+    def needs_reconfigure(self, mtime_ns: int, skip_cmake: bool = False, skip_external: bool = False) -> bool:
+        # Stops at the first changed input
+        return next(self._changed_inputs(mtime_ns, skip_cmake, skip_external), None) is not None
+
     def __repr__(self) -> str:
         return "{}(version={}, paths={}, inputs={})".format(
             type(self).__name__,
@@ -0,0 +1,58 @@
+from __future__ import annotations
+from collections import OrderedDict
+import typing
+
+if typing.TYPE_CHECKING:
+    from .v2 import CMakeTarget
+
+
+class TargetCache:
+    __slots__ = ("max_targets", "hits", "misses", "evictions", "_resident")
+
+    def __init__(self, max_targets: int):
+        if max_targets < 1:
+            raise ValueError("max_targets must be at least 1")
+        self.max_targets = max_targets
+        # Accesses served from memory, accesses that read a target reply file, and targets unloaded to make room
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Least recently used first
+        self._resident: OrderedDict[CMakeTarget, None] = OrderedDict()
+
+    def hit(self, target: CMakeTarget) -> None:
+        self.hits += 1
+        # A loaded target can be missing after it was handed over to an updated codemodel: it is tracked again
+        self.add(target)
+
+    def miss(self, target: CMakeTarget) -> None:
+        self.misses += 1
+        self.add(target)
+
+    def add(self, target: CMakeTarget) -> None:
+        self._resident[target] = None
+        self._resident.move_to_end(target)
+        while len(self._resident) > self.max_targets:
+            evicted, _ = self._resident.popitem(last=False)
+            self.evictions += 1
+            # The target is read again from its reply file on next access
+            evicted.unload()
+
+    def discard(self, target: CMakeTarget) -> None:
+        self._resident.pop(target, None)
+
+    def __contains__(self, target: CMakeTarget) -> bool:
+        return target in self._resident
+
+    def __len__(self) -> int:
+        return len(self._resident)
+
+    def __repr__(self) -> str:
+        return "{}(max_targets={}, #resident={}, hits={}, misses={}, evictions={})".format(
+            type(self).__name__,
+            self.max_targets,
+            len(self._resident),
+            self.hits,
+            self.misses,
+            self.evictions,
+        )
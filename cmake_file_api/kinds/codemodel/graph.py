@@ -0,0 +1,156 @@
+from __future__ import annotations
+import typing
+from typing import Iterable, Optional
+
+if typing.TYPE_CHECKING:
+    from .v2 import CMakeConfiguration, CMakeTarget
+
+
+class TargetDependencyGraph:
+    __slots__ = ("targets", "_lut_id_index", "_lut_target_index", "_dependencies", "_dependents",
+                 "_components", "_closure_dependencies", "_closure_dependents")
+
+    def __init__(self, targets: list[CMakeTarget], dependencies: list[list[int]]):
+        self.targets = targets
+        self._lut_id_index = {target.id: i for i, target in enumerate(targets)}
+        self._lut_target_index = {id(target): i for i, target in enumerate(targets)}
+        self._dependencies = dependencies
+        self._dependents: list[list[int]] = [[] for _ in targets]
+        for i, target_dependencies in enumerate(dependencies):
+            for d in target_dependencies:
+                self._dependents[d].append(i)
+        # Strongly connected components in reverse topological order (dependencies first), computed on first use
+        self._components: Optional[list[list[int]]] = None
+        self._closure_dependencies: dict[int, frozenset[int]] = {}
+        self._closure_dependents: dict[int, frozenset[int]] = {}
+
+    @classmethod
+    def from_configuration(cls, configuration: CMakeConfiguration) -> TargetDependencyGraph:
+        # Dependencies are only stored in the target reply files: this loads all lazy targets
+        lut_id_index = {target.id: i for i, target in enumerate(configuration.targets)}
+        dependencies = [sorted({lut_id_index[dependency.id] for dependency in target.target.dependencies})
+                        for target in configuration.targets]
+        return cls(list(configuration.targets), dependencies)
+
+    def _index(self, target: CMakeTarget | str) -> int:
+        try:
+            if isinstance(target, str):
+                return self._lut_id_index[target]
+            return self._lut_target_index[id(target)]
+        except KeyError:
+            raise KeyError("Unknown target")
+
+    def _targets(self, indexes: Iterable[int]) -> list[CMakeTarget]:
+        return [self.targets[i] for i in sorted(indexes)]
+
+    def dependencies(self, target: CMakeTarget | str) -> list[CMakeTarget]:
+        return self._targets(self._dependencies[self._index(target)])
+
+    def dependents(self, target: CMakeTarget | str) -> list[CMakeTarget]:
+        return self._targets(self._dependents[self._index(target)])
+
+    def _strongly_connected_components(self) -> list[list[int]]:
+        if self._components is not None:
+            return self._components
+        # Iterative Tarjan: deep dependency chains must not hit the recursion limit
+        n = len(self.targets)
+        order = [-1] * n
+        lowlink = [0] * n
+        on_stack = [False] * n
+        stack: list[int] = []
+        components: list[list[int]] = []
+        counter = 0
+        for root in range(n):
+            if order[root] != -1:
+                continue
+            work = [(root, 0)]
+            order[root] = lowlink[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = True
+            while work:
+                node, edge = work[-1]
+                successors = self._dependencies[node]
+                if edge < len(successors):
+                    work[-1] = (node, edge + 1)
+                    successor = successors[edge]
+                    if order[successor] == -1:
+                        order[successor] = lowlink[successor] = counter
+                        counter += 1
+                        stack.append(successor)
+                        on_stack[successor] = True
+                        work.append((successor, 0))
+                    elif on_stack[successor]:
+                        lowlink[node] = min(lowlink[node], order[successor])
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == order[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(sorted(component))
+        self._components = components
+        return components
+
+    def topological_order(self) -> list[CMakeTarget]:
+        # Every target comes after its dependencies, targets in a cycle are kept together
+        return [self.targets[i] for component in self._strongly_connected_components() for i in component]
+
+    def cycles(self) -> list[list[CMakeTarget]]:
+        return [
+            [self.targets[i] for i in component]
+            for component in self._strongly_connected_components()
+            if len(component) > 1 or component[0] in self._dependencies[component[0]]
+        ]
+
+    @staticmethod
+    def _reachable(sources: Iterable[int], edges: list[list[int]], memo: dict[int, frozenset[int]]) -> set[int]:
+        reachable: set[int] = set()
+        stack = [s for source in sources for s in edges[source]]
+        while stack:
+            node = stack.pop()
+            if node in reachable:
+                continue
+            reachable.add(node)
+            known = memo.get(node)
+            if known is not None:
+                # A memoized closure is already transitively complete: no need to walk it again
+                reachable.update(known)
+                continue
+            stack.extend(edges[node])
+        return reachable
+
+    def _closure(self, index: int, edges: list[list[int]], memo: dict[int, frozenset[int]]) -> frozenset[int]:
+        # Only queried closures are memoized: memoizing every intermediate one is quadratic on long chains
+        try:
+            return memo[index]
+        except KeyError:
+            closure = memo[index] = frozenset(self._reachable((index, ), edges, memo))
+            return closure
+
+    def transitive_dependencies(self, target: CMakeTarget | str) -> list[CMakeTarget]:
+        index = self._index(target)
+        return self._targets(self._closure(index, self._dependencies, self._closure_dependencies))
+
+    def transitive_dependents(self, target: CMakeTarget | str) -> list[CMakeTarget]:
+        index = self._index(target)
+        return self._targets(self._closure(index, self._dependents, self._closure_dependents))
+
+    def transitive_dependents_of(self, targets: Iterable[CMakeTarget | str]) -> list[CMakeTarget]:
+        # One walk from all targets at once, the targets themselves are included
+        indexes = {self._index(target) for target in targets}
+        return self._targets(indexes | self._reachable(indexes, self._dependents, self._closure_dependents))
+
+    def __repr__(self) -> str:
+        return "{}(#targets={}, #edges={})".format(
+            type(self).__name__,
+            len(self.targets),
+            sum(len(d) for d in self._dependencies),
+        )
@@ -0,0 +1,134 @@
+from __future__ import annotations
+import os
+from pathlib import Path
+import typing
+from typing import Iterable, Optional, Union
+
+if typing.TYPE_CHECKING:
+    from .target.v2 import TargetCompileGroup, TargetSource
+    from .v2 import CMakeConfiguration, CMakeTarget
+
+PathLike = Union[Path, str]
+
+
+def normalize_source_path(path: PathLike, source_root: PathLike) -> str:
+    # Lexical normalization only: resolving symlinks would stat every source file
+    path = os.fspath(path)
+    if not os.path.isabs(path):
+        path = os.path.join(source_root, path)
+    return os.path.normcase(os.path.normpath(path))
+
+
+class SourceOwner:
+    __slots__ = ("path", "target", "source", "compileGroup")
+
+    def __init__(self, path: str, target: CMakeTarget, source: TargetSource, compileGroup: Optional[TargetCompileGroup]):
+        self.path = path
+        self.target = target
+        self.source = source
+        self.compileGroup = compileGroup
+
+    def __repr__(self) -> str:
+        return "{}(path='{}', target='{}', language={})".format(
+            type(self).__name__,
+            self.path,
+            self.target.name,
+            self.compileGroup.language if self.compileGroup is not None else None,
+        )
+
+
+class _PathTrieNode:
+    __slots__ = ("children", "owners")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _PathTrieNode] = {}
+        self.owners: list[SourceOwner] = []
+
+
+class SourceOwnershipIndex:
+    __slots__ = ("source_root", "owners", "_trie")
+
+    def __init__(self, source_root: str, owners: dict[str, list[SourceOwner]]):
+        self.source_root = source_root
+        self.owners = owners
+        self._trie = _PathTrieNode()
+        for path, path_owners in owners.items():
+            node = self._trie
+            for component in self._components(path):
+                child = node.children.get(component)
+                if child is None:
+                    child = node.children[component] = _PathTrieNode()
+                node = child
+            node.owners = path_owners
+
+    @staticmethod
+    def _components(path: str) -> list[str]:
+        return [component for component in path.split(os.sep) if component]
+
+    @classmethod
+    def from_configuration(cls, configuration: CMakeConfiguration, source_root: PathLike) -> SourceOwnershipIndex:
+        # Sources are only stored in the target reply files: this loads all lazy targets
+        source_root = os.path.normpath(os.fspath(source_root))
+        owners: dict[str, list[SourceOwner]] = {}
+        for target in configuration.targets:
+            for source in target.target.sources:
+                path = normalize_source_path(source.path, source_root)
+                owners.setdefault(path, []).append(SourceOwner(path, target, source, source.compileGroup))
+        return cls(source_root, owners)
+
+    def _normalize(self, path: PathLike) -> str:
+        return normalize_source_path(path, self.source_root)
+
+    def get_owners(self, path: PathLike) -> list[SourceOwner]:
+        try:
+            return self.owners[self._normalize(path)]
+        except KeyError:
+            raise KeyError("Unknown source")
+
+    def find_owners(self, paths: Iterable[PathLike]) -> dict[str, list[SourceOwner]]:
+        # Paths that are not a source of any target are left out
+        result: dict[str, list[SourceOwner]] = {}
+        for path in paths:
+            key = self._normalize(path)
+            path_owners = self.owners.get(key)
+            if path_owners is not None:
+                result[key] = path_owners
+        return result
+
+    def get_owners_under(self, directory: PathLike) -> list[SourceOwner]:
+        node = self._trie
+        for component in self._components(self._normalize(directory)):
+            child = node.children.get(component)
+            if child is None:
+                return []
+            node = child
+        # Depth-first in path order, iterative so deep source trees do not hit the recursion limit
+        result: list[SourceOwner] = []
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            result.extend(node.owners)
+            stack.extend(node.children[component] for component in sorted(node.children, reverse=True))
+        return result
+
+    def get_targets_under(self, directory: PathLike) -> list[CMakeTarget]:
+        seen: set[int] = set()
+        targets: list[CMakeTarget] = []
+        for owner in self.get_owners_under(directory):
+            if id(owner.target) not in seen:
+                seen.add(id(owner.target))
+                targets.append(owner.target)
+        return targets
+
+    def __contains__(self, path: object) -> bool:
+        return isinstance(path, (str, Path)) and self._normalize(path) in self.owners
+
+    def __len__(self) -> int:
+        return len(self.owners)
+
+    def __repr__(self) -> str:
+        return "{}(source_root='{}', #sources={})".format(
+            type(self).__name__,
+            self.source_root,
+            len(self.owners),
+        )
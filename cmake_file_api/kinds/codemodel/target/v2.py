@@ -1,9 +1,14 @@
+from array import array
 import enum
+import hashlib
 import json
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Iterable, Mapping, Optional
 
+from cmake_file_api.errors import FieldNotLoadedError
+from cmake_file_api.json_decode import load_json
 from cmake_file_api.kinds.common import CMakeSourceBuildPaths
+from cmake_file_api.kinds.intern import InternTable
 
 
 class TargetType(enum.Enum):
@@ -34,8 +39,9 @@ class BacktraceNode:
         self.file = file
         self.line = line
         self.command = command
-        self.parent = None
+        self.parent: Optional[BacktraceNode] = None
 
+    # Kept for code building nodes itself, BacktraceGraph creates its nodes from its index table
     @classmethod
     def from_dict(cls, dikt: dict[str, Any], commands: list[str], files: list[Path]) -> "BacktraceNode":
         file = files[dikt["file"]]
@@ -59,45 +65,131 @@ class BacktraceNode:
 
 
 class BacktraceGraph:
-    __slots__ = ("nodes", )
-
-    def __init__(self, nodes: list[BacktraceNode]):
-        self.nodes = nodes
+    # Nodes are kept in one compact index table, a BacktraceNode is only created when it is accessed
+    __slots__ = ("commands", "files", "_table", "_filePaths", "_nodes")
+
+    # Table entries per node: file, line, command and parent index, -1 when absent
+    NODE_FIELDS = 4
+
+    def __init__(self, commands: list[str], files: list[str], table: "array[int]"):
+        self.commands = commands
+        self.files = files
+        self._table = table
+        self._filePaths: Optional[list[Path]] = None
+        self._nodes: Optional[dict[int, BacktraceNode]] = None
+
+    def node(self, index: int) -> BacktraceNode:
+        if self._nodes is None or self._filePaths is None:
+            self._nodes = {}
+            self._filePaths = list(Path(f) for f in self.files)
+        nodes = self._nodes
+        filePaths = self._filePaths
+        try:
+            return nodes[index]
+        except KeyError:
+            pass
+        table = self._table
+        if not 0 <= index < len(self):
+            raise IndexError("Unknown backtrace node")
+        # Create the missing part of the parent chain, outermost first
+        chain = []
+        i = index
+        while i >= 0 and i not in nodes:
+            chain.append(i)
+            i = table[i * self.NODE_FIELDS + 3]
+        for i in reversed(chain):
+            file, line, command, parent = table[i * self.NODE_FIELDS:(i + 1) * self.NODE_FIELDS]
+            node = BacktraceNode(filePaths[file], line if line >= 0 else None,
+                                 self.commands[command] if command >= 0 else None)
+            if parent >= 0:
+                node.parent = nodes[parent]
+            nodes[i] = node
+        return nodes[index]
+
+    @property
+    def nodes(self) -> list[BacktraceNode]:
+        return list(self.node(i) for i in range(len(self)))
 
     @classmethod
-    def from_dict(cls, dikt: dict[str, Any]) -> "BacktraceGraph":
-        commands = dikt["commands"]
-        files = list(Path(f) for f in dikt["files"])
-        nodes = list(BacktraceNode.from_dict(btn, commands, files) for btn in dikt["nodes"])
-        for node, dikt_node in zip(nodes, dikt["nodes"]):
-            node.update_from_dict(dikt_node, nodes)
-        return cls(nodes)
+    def from_dict(cls, dikt: dict[str, Any], interner: Optional[InternTable] = None) -> "BacktraceGraph":
+        if interner is None:
+            interner = InternTable()
+        commands = list(interner.string(c) for c in dikt["commands"])
+        files = list(interner.string(f) for f in dikt["files"])
+        table = array("i")
+        for btn in dikt["nodes"]:
+            table.extend((btn["file"], btn.get("line", -1), btn.get("command", -1), btn.get("parent", -1)))
+        return cls(commands, files, table)
+
+    def __len__(self) -> int:
+        return len(self._table) // self.NODE_FIELDS
 
     def __repr__(self) -> str:
-        return "{}(nodes={})".format(
+        return "{}(#nodes={}, #materialized={})".format(
             type(self).__name__,
-            self.nodes,
+            len(self),
+            len(self._nodes) if self._nodes is not None else 0,
         )
 
 
-class TargetDestination:
-    __slots__ = ("path", "backtrace")
+class UnrequestedBacktraceGraph(BacktraceGraph):
+    # Stands in for the graph of a target loaded without the "backtraces" field
+    __slots__ = ()
+
+    def __init__(self) -> None:
+        super().__init__([], [], array("i"))
+
+    def node(self, index: int) -> BacktraceNode:
+        raise FieldNotLoadedError("Backtraces were not loaded: add 'backtraces' to fields")
+
+
+class BacktraceReference:
+    # Base of everything with a backtrace: only the node index is stored until .backtrace is accessed
+    __slots__ = ("_backtraceIndex", "_backtraceGraph")
+
+    def __init__(self, backtraceIndex: Optional[int], backtraceGraph: Optional[BacktraceGraph]):
+        self._backtraceIndex = backtraceIndex if backtraceGraph is not None else None
+        self._backtraceGraph = backtraceGraph
+
+    @property
+    def backtrace(self) -> Optional[BacktraceNode]:
+        if self._backtraceIndex is None or self._backtraceGraph is None:
+            return None
+        return self._backtraceGraph.node(self._backtraceIndex)
+
+    def _backtrace_repr(self) -> Any:
+        # Keeps repr() working for targets loaded without the "backtraces" field
+        if isinstance(self._backtraceGraph, UnrequestedBacktraceGraph):
+            return "<not loaded>"
+        return self.backtrace
+
+
+def _backtrace_index(dikt: dict[str, Any], backtraceGraph: Optional[BacktraceGraph]) -> Optional[int]:
+    # Without a graph (backtraces=False), backtraces are not read at all
+    if backtraceGraph is None:
+        return None
+    return dikt.get("backtrace")
 
-    def __init__(self, path: Path, backtrace: BacktraceNode):
+
+class TargetDestination(BacktraceReference):
+    __slots__ = ("path", )
+
+    def __init__(self, path: Path, backtraceIndex: Optional[int], backtraceGraph: Optional[BacktraceGraph]):
+        super().__init__(backtraceIndex, backtraceGraph)
         self.path = path
-        self.backtrace = backtrace
 
     @classmethod
-    def from_dict(cls, dikt: dict[str, Any], backtraceGraph: BacktraceGraph) -> "TargetDestination":
-        path = Path(dikt["path"])
-        backtrace = backtraceGraph.nodes[dikt["backtrace"]]
-        return cls(path, backtrace)
+    def from_dict(cls, dikt: dict[str, Any], backtraceGraph: Optional[BacktraceGraph], interner: Optional[InternTable] = None) -> "TargetDestination":
+        if interner is None:
+            interner = InternTable()
+        path = interner.path(dikt["path"])
+        return cls(path, _backtrace_index(dikt, backtraceGraph), backtraceGraph)
 
     def __repr__(self) -> str:
         return "{}(path='{}', backtrace={}".format(
             type(self).__name__,
             self.path,
-            self.backtrace,
+            self._backtrace_repr(),
         )
 
 
@@ -109,9 +201,11 @@ class TargetInstall:
         self.destinations = destinations
 
     @classmethod
-    def from_dict(cls, dikt: dict[str, Any], backtraceGraph: BacktraceGraph) -> "TargetInstall":
-        prefix = Path(dikt["prefix"]["path"])
-        destinations = list(TargetDestination.from_dict(td, backtraceGraph) for td in dikt["destinations"])
+    def from_dict(cls, dikt: dict[str, Any], backtraceGraph: Optional[BacktraceGraph], interner: Optional[InternTable] = None) -> "TargetInstall":
+        if interner is None:
+            interner = InternTable()
+        prefix = interner.path(dikt["prefix"]["path"])
+        destinations = list(TargetDestination.from_dict(td, backtraceGraph, interner) for td in dikt["destinations"])
         return cls(prefix, destinations)
 
     def __repr__(self) -> str:
@@ -130,8 +224,10 @@ class TargetLinkFragment:
         self.role = role
 
     @classmethod
-    def from_dict(cls, dikt: dict[str, Any]) -> "TargetLinkFragment":
-        fragment = dikt["fragment"]
+    def from_dict(cls, dikt: dict[str, Any], interner: Optional[InternTable] = None) -> "TargetLinkFragment":
+        if interner is None:
+            interner = InternTable()
+        fragment = interner.string(dikt["fragment"])
         role = LinkFragmentRole(dikt["role"])
         return cls(fragment, role)
 
@@ -153,15 +249,17 @@ class TargetLink:
         self.sysroot = sysroot
 
     @classmethod
-    def from_dict(cls, dikt: dict[str, Any]) -> "TargetLink":
-        language = dikt["language"]
+    def from_dict(cls, dikt: dict[str, Any], interner: Optional[InternTable] = None) -> "TargetLink":
+        if interner is None:
+            interner = InternTable()
+        language = interner.string(dikt["language"])
         commandFragments = []
         if "commandFragments" in dikt:
-            commandFragments = list(TargetLinkFragment.from_dict(tlf) for tlf in dikt["commandFragments"])
+            commandFragments = list(TargetLinkFragment.from_dict(tlf, interner) for tlf in dikt["commandFragments"])
         lto = dikt.get("lto")
         sysroot = None
         if "sysroot" in dikt:
-            sysroot = Path(dikt["sysroot"]["path"])
+            sysroot = interner.path(dikt["sysroot"]["path"])
         return cls(language, commandFragments, lto, sysroot)
 
     def __repr__(self) -> str:
@@ -182,8 +280,10 @@ class TargetArchiveFragment:
         self.role = role
 
     @classmethod
-    def from_dict(cls, dikt: dict[str, Any]) -> "TargetArchiveFragment":
-        fragment = dikt["fragment"]
+    def from_dict(cls, dikt: dict[str, Any], interner: Optional[InternTable] = None) -> "TargetArchiveFragment":
+        if interner is None:
+            interner = InternTable()
+        fragment = interner.string(dikt["fragment"])
         role = ArchiveFragmentRole(dikt["role"])
         return cls(fragment, role)
 
@@ -203,10 +303,12 @@ class TargetArchive:
         self.lto = lto
 
     @classmethod
-    def from_dict(cls, dikt: dict[str, Any]) -> "TargetArchive":
+    def from_dict(cls, dikt: dict[str, Any], interner: Optional[InternTable] = None) -> "TargetArchive":
+        if interner is None:
+            interner = InternTable()
         commandFragments = []
         if "commandFragments" in dikt:
-            commandFragments = list(TargetArchiveFragment.from_dict(tlf) for tlf in dikt["commandFragments"])
+            commandFragments = list(TargetArchiveFragment.from_dict(tlf, interner) for tlf in dikt["commandFragments"])
         lto = dikt.get("lto")
         return cls(commandFragments, lto)
 
@@ -223,11 +325,13 @@ class TargetSourceGroup:
 
     def __init__(self, name: str, sources: list["TargetSource"]):
         self.name = name
-        self.sources: list[TargetSource] = []
+        self.sources = sources
 
     @classmethod
-    def from_dict(cls, dikt: dict[str, Any], target_sources: list["TargetSource"]) -> "TargetSourceGroup":
-        name = dikt["name"]
+    def from_dict(cls, dikt: dict[str, Any], target_sources: list["TargetSource"], interner: Optional[InternTable] = None) -> "TargetSourceGroup":
+        if interner is None:
+            interner = InternTable()
+        name = interner.string(dikt["name"])
         sources = list(target_sources[tsi] for tsi in dikt["sourceIndexes"])
         return cls(name, sources)
 
@@ -244,8 +348,10 @@ class TargetCompileFragment:
         self.fragment = fragment
 
     @classmethod
-    def from_dict(cls, dikt: dict[str, Any]) -> "TargetCompileFragment":
-        fragment = dikt["fragment"]
+    def from_dict(cls, dikt: dict[str, Any], interner: Optional[InternTable] = None) -> "TargetCompileFragment":
+        if interner is None:
+            interner = InternTable()
+        fragment = interner.string(dikt["fragment"])
         return cls(fragment)
 
     def __repr__(self) -> str:
@@ -256,127 +362,276 @@ class TargetCompileFragment:
 
 
 class TargetLanguageStandard:
-    __slots__ = ("backtraces", "standard")
+    __slots__ = ("standard", "_backtraceIndexes", "_backtraceGraph")
 
-    def __init__(self, standard: str, backtraces: Optional[list[BacktraceNode]]):
+    def __init__(self, standard: str, backtraceIndexes: Optional[list[int]], backtraceGraph: Optional[BacktraceGraph]):
         self.standard = standard
-        self.backtraces = backtraces
+        self._backtraceIndexes = backtraceIndexes if backtraceGraph is not None else None
+        self._backtraceGraph = backtraceGraph
+
+    @property
+    def backtraces(self) -> Optional[list[BacktraceNode]]:
+        if self._backtraceIndexes is None or self._backtraceGraph is None:
+            return None
+        return [self._backtraceGraph.node(backtrace) for backtrace in self._backtraceIndexes]
 
     @classmethod
-    def from_dict(cls, dikt: dict[str, Any], backtraceGraph: BacktraceGraph) -> "TargetLanguageStandard":
-        standard = dikt["standard"]
-        backtraces = None
-        if "backtraces" in dikt:
-            backtraces = [backtraceGraph.nodes[backtrace] for backtrace in dikt["backtraces"]]
-        return cls(standard, backtraces)
+    def from_dict(cls, dikt: dict[str, Any], backtraceGraph: Optional[BacktraceGraph], interner: Optional[InternTable] = None) -> "TargetLanguageStandard":
+        if interner is None:
+            interner = InternTable()
+        standard = interner.string(dikt["standard"])
+        return cls(standard, dikt.get("backtraces"), backtraceGraph)
 
     def __repr__(self) -> str:
         return "{}(standard={}, backtraces={})".format(
             type(self).__name__,
             self.standard,
-            self.backtraces,
+            self.backtraces if not isinstance(self._backtraceGraph, UnrequestedBacktraceGraph) else "<not loaded>",
         )
 
 
-class TargetCompileGroupInclude:
-    __slots__ = ("path", "isSystem", "backtrace")
+class TargetCompileGroupInclude(BacktraceReference):
+    __slots__ = ("path", "isSystem")
 
-    def __init__(self, path: Path, isSystem: Optional[bool], backtrace: Optional[BacktraceNode]):
+    def __init__(self, path: Path, isSystem: Optional[bool], backtraceIndex: Optional[int], backtraceGraph: Optional[BacktraceGraph]):
+        super().__init__(backtraceIndex, backtraceGraph)
         self.path = path
         self.isSystem = isSystem
-        self.backtrace = backtrace
 
     @classmethod
-    def from_dict(cls, dikt: dict[str, Any], backtraceGraph: BacktraceGraph) -> "TargetCompileGroupInclude":
-        path = Path(dikt["path"])
+    def from_dict(cls, dikt: dict[str, Any], backtraceGraph: Optional[BacktraceGraph], interner: Optional[InternTable] = None) -> "TargetCompileGroupInclude":
+        if interner is None:
+            interner = InternTable()
+        path = interner.path(dikt["path"])
         isSystem = dikt.get("isSystem")
-        backtrace = None
-        if "backtrace" in dikt:
-            backtrace = backtraceGraph.nodes[dikt["backtrace"]]
-        return cls(path, isSystem, backtrace)
+        return cls(path, isSystem, _backtrace_index(dikt, backtraceGraph), backtraceGraph)
 
     def __repr__(self) -> str:
         return "{}(path={}, system={}, backtrace={})".format(
             type(self).__name__,
             f"'{self.path}'" if self.path else None,
             self.isSystem,
-            self.backtrace,
+            self._backtrace_repr(),
         )
 
 
-class TargetCompileGroupPCH:
-    __slots__ = ("header", "backtrace")
+class TargetCompileGroupPCH(BacktraceReference):
+    __slots__ = ("header", )
 
-    def __init__(self, header: Path, backtrace: Optional[BacktraceNode]):
+    def __init__(self, header: Path, backtraceIndex: Optional[int], backtraceGraph: Optional[BacktraceGraph]):
+        super().__init__(backtraceIndex, backtraceGraph)
         self.header = header
-        self.backtrace = backtrace
 
     @classmethod
-    def from_dict(cls, dikt: dict[str, Any], backtraceGraph: BacktraceGraph) -> "TargetCompileGroupPCH":
-        header = Path(dikt["header"])
-        backtrace = None
-        if "backtrace" in dikt:
-            backtrace = backtraceGraph.nodes[dikt["backtrace"]]
-        return cls(header, backtrace)
+    def from_dict(cls, dikt: dict[str, Any], backtraceGraph: Optional[BacktraceGraph], interner: Optional[InternTable] = None) -> "TargetCompileGroupPCH":
+        if interner is None:
+            interner = InternTable()
+        header = interner.path(dikt["header"])
+        return cls(header, _backtrace_index(dikt, backtraceGraph), backtraceGraph)
 
     def __repr__(self) -> str:
         return "{}(header='{}', backtrace={})".format(
             type(self).__name__,
             self.header,
-            self.backtrace,
+            self._backtrace_repr(),
         )
 
 
-class TargetCompileGroupDefine:
-    __slots__ = ("define", "backtrace")
+class TargetCompileGroupDefine(BacktraceReference):
+    __slots__ = ("define", )
 
-    def __init__(self, define: str, backtrace: Optional[BacktraceNode]):
+    def __init__(self, define: str, backtraceIndex: Optional[int], backtraceGraph: Optional[BacktraceGraph]):
+        super().__init__(backtraceIndex, backtraceGraph)
         self.define = define
-        self.backtrace = backtrace
 
     @classmethod
-    def from_dict(cls, dikt: dict[str, Any], backtraceGraph: BacktraceGraph) -> "TargetCompileGroupDefine":
-        define = dikt["define"]
-        backtrace = None
-        if "backtrace" in dikt:
-            backtrace = backtraceGraph.nodes[dikt["backtrace"]]
-        return cls(define, backtrace)
+    def from_dict(cls, dikt: dict[str, Any], backtraceGraph: Optional[BacktraceGraph], interner: Optional[InternTable] = None) -> "TargetCompileGroupDefine":
+        if interner is None:
+            interner = InternTable()
+        define = interner.string(dikt["define"])
+        return cls(define, _backtrace_index(dikt, backtraceGraph), backtraceGraph)
 
     def __repr__(self) -> str:
         return "{}(define='{}', backtrace={})".format(
             type(self).__name__,
             self.define,
-            self.backtrace,
+            self._backtrace_repr(),
         )
 
 
-class TargetCompileGroup:
-    __slots__ = ("sources", "language", "languageStandard", "compileCommandFragments", "includes", "precompileHeaders", "defines", "sysroot")
+class TargetCompileSettings:
+    # Everything of a compile group except its sources and backtraces. Immutable: shared by all equal groups.
+    __slots__ = ("language", "languageStandard", "compileCommandFragments", "includes", "precompileHeaders", "defines",
+                 "sysroot", "_hash", "_digest")
+
+    language: str
+    languageStandard: Optional[str]
+    compileCommandFragments: tuple[str, ...]
+    includes: tuple[tuple[Path, Optional[bool]], ...]
+    precompileHeaders: tuple[Path, ...]
+    defines: tuple[str, ...]
+    sysroot: Optional[Path]
+    _hash: int
+    _digest: Optional[str]
+
+    def __init__(self, language: str, languageStandard: Optional[str], compileCommandFragments: tuple[str, ...],
+                 includes: tuple[tuple[Path, Optional[bool]], ...], precompileHeaders: tuple[Path, ...],
+                 defines: tuple[str, ...], sysroot: Optional[Path]):
+        object.__setattr__(self, "language", language)
+        object.__setattr__(self, "languageStandard", languageStandard)
+        object.__setattr__(self, "compileCommandFragments", compileCommandFragments)
+        object.__setattr__(self, "includes", includes)
+        object.__setattr__(self, "precompileHeaders", precompileHeaders)
+        object.__setattr__(self, "defines", defines)
+        object.__setattr__(self, "sysroot", sysroot)
+        object.__setattr__(self, "_hash", hash(self._key()))
+        object.__setattr__(self, "_digest", None)
+
+    def _key(self) -> tuple[Any, ...]:
+        return (self.language, self.languageStandard, self.compileCommandFragments, self.includes,
+                self.precompileHeaders, self.defines, self.sysroot)
+
+    @property
+    def digest(self) -> str:
+        # Unlike hash(), the same across processes and python versions
+        if self._digest is None:
+            key = [self.language, self.languageStandard, list(self.compileCommandFragments),
+                   [[str(path), isSystem] for path, isSystem in self.includes],
+                   [str(header) for header in self.precompileHeaders], list(self.defines),
+                   str(self.sysroot) if self.sysroot is not None else None]
+            digest = hashlib.sha256(json.dumps(key).encode()).hexdigest()
+            object.__setattr__(self, "_digest", digest)
+            return digest
+        return self._digest
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("{} is immutable".format(type(self).__name__))
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("{} is immutable".format(type(self).__name__))
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return type(self), self._key()
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, TargetCompileSettings):
+            return NotImplemented
+        return self is other or (self._hash == other._hash and self._key() == other._key())
+
+    def __hash__(self) -> int:
+        return self._hash
 
-    def __init__(self, sources: list["TargetSource"], language: str, languageStandard: Optional[TargetLanguageStandard],
-                 compileCommandFragments: list[TargetCompileFragment], includes: list[TargetCompileGroupInclude],
-                 precompileHeaders: list[TargetCompileGroupPCH], defines: list[TargetCompileGroupDefine],
-                 sysroot: Optional[Path]):
+    def __repr__(self) -> str:
+        return "{}(language='{}', languageStandard={}, compileCommandFragments={}, #includes={}, #precompileHeaders={}, #defines={}, sysroot={})".format(
+            type(self).__name__,
+            self.language,
+            self.languageStandard,
+            list(self.compileCommandFragments),
+            len(self.includes),
+            len(self.precompileHeaders),
+            len(self.defines),
+            f"'{self.sysroot}'" if self.sysroot else None,
+        )
+
+
+class TargetCompileGroup:
+    __slots__ = ("sources", "settings", "_backtraceGraph", "_languageStandardBacktraces", "_includeBacktraces",
+                 "_precompileHeaderBacktraces", "_defineBacktraces", "_languageStandard", "_compileCommandFragments",
+                 "_includes", "_precompileHeaders", "_defines")
+
+    def __init__(self, sources: list["TargetSource"], settings: TargetCompileSettings,
+                 backtraceGraph: Optional[BacktraceGraph] = None,
+                 languageStandardBacktraces: Optional[list[int]] = None,
+                 includeBacktraces: Optional[list[Optional[int]]] = None,
+                 precompileHeaderBacktraces: Optional[list[Optional[int]]] = None,
+                 defineBacktraces: Optional[list[Optional[int]]] = None):
         self.sources = sources
-        self.language = language
-        self.languageStandard = languageStandard
-        self.compileCommandFragments = compileCommandFragments
-        self.includes = includes
-        self.precompileHeaders = precompileHeaders
-        self.defines = defines
-        self.sysroot = sysroot
+        self.settings = settings
+        # Backtraces differ between otherwise equal groups: their node indexes are kept here, in the order of the settings
+        self._backtraceGraph = backtraceGraph
+        self._languageStandardBacktraces = languageStandardBacktraces
+        self._includeBacktraces = includeBacktraces or [None] * len(settings.includes)
+        self._precompileHeaderBacktraces = precompileHeaderBacktraces or [None] * len(settings.precompileHeaders)
+        self._defineBacktraces = defineBacktraces or [None] * len(settings.defines)
+        # Per group views of the shared settings, built on first access and then kept
+        self._languageStandard: Optional[TargetLanguageStandard] = None
+        self._compileCommandFragments: Optional[list[TargetCompileFragment]] = None
+        self._includes: Optional[list[TargetCompileGroupInclude]] = None
+        self._precompileHeaders: Optional[list[TargetCompileGroupPCH]] = None
+        self._defines: Optional[list[TargetCompileGroupDefine]] = None
+
+    @property
+    def language(self) -> str:
+        return self.settings.language
+
+    @property
+    def languageStandard(self) -> Optional[TargetLanguageStandard]:
+        if self._languageStandard is None and self.settings.languageStandard is not None:
+            self._languageStandard = TargetLanguageStandard(self.settings.languageStandard, self._languageStandardBacktraces,
+                                                            self._backtraceGraph)
+        return self._languageStandard
+
+    @property
+    def compileCommandFragments(self) -> list[TargetCompileFragment]:
+        if self._compileCommandFragments is None:
+            self._compileCommandFragments = [TargetCompileFragment(fragment) for fragment in self.settings.compileCommandFragments]
+        return self._compileCommandFragments
+
+    @property
+    def includes(self) -> list[TargetCompileGroupInclude]:
+        if self._includes is None:
+            self._includes = [TargetCompileGroupInclude(path, isSystem, backtrace, self._backtraceGraph)
+                              for (path, isSystem), backtrace in zip(self.settings.includes, self._includeBacktraces)]
+        return self._includes
+
+    @property
+    def precompileHeaders(self) -> list[TargetCompileGroupPCH]:
+        if self._precompileHeaders is None:
+            self._precompileHeaders = [TargetCompileGroupPCH(header, backtrace, self._backtraceGraph)
+                                       for header, backtrace in zip(self.settings.precompileHeaders, self._precompileHeaderBacktraces)]
+        return self._precompileHeaders
+
+    @property
+    def defines(self) -> list[TargetCompileGroupDefine]:
+        if self._defines is None:
+            self._defines = [TargetCompileGroupDefine(define, backtrace, self._backtraceGraph)
+                             for define, backtrace in zip(self.settings.defines, self._defineBacktraces)]
+        return self._defines
+
+    @property
+    def sysroot(self) -> Optional[Path]:
+        return self.settings.sysroot
 
     @classmethod
-    def from_dict(cls, dikt: dict[str, Any], target_sources: list["TargetSource"], backtraceGraph: BacktraceGraph) -> "TargetCompileGroup":
-        language = dikt["language"]
-        compileCommandFragments = list(TargetCompileFragment.from_dict(tcf) for tcf in dikt.get("compileCommandFragments", ()))
-        includes = list(TargetCompileGroupInclude.from_dict(tci, backtraceGraph) for tci in dikt.get("includes", ()))
-        precompileHeaders = list(TargetCompileGroupPCH.from_dict(tcpch, backtraceGraph) for tcpch in dikt.get("precompileHeaders", ()))
-        defines = list(TargetCompileGroupDefine.from_dict(tcdef, backtraceGraph) for tcdef in dikt.get("defines", ()))
-        sysroot = Path(dikt["sysroot"]["path"]) if "sysroot" in dikt and "path" in dikt["sysroot"] else None
+    def from_dict(cls, dikt: dict[str, Any], target_sources: list["TargetSource"], backtraceGraph: Optional[BacktraceGraph],
+                  interner: Optional[InternTable] = None) -> "TargetCompileGroup":
+        if interner is None:
+            interner = InternTable()
+        # The settings are built straight from the reply, only the backtrace indexes are kept per group
+        language = interner.string(dikt["language"])
+        compileCommandFragments = tuple(interner.string(tcf["fragment"]) for tcf in dikt.get("compileCommandFragments", ()))
+        include_dikts = dikt.get("includes", ())
+        pch_dikts = dikt.get("precompileHeaders", ())
+        define_dikts = dikt.get("defines", ())
+        sysroot = interner.path(dikt["sysroot"]["path"]) if "sysroot" in dikt and "path" in dikt["sysroot"] else None
         sources = list(target_sources[tsi] for tsi in dikt["sourceIndexes"])
-        languageStandard = TargetLanguageStandard.from_dict(dikt.get("languageStandard", {}), backtraceGraph) if "languageStandard" in dikt else None
-        return cls(sources, language, languageStandard, compileCommandFragments, includes, precompileHeaders, defines, sysroot)
+        languageStandard = dikt.get("languageStandard")
+        settings = interner.object(TargetCompileSettings(
+            language,
+            interner.string(languageStandard["standard"]) if languageStandard is not None else None,
+            compileCommandFragments,
+            tuple((interner.path(tci["path"]), tci.get("isSystem")) for tci in include_dikts),
+            tuple(interner.path(tcpch["header"]) for tcpch in pch_dikts),
+            tuple(interner.string(tcdef["define"]) for tcdef in define_dikts),
+            sysroot,
+        ))
+        if backtraceGraph is None:
+            return cls(sources, settings)
+        return cls(sources, settings, backtraceGraph,
+                   languageStandard.get("backtraces") if languageStandard is not None else None,
+                   [tci.get("backtrace") for tci in include_dikts],
+                   [tcpch.get("backtrace") for tcpch in pch_dikts],
+                   [tcdef.get("backtrace") for tcdef in define_dikts])
 
     def __repr__(self) -> str:
         return "{}(sources={}, language='{}', compileCommandFragments={}, #includes={}, #precompileHeaders={}, #defines={}, sysroot={})".format(
@@ -384,64 +639,70 @@ class TargetCompileGroup:
             self.sources,
             self.language,
             self.compileCommandFragments,
-            len(self.includes),
-            len(self.precompileHeaders),
-            len(self.defines),
+            len(self.settings.includes),
+            len(self.settings.precompileHeaders),
+            len(self.settings.defines),
             f"'{self.sysroot}'" if self.sysroot else None,
         )
 
 
-class TargetDependency:
-    __slots__ = ("id", "target", "backtrace")
+class TargetDependency(BacktraceReference):
+    __slots__ = ("id", "_lut_id_target")
 
-    def __init__(self, id: str, backtrace: Optional[BacktraceNode]):
+    def __init__(self, id: str, backtraceIndex: Optional[int], backtraceGraph: Optional[BacktraceGraph]):
+        super().__init__(backtraceIndex, backtraceGraph)
         self.id = id
-        self.target: Optional[CodemodelTargetV2] = None
-        self.backtrace = backtrace
+        self._lut_id_target: Optional[Mapping[str, CodemodelTargetV2]] = None
+
+    @property
+    def target(self) -> Optional["CodemodelTargetV2"]:
+        # Resolved on access, so a lazily loaded dependency is only read when it is needed
+        if self._lut_id_target is None:
+            return None
+        return self._lut_id_target[self.id]
 
-    def update_dependency(self, lut_id_target: dict[str, "CodemodelTargetV2"]) -> None:
-        self.target = lut_id_target[self.id]
+    def update_dependency(self, lut_id_target: Mapping[str, "CodemodelTargetV2"]) -> None:
+        self._lut_id_target = lut_id_target
 
     @classmethod
-    def from_dict(cls, dikt: dict[str, Any], backtraceGraph: BacktraceGraph) -> "TargetDependency":
-        id = dikt["id"]
-        backtrace = None
-        if "backtrace" in dikt:
-            backtrace = backtraceGraph.nodes[dikt["backtrace"]]
-        return cls(id, backtrace)
+    def from_dict(cls, dikt: dict[str, Any], backtraceGraph: Optional[BacktraceGraph], interner: Optional[InternTable] = None) -> "TargetDependency":
+        if interner is None:
+            interner = InternTable()
+        id = interner.string(dikt["id"])
+        return cls(id, _backtrace_index(dikt, backtraceGraph), backtraceGraph)
 
     def __repr__(self) -> str:
         return "{}(id='{}', target='{}', backtrace={})".format(
             type(self).__name__,
             self.id,
             self.target.name if self.target else None,
-            self.backtrace,
+            self._backtrace_repr(),
         )
 
 
-class TargetSource:
-    __slots__ = ("path", "isGenerated", "backtrace", "compileGroup", "sourceGroup")
+class TargetSource(BacktraceReference):
+    __slots__ = ("path", "isGenerated", "compileGroup", "sourceGroup")
 
-    def __init__(self, path: Path, isGenerated: Optional[bool], backtrace: Optional[BacktraceNode]):
+    def __init__(self, path: Path, isGenerated: Optional[bool], backtraceIndex: Optional[int], backtraceGraph: Optional[BacktraceGraph]):
+        super().__init__(backtraceIndex, backtraceGraph)
         self.path = path
         self.isGenerated = isGenerated
-        self.backtrace = backtrace
         self.compileGroup: Optional[TargetCompileGroup] = None
         self.sourceGroup: Optional[TargetSourceGroup] = None
 
     @classmethod
-    def from_dict(cls, dikt: dict[str, Any], backtraceGraph: BacktraceGraph) -> "TargetSource":
-        path = Path(dikt["path"])
+    def from_dict(cls, dikt: dict[str, Any], backtraceGraph: Optional[BacktraceGraph], interner: Optional[InternTable] = None) -> "TargetSource":
+        if interner is None:
+            interner = InternTable()
+        path = interner.path(dikt["path"])
         isGenerated = dikt.get("isGenerated")
-        backtrace = None
-        if "backtrace" in dikt:
-            backtrace = backtraceGraph.nodes[dikt["backtrace"]]
-        return cls(path, isGenerated, backtrace)
+        return cls(path, isGenerated, _backtrace_index(dikt, backtraceGraph), backtraceGraph)
 
     def update_from_dict(self, dikt: dict[str, Any], modelTarget: "CodemodelTargetV2") -> None:
-        if "compileGroupIndex" in dikt:
+        # Groups left out by a field projection are not linked
+        if "compileGroupIndex" in dikt and modelTarget.compileGroups:
             self.compileGroup = modelTarget.compileGroups[dikt["compileGroupIndex"]]
-        if "sourceGroupIndex" in dikt:
+        if "sourceGroupIndex" in dikt and modelTarget.sourceGroups:
             self.sourceGroup = modelTarget.sourceGroups[dikt["sourceGroupIndex"]]
 
     def __repr__(self) -> str:
@@ -449,27 +710,43 @@ class TargetSource:
             type(self).__name__,
             self.path,
             self.isGenerated,
-            self.backtrace,
-            self.compileGroup,
-            self.sourceGroup,
+            self._backtrace_repr(),
+            # Only name the groups: their reprs list this source again
+            f"'{self.compileGroup.language}'" if self.compileGroup else None,
+            f"'{self.sourceGroup.name}'" if self.sourceGroup else None,
         )
 
 
-class CodemodelTargetV2:
-    __slots__ = ("name", "id", "type", "backtrace", "folder", "paths", "nameOnDisk", "artifacts",
+# Parts of a target that can be left out with fields=..., the other attributes are always loaded
+TARGET_FIELDS = frozenset(("backtraces", "install", "link", "archive", "dependencies", "sources", "sourceGroups", "compileGroups"))
+
+
+def target_fields(fields: Optional[Iterable[str]]) -> frozenset[str]:
+    if fields is None:
+        return TARGET_FIELDS
+    fields = frozenset(fields)
+    unknown = fields - TARGET_FIELDS
+    if unknown:
+        raise ValueError("Unknown target fields: {}".format(", ".join(sorted(unknown))))
+    return fields
+
+
+class CodemodelTargetV2(BacktraceReference):
+    __slots__ = ("name", "id", "type", "folder", "paths", "nameOnDisk", "artifacts",
                  "isGeneratorProvided", "install", "link", "archive", "dependencies", "sources",
                  "sourceGroups", "compileGroups")
 
-    def __init__(self, name: str, id: str, type: TargetType, backtrace: Optional[BacktraceNode], folder: Optional[Path],
+    def __init__(self, name: str, id: str, type: TargetType, backtraceIndex: Optional[int], folder: Optional[Path],
                  paths: CMakeSourceBuildPaths, nameOnDisk: str, artifacts: list[Path],
                  isGeneratorProvided: Optional[bool], install: Optional[TargetInstall],
                  link: Optional[TargetLink], archive: Optional[TargetArchive],
                  dependencies: list[TargetDependency], sources: list[TargetSource],
-                 sourceGroups: list[TargetSourceGroup], compileGroups: list[TargetCompileGroup]):
+                 sourceGroups: list[TargetSourceGroup], compileGroups: list[TargetCompileGroup],
+                 backtraceGraph: Optional[BacktraceGraph] = None):
+        super().__init__(backtraceIndex, backtraceGraph)
         self.name = name
         self.id = id
         self.type = type
-        self.backtrace = backtrace
         self.folder = folder
         self.paths = paths
         self.nameOnDisk = nameOnDisk
@@ -483,55 +760,157 @@ class CodemodelTargetV2:
         self.sourceGroups = sourceGroups
         self.compileGroups = compileGroups
 
-    def update_dependencies(self, lut_id_target: dict[str, "CodemodelTargetV2"]) -> None:
+    def update_dependencies(self, lut_id_target: Mapping[str, "CodemodelTargetV2"]) -> None:
+        if "dependencies" not in self.loaded_fields:
+            return
         for dependency in self.dependencies:
             dependency.update_dependency(lut_id_target)
 
+    def intern_into(self, interner: InternTable) -> None:
+        # Adds the interned objects of this target to another table, so targets parsed with that table share them
+        interner.string(self.id)
+        if self.folder is not None:
+            interner.add_path(self.folder)
+        interner.add_path(self.paths.source)
+        interner.add_path(self.paths.build)
+        for artifact in self.artifacts:
+            interner.add_path(artifact)
+        fields = self.loaded_fields
+        if "backtraces" in fields and self._backtraceGraph is not None:
+            for command in self._backtraceGraph.commands:
+                interner.string(command)
+            for file in self._backtraceGraph.files:
+                interner.string(file)
+        if "install" in fields and self.install is not None:
+            interner.add_path(self.install.prefix)
+            for destination in self.install.destinations:
+                interner.add_path(destination.path)
+        if "link" in fields and self.link is not None:
+            interner.string(self.link.language)
+            for link_fragment in self.link.commandFragments:
+                interner.string(link_fragment.fragment)
+            if self.link.sysroot is not None:
+                interner.add_path(self.link.sysroot)
+        if "archive" in fields and self.archive is not None:
+            for archive_fragment in self.archive.commandFragments:
+                interner.string(archive_fragment.fragment)
+        if "dependencies" in fields:
+            for dependency in self.dependencies:
+                interner.string(dependency.id)
+        if "sources" in fields:
+            for source in self.sources:
+                interner.add_path(source.path)
+        if "sourceGroups" in fields:
+            for sourceGroup in self.sourceGroups:
+                interner.string(sourceGroup.name)
+        if "compileGroups" in fields:
+            for compileGroup in self.compileGroups:
+                settings = compileGroup.settings
+                interner.object(settings)
+                interner.string(settings.language)
+                if settings.languageStandard is not None:
+                    interner.string(settings.languageStandard)
+                for fragment in settings.compileCommandFragments:
+                    interner.string(fragment)
+                for path, _ in settings.includes:
+                    interner.add_path(path)
+                for header in settings.precompileHeaders:
+                    interner.add_path(header)
+                for define in settings.defines:
+                    interner.string(define)
+                if settings.sysroot is not None:
+                    interner.add_path(settings.sysroot)
+
+    @property
+    def loaded_fields(self) -> frozenset[str]:
+        fields = {field for field in TARGET_FIELDS - {"backtraces"} if hasattr(self, field)}
+        if not isinstance(self._backtraceGraph, UnrequestedBacktraceGraph):
+            fields.add("backtraces")
+        return frozenset(fields)
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for attributes that are not set: the fields left out by a projection
+        if name in TARGET_FIELDS:
+            raise FieldNotLoadedError("Target field '{}' was not loaded: add it to fields".format(name))
+        # FieldNotLoadedError is an AttributeError, so python falls back to here when a backtrace property raises it
+        if name in ("backtrace", "backtraceGraph"):
+            raise FieldNotLoadedError("Backtraces were not loaded: add 'backtraces' to fields")
+        raise AttributeError("'{}' object has no attribute '{}'".format(type(self).__name__, name))
+
+    @property
+    def backtraceGraph(self) -> Optional[BacktraceGraph]:
+        if isinstance(self._backtraceGraph, UnrequestedBacktraceGraph):
+            self._backtraceGraph.node(0)
+        return self._backtraceGraph
+
     @classmethod
-    def from_dict(cls, dikt: dict[str, Any], reply_path: Path) -> "CodemodelTargetV2":
+    def from_dict(cls, dikt: dict[str, Any], reply_path: Path, interner: Optional[InternTable] = None,
+                  backtraces: bool = True, fields: Optional[Iterable[str]] = None) -> "CodemodelTargetV2":
+        # Equal paths and strings share one object, within this target and with all targets using the same table
+        if interner is None:
+            interner = InternTable()
+        fields = target_fields(fields)
         name = dikt["name"]
-        id = dikt["id"]
+        id = interner.string(dikt["id"])
         type = TargetType(dikt["type"])
-        backtraceGraph = BacktraceGraph.from_dict(dikt["backtraceGraph"])
-        backtrace = None
-        if "backtrace" in dikt:
-            backtrace = backtraceGraph.nodes[dikt["backtrace"]]
+        # Without backtraces, the backtrace graph and all backtrace references are skipped
+        backtraceGraph: Optional[BacktraceGraph] = None
+        if backtraces:
+            if "backtraces" in fields:
+                backtraceGraph = BacktraceGraph.from_dict(dikt["backtraceGraph"], interner)
+            else:
+                backtraceGraph = UnrequestedBacktraceGraph()
+        backtrace = _backtrace_index(dikt, backtraceGraph)
         folder = None
         if "folder" in dikt:
-            folder = Path(dikt["folder"]["name"])
-        paths = CMakeSourceBuildPaths.from_dict(dikt["paths"])
+            folder = interner.path(dikt["folder"]["name"])
+        paths = CMakeSourceBuildPaths(interner.path(dikt["paths"]["source"]), interner.path(dikt["paths"]["build"]))
         nameOnDisk = dikt.get("nameOnDisk", "")
-        artifacts = list(Path(p["path"]) for p in dikt.get("artifacts", ()))
+        artifacts = list(interner.path(p["path"]) for p in dikt.get("artifacts", ()))
         isGeneratorProvided = dikt.get("isGeneratorProvided")
         install = None
-        if "install" in dikt:
-            install = TargetInstall.from_dict(dikt["install"], backtraceGraph)
+        if "install" in dikt and "install" in fields:
+            install = TargetInstall.from_dict(dikt["install"], backtraceGraph, interner)
         link = None
-        if "link" in dikt:
-            link = TargetLink.from_dict(dikt["link"])
+        if "link" in dikt and "link" in fields:
+            link = TargetLink.from_dict(dikt["link"], interner)
         archive = None
-        if "archive" in dikt:
-            archive = TargetArchive.from_dict(dikt["archive"])
+        if "archive" in dikt and "archive" in fields:
+            archive = TargetArchive.from_dict(dikt["archive"], interner)
         dependencies = []
-        if "dependencies" in dikt:
-            dependencies = list(TargetDependency.from_dict(td, backtraceGraph) for td in dikt["dependencies"])
-        sources = list(TargetSource.from_dict(ts, backtraceGraph) for ts in dikt["sources"])
-        sourceGroups = list(TargetSourceGroup.from_dict(tsg, sources) for tsg in dikt.get("sourceGroups", ()))
-        compileGroups = list(TargetCompileGroup.from_dict(tsg, sources, backtraceGraph) for tsg in dikt.get("compileGroups", ()))
-
-        return cls(name, id, type, backtrace, folder, paths, nameOnDisk, artifacts,
-                   isGeneratorProvided, install, link, archive, dependencies, sources, sourceGroups, compileGroups)
+        if "dependencies" in dikt and "dependencies" in fields:
+            dependencies = list(TargetDependency.from_dict(td, backtraceGraph, interner) for td in dikt["dependencies"])
+        # Source and compile groups refer to the sources
+        sources = []
+        if fields & {"sources", "sourceGroups", "compileGroups"}:
+            sources = list(TargetSource.from_dict(ts, backtraceGraph, interner) for ts in dikt["sources"])
+        sourceGroups = []
+        if "sourceGroups" in fields:
+            sourceGroups = list(TargetSourceGroup.from_dict(tsg, sources, interner) for tsg in dikt.get("sourceGroups", ()))
+        compileGroups = []
+        if "compileGroups" in fields:
+            compileGroups = list(TargetCompileGroup.from_dict(tsg, sources, backtraceGraph, interner) for tsg in dikt.get("compileGroups", ()))
+
+        obj = cls(name, id, type, backtrace, folder, paths, nameOnDisk, artifacts,
+                  isGeneratorProvided, install, link, archive, dependencies, sources, sourceGroups, compileGroups,
+                  backtraceGraph)
+        for ts_dikt, source in zip(dikt["sources"], sources):
+            source.update_from_dict(ts_dikt, obj)
+        # Unset the slots of the fields that were not requested, accessing them raises (see __getattr__)
+        for field in TARGET_FIELDS - fields - {"backtraces"}:
+            delattr(obj, field)
+        return obj
 
     @classmethod
-    def from_path(cls, path: Path, reply_path: Path) -> "CodemodelTargetV2":
-        with path.open() as file:
-            dikt = json.load(file)
-        return cls.from_dict(dikt, reply_path)
+    def from_path(cls, path: Path, reply_path: Path, interner: Optional[InternTable] = None,
+                  backtraces: bool = True, fields: Optional[Iterable[str]] = None) -> "CodemodelTargetV2":
+        dikt = load_json(path)
+        return cls.from_dict(dikt, reply_path, interner, backtraces, fields)
 
     def __repr__(self) -> str:
         return "{}(name='{}', type={}, backtrace={})".format(
             type(self).__name__,
             self.name,
             self.type.name,
-            self.backtrace,
+            self._backtrace_repr(),
         )
@@ -1,10 +1,19 @@
-import json
+from concurrent.futures import Executor
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Iterable, Iterator, Mapping, Optional
 
+from cmake_file_api.json_decode import load_json
 from cmake_file_api.kinds.common import CMakeSourceBuildPaths, VersionMajorMinor
+from cmake_file_api.kinds.intern import InternTable
 from cmake_file_api.kinds.kind import ObjectKind
-from .target.v2 import CodemodelTargetV2
+from .cache import TargetCache
+from .graph import TargetDependencyGraph
+from .sources import SourceOwnershipIndex
+from .target.v2 import CodemodelTargetV2, TargetCompileSettings, TargetType, target_fields
+
+
+# Number of batches handed to an executor when preloading targets, keeps process pool IPC overhead low
+PRELOAD_CHUNKS = 64
 
 
 class CMakeProject:
@@ -83,27 +92,102 @@ class CMakeDirectory:
 
 
 class CMakeTarget:
-    __slots__ = ("name", "directory", "project", "jsonFile", "target")
+    __slots__ = ("name", "id", "directory", "project", "jsonFile", "_reply_path", "_interner", "_backtraces", "_fields",
+                 "_cache", "_target", "_lut_id_target")
 
-    def __init__(self, name: str, directory: CMakeDirectory, project: CMakeProject, jsonFile: Path, target: CodemodelTargetV2):
+    def __init__(self, name: str, id: str, directory: CMakeDirectory, project: CMakeProject, jsonFile: Path, reply_path: Path,
+                 interner: Optional[InternTable] = None, backtraces: bool = True,
+                 fields: Optional[Iterable[str]] = None, cache: Optional[TargetCache] = None):
         self.name = name
+        self.id = id
         self.directory = directory
         self.project = project
         self.jsonFile = jsonFile
-        self.target = target
-
-    def update_dependencies(self, lut_id_target: dict[str, "CMakeTarget"]) -> None:
-        lut = {k: v.target for k, v in lut_id_target.items()}
-        self.target.update_dependencies(lut)
+        self._reply_path = reply_path
+        # Without a table, every load of the target uses a new one
+        self._interner = interner
+        self._backtraces = backtraces
+        self._fields = target_fields(fields)
+        # Caps the number of resident targets, shared by all targets of a codemodel
+        self._cache = cache
+        self._target: Optional[CodemodelTargetV2] = None
+        self._lut_id_target: Optional[Mapping[str, CodemodelTargetV2]] = None
+
+    @property
+    def reply_path(self) -> Path:
+        return self._reply_path
+
+    @property
+    def interner(self) -> Optional[InternTable]:
+        return self._interner
+
+    @property
+    def backtraces(self) -> bool:
+        return self._backtraces
+
+    @property
+    def fields(self) -> frozenset[str]:
+        return self._fields
+
+    @property
+    def loaded(self) -> bool:
+        return self._target is not None
+
+    @property
+    def cache(self) -> Optional[TargetCache]:
+        return self._cache
+
+    @property
+    def target(self) -> CodemodelTargetV2:
+        if self._target is None:
+            self._target = self._load()
+            if self._cache is not None:
+                self._cache.miss(self)
+        elif self._cache is not None:
+            self._cache.hit(self)
+        return self._target
+
+    def _load(self) -> CodemodelTargetV2:
+        target = CodemodelTargetV2.from_path(self.jsonFile, self._reply_path, self._interner, self._backtraces,
+                                          self._fields)
+        if self._lut_id_target is not None:
+            target.update_dependencies(self._lut_id_target)
+        return target
+
+    def preload(self) -> None:
+        if self._target is None:
+            self.set_target(self._load())
+
+    def set_target(self, target: CodemodelTargetV2) -> None:
+        if self._lut_id_target is not None:
+            target.update_dependencies(self._lut_id_target)
+        self._target = target
+        if self._cache is not None:
+            self._cache.add(self)
+
+    def unload(self) -> None:
+        # Drops the parsed target, it is read again from its reply file on next access
+        self._target = None
+        if self._cache is not None:
+            self._cache.discard(self)
+
+    def update_dependencies(self, lut_id_target: Mapping[str, CodemodelTargetV2]) -> None:
+        self._lut_id_target = lut_id_target
+        if self._target is not None:
+            self._target.update_dependencies(lut_id_target)
 
     @classmethod
-    def from_dict(cls, dikt: dict[str, Any], directories: list[CMakeDirectory], projects: list[CMakeProject], reply_path: Path) -> "CMakeTarget":
+    def from_dict(cls, dikt: dict[str, Any], directories: list[CMakeDirectory], projects: list[CMakeProject], reply_path: Path,
+                  interner: Optional[InternTable] = None, backtraces: bool = True,
+                  fields: Optional[Iterable[str]] = None, cache: Optional[TargetCache] = None) -> "CMakeTarget":
         name = dikt["name"]
+        id = interner.string(dikt["id"]) if interner is not None else dikt["id"]
         directory = directories[dikt["directoryIndex"]]
         project = projects[dikt["projectIndex"]]
         jsonFile = reply_path / dikt["jsonFile"]
-        target = CodemodelTargetV2.from_path(jsonFile, reply_path)
-        return cls(name, directory, project, jsonFile, target)
+        # With a capped cache, the objects of evicted targets must not stay behind in the long-lived table
+        target_interner = interner if cache is None else None
+        return cls(name, id, directory, project, jsonFile, reply_path, target_interner, backtraces, fields, cache)
 
     def __repr__(self) -> str:
         return "{}(name='{}', directory={}, project={}, jsonFile='{}', target={})".format(
@@ -112,26 +196,161 @@ class CMakeTarget:
             repr(self.directory),
             repr(self.project),
             self.jsonFile,
-            self.target,
+            self._target if self._target is not None else "<not loaded>",
         )
 
 
+class CMakeTargetLookup(Mapping[str, CodemodelTargetV2]):
+    __slots__ = ("_targets", )
+
+    def __init__(self, targets: list[CMakeTarget]):
+        self._targets = {target.id: target for target in targets}
+
+    def __getitem__(self, id: str) -> CodemodelTargetV2:
+        return self._targets[id].target
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._targets)
+
+    def __len__(self) -> int:
+        return len(self._targets)
+
+
 class CMakeConfiguration:
-    __slots__ = ("name", "directories", "projects", "targets")
+    __slots__ = ("name", "directories", "projects", "targets", "_lut_id_target", "_lut_name_target",
+                 "_lut_type_targets", "_lut_name_project", "_lut_source_directory", "_lut_compile_settings_targets",
+                 "_dependency_graph")
 
     def __init__(self, name: str, directories: list[CMakeDirectory], projects: list[CMakeProject], targets: list[CMakeTarget]):
         self.name = name
         self.directories = directories
         self.projects = projects
         self.targets = targets
+        # Lookup tables, built on first use
+        self._lut_id_target: Optional[dict[str, CMakeTarget]] = None
+        self._lut_name_target: Optional[dict[str, CMakeTarget]] = None
+        self._lut_type_targets: Optional[dict[TargetType, list[CMakeTarget]]] = None
+        self._lut_name_project: Optional[dict[str, CMakeProject]] = None
+        self._lut_source_directory: Optional[dict[Path, CMakeDirectory]] = None
+        self._lut_compile_settings_targets: Optional[dict[TargetCompileSettings, list[CMakeTarget]]] = None
+        self._dependency_graph: Optional[TargetDependencyGraph] = None
+
+    def get_target(self, name: str) -> CMakeTarget:
+        if self._lut_name_target is None:
+            self._lut_name_target = {target.name: target for target in self.targets}
+        try:
+            return self._lut_name_target[name]
+        except KeyError:
+            raise KeyError("Unknown target")
+
+    def get_target_by_id(self, id: str) -> CMakeTarget:
+        if self._lut_id_target is None:
+            self._lut_id_target = {target.id: target for target in self.targets}
+        try:
+            return self._lut_id_target[id]
+        except KeyError:
+            raise KeyError("Unknown target")
+
+    def get_targets_by_type(self, type: TargetType) -> list[CMakeTarget]:
+        # The type is only stored in the target reply files: this loads all lazy targets
+        if self._lut_type_targets is None:
+            lut_type_targets: dict[TargetType, list[CMakeTarget]] = {}
+            for target in self.targets:
+                lut_type_targets.setdefault(target.target.type, []).append(target)
+            self._lut_type_targets = lut_type_targets
+        return self._lut_type_targets.get(type, [])
+
+    def _compile_settings_targets(self) -> dict[TargetCompileSettings, list[CMakeTarget]]:
+        # Compile settings are only stored in the target reply files: this loads all lazy targets
+        if self._lut_compile_settings_targets is None:
+            lut_compile_settings_targets: dict[TargetCompileSettings, list[CMakeTarget]] = {}
+            for target in self.targets:
+                for settings in dict.fromkeys(group.settings for group in target.target.compileGroups):
+                    lut_compile_settings_targets.setdefault(settings, []).append(target)
+            self._lut_compile_settings_targets = lut_compile_settings_targets
+        return self._lut_compile_settings_targets
+
+    def get_compile_settings(self) -> list[TargetCompileSettings]:
+        return list(self._compile_settings_targets())
+
+    def get_targets_by_compile_settings(self, settings: TargetCompileSettings) -> list[CMakeTarget]:
+        return self._compile_settings_targets().get(settings, [])
+
+    def get_project(self, name: str) -> CMakeProject:
+        if self._lut_name_project is None:
+            self._lut_name_project = {project.name: project for project in self.projects}
+        try:
+            return self._lut_name_project[name]
+        except KeyError:
+            raise KeyError("Unknown project")
+
+    def get_dependency_graph(self) -> TargetDependencyGraph:
+        if self._dependency_graph is None:
+            self._dependency_graph = TargetDependencyGraph.from_configuration(self)
+        return self._dependency_graph
+
+    def get_directory(self, source: Path) -> CMakeDirectory:
+        if self._lut_source_directory is None:
+            self._lut_source_directory = {directory.source: directory for directory in self.directories}
+        try:
+            return self._lut_source_directory[Path(source)]
+        except KeyError:
+            raise KeyError("Unknown directory")
+
+    def preload(self, executor: Optional[Executor] = None) -> None:
+        if executor is None:
+            for target in self.targets:
+                target.preload()
+            return
+        # Target files are independent: decode them concurrently and attach the results in codemodel order
+        targets = [target for target in self.targets if not target.loaded]
+        json_files = [target.jsonFile for target in targets]
+        reply_paths = [target.reply_path for target in targets]
+        # Threads share the intern table, worker processes receive an empty one (see InternTable.__reduce__).
+        # Targets of a capped cache have no table, and each get a new one.
+        interners = [target.interner for target in targets]
+        backtraces = [target.backtraces for target in targets]
+        fields = [target.fields for target in targets]
+        chunksize = max(1, len(targets) // PRELOAD_CHUNKS)
+        for target, target_data in zip(targets, executor.map(CodemodelTargetV2.from_path, json_files, reply_paths, interners,
+                                                             backtraces, fields, chunksize=chunksize)):
+            target.set_target(target_data)
+
+    def reuse_targets(self, previous: "CMakeConfiguration") -> int:
+        # Target reply file names contain a hash of their content: an unchanged name means an unchanged target.
+        # The parsed targets are taken up front, without counting as cache accesses: reusing targets can evict
+        # previous targets sharing the same target cache.
+        reusable = {target.jsonFile: (target.backtraces, target.fields, target._target)
+                    for target in previous.targets if target._target is not None}
+        reused = 0
+        for target in self.targets:
+            if target.loaded or target.jsonFile not in reusable:
+                continue
+            backtraces, fields, previous_target = reusable[target.jsonFile]
+            # Only reuse targets parsed the same way
+            if backtraces == target.backtraces and fields == target.fields:
+                target.set_target(previous_target)
+                if target.interner is not None:
+                    # Targets parsed after this share its objects, like in the previous codemodel
+                    previous_target.intern_into(target.interner)
+                reused += 1
+        return reused
 
     @classmethod
-    def from_dict(cls, dikt: dict[str, Any], reply_path: Path) -> "CMakeConfiguration":
+    def from_dict(cls, dikt: dict[str, Any], reply_path: Path, lazy: bool = False, executor: Optional[Executor] = None,
+                  previous: Optional["CMakeConfiguration"] = None, interner: Optional[InternTable] = None,
+                  backtraces: bool = True, fields: Optional[Iterable[str]] = None,
+                  cache: Optional[TargetCache] = None) -> "CMakeConfiguration":
         name = dikt["name"]
+        if interner is None:
+            interner = InternTable()
         directories = list(CMakeDirectory.from_dict(d) for d in dikt["directories"])
         projects = list(CMakeProject.from_dict(d) for d in dikt["projects"])
-        targets = list(CMakeTarget.from_dict(td, directories, projects, reply_path) for td in dikt["targets"])
-        lut_id_target = {target.target.id: target for target in targets}
+        # Validate the projection once, not per target
+        fields = target_fields(fields)
+        targets = list(CMakeTarget.from_dict(td, directories, projects, reply_path, interner, backtraces, fields, cache)
+                       for td in dikt["targets"])
+        lut_id_target = CMakeTargetLookup(targets)
         for target in targets:
             target.update_dependencies(lut_id_target)
 
@@ -141,6 +360,10 @@ class CMakeConfiguration:
         for d, directory in zip(dikt["directories"], directories):
             directory.update_from_dict(d, obj)
 
+        if previous is not None:
+            obj.reuse_targets(previous)
+        if not lazy:
+            obj.preload(executor=executor)
         return obj
 
     def __repr__(self) -> str:
@@ -156,34 +379,95 @@ class CMakeConfiguration:
 class CodemodelV2:
     KIND = ObjectKind.CODEMODEL
 
-    __slots__ = ("version", "paths", "configurations")
+    __slots__ = ("version", "paths", "configurations", "interner", "target_cache", "_lut_name_configuration",
+                 "_lut_name_source_index")
 
-    def __init__(self, version: VersionMajorMinor, paths: CMakeSourceBuildPaths, configurations: list[CMakeConfiguration]):
+    def __init__(self, version: VersionMajorMinor, paths: CMakeSourceBuildPaths, configurations: list[CMakeConfiguration],
+                 interner: Optional[InternTable] = None, target_cache: Optional[TargetCache] = None):
         self.version = version
         self.paths = paths
         self.configurations = configurations
+        # Shared by the targets of all configurations
+        self.interner = interner if interner is not None else InternTable()
+        self.target_cache = target_cache
+        self._lut_name_configuration: Optional[dict[str, CMakeConfiguration]] = None
+        self._lut_name_source_index: dict[str, SourceOwnershipIndex] = {}
+
+    def preload(self, executor: Optional[Executor] = None) -> None:
+        for configuration in self.configurations:
+            configuration.preload(executor=executor)
 
     @classmethod
-    def from_dict(cls, dikt: dict[str, Any], reply_path: Path) -> "CodemodelV2":
+    def from_dict(cls, dikt: dict[str, Any], reply_path: Path, lazy: bool = False, executor: Optional[Executor] = None,
+                  previous: Optional["CodemodelV2"] = None, backtraces: bool = True,
+                  fields: Optional[Iterable[str]] = None, max_targets: Optional[int] = None) -> "CodemodelV2":
         if dikt["kind"] != cls.KIND.value:
             raise ValueError
         paths = CMakeSourceBuildPaths.from_dict(dikt["paths"])
         version = VersionMajorMinor.from_dict(dikt["version"])
-        configurations = [CMakeConfiguration.from_dict(c_dikt, reply_path) for c_dikt in dikt["configurations"]]
-        return cls(version, paths, configurations)
+        previous_configurations = {c.name: c for c in previous.configurations} if previous is not None else {}
+        # A new table each time, the reused targets add their objects to it (see CMakeConfiguration.reuse_targets):
+        # the objects of targets that are gone are not kept alive across updates.
+        # With max_targets, the table only holds the codemodel's own strings (see CMakeTarget.from_dict).
+        interner = InternTable()
+        # One budget of resident targets for all configurations, the counters carry over to updated codemodels
+        target_cache = None
+        if max_targets is not None:
+            if previous is not None and previous.target_cache is not None and previous.target_cache.max_targets == max_targets:
+                target_cache = previous.target_cache
+            else:
+                target_cache = TargetCache(max_targets)
+        previous_targets: list[CMakeTarget] = []
+        if previous is not None and target_cache is not None:
+            # The targets of the previous codemodel are handed over: they no longer take up room (nor count as
+            # evicted) while the reused ones are added for the new codemodel
+            previous_targets = [target for configuration in previous.configurations for target in configuration.targets]
+            for target in previous_targets:
+                if target.cache is not None:
+                    target.cache.discard(target)
+        configurations = [CMakeConfiguration.from_dict(c_dikt, reply_path, lazy=lazy, executor=executor,
+                                                       previous=previous_configurations.get(c_dikt["name"]), interner=interner,
+                                                       backtraces=backtraces, fields=fields, cache=target_cache)
+                          for c_dikt in dikt["configurations"]]
+        # Then unloaded: a previous codemodel that is still used reads them again, within the same budget
+        for target in previous_targets:
+            target.unload()
+        return cls(version, paths, configurations, interner, target_cache)
 
     @classmethod
-    def from_path(cls, path: Path, reply_path: Path) -> "CodemodelV2":
-        with path.open() as file:
-            dikt = json.load(file)
-        return cls.from_dict(dikt, reply_path)
+    def from_path(cls, path: Path, reply_path: Path, lazy: bool = False, executor: Optional[Executor] = None,
+                  previous: Optional["CodemodelV2"] = None, backtraces: bool = True,
+                  fields: Optional[Iterable[str]] = None, max_targets: Optional[int] = None) -> "CodemodelV2":
+        dikt = load_json(path)
+        return cls.from_dict(dikt, reply_path, lazy=lazy, executor=executor, previous=previous, backtraces=backtraces,
+                             fields=fields, max_targets=max_targets)
+
+    def update(self, path: Path, reply_path: Path, lazy: bool = False, executor: Optional[Executor] = None,
+               backtraces: bool = True, fields: Optional[Iterable[str]] = None,
+               max_targets: Optional[int] = None) -> "CodemodelV2":
+        # Reuses the already parsed targets of this codemodel whose reply file did not change.
+        # Those are shared with, and relinked to, the new codemodel: afterwards their dependencies resolve to the
+        # targets of the new codemodel, also when reached through this one. Stop using this codemodel after an update.
+        return self.from_path(path, reply_path, lazy=lazy, executor=executor, previous=self, backtraces=backtraces,
+                              fields=fields, max_targets=max_targets)
 
     def get_configuration(self, name: str) -> CMakeConfiguration:
+        if self._lut_name_configuration is None:
+            self._lut_name_configuration = {c.name: c for c in self.configurations}
         try:
-            return next(c for c in self.configurations if c.name == name)
-        except StopIteration:
+            return self._lut_name_configuration[name]
+        except KeyError:
             raise KeyError("Unknown configuration")
 
+    def get_source_index(self, name: str) -> SourceOwnershipIndex:
+        # Relative source paths are relative to the top level source directory
+        try:
+            return self._lut_name_source_index[name]
+        except KeyError:
+            source_index = SourceOwnershipIndex.from_configuration(self.get_configuration(name), self.paths.source)
+            self._lut_name_source_index[name] = source_index
+            return source_index
+
     def __repr__(self) -> str:
         return "{}(version={}, paths={}, configurations={})".format(
             type(self).__name__,
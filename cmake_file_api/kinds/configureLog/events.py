@@ -0,0 +1,279 @@
+from pathlib import Path
+import re
+from typing import Any, BinaryIO, Iterable, Iterator, Optional, Union
+
+try:
+    import yaml
+    # The libyaml based loader is a lot faster, when available
+    _YamlLoader: Any = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+except ImportError:
+    yaml = None
+
+
+class ConfigureLogEvent:
+    # Events of unknown kinds only have the members shared by all events
+    __slots__ = ("kind", "run", "backtrace", "checks")
+
+    def __init__(self, kind: str, run: int, backtrace: list[str], checks: list[str]):
+        self.kind = kind
+        # Index of the configure run (the YAML document) in the log
+        self.run = run
+        self.backtrace = backtrace
+        self.checks = checks
+
+    @classmethod
+    def from_dict(cls, dikt: dict[str, Any], run: int) -> "ConfigureLogEvent":
+        kind = dikt["kind"]
+        backtrace = dikt.get("backtrace", [])
+        checks = dikt.get("checks", [])
+        return cls(kind, run, backtrace, checks)
+
+    def __repr__(self) -> str:
+        return "{}(kind='{}', run={}, checks={})".format(
+            type(self).__name__,
+            self.kind,
+            self.run,
+            self.checks,
+        )
+
+
+class MessageEvent(ConfigureLogEvent):
+    __slots__ = ("message", )
+
+    def __init__(self, kind: str, run: int, backtrace: list[str], checks: list[str], message: str):
+        super().__init__(kind, run, backtrace, checks)
+        self.message = message
+
+    @classmethod
+    def from_dict(cls, dikt: dict[str, Any], run: int) -> "MessageEvent":
+        kind = dikt["kind"]
+        backtrace = dikt.get("backtrace", [])
+        checks = dikt.get("checks", [])
+        message = dikt["message"]
+        return cls(kind, run, backtrace, checks, message)
+
+
+class TryDirectories:
+    __slots__ = ("source", "binary")
+
+    def __init__(self, source: Path, binary: Path):
+        self.source = source
+        self.binary = binary
+
+    @classmethod
+    def from_dict(cls, dikt: dict[str, Any]) -> "TryDirectories":
+        source = Path(dikt["source"])
+        binary = Path(dikt["binary"])
+        return cls(source, binary)
+
+    def __repr__(self) -> str:
+        return "{}(source='{}', binary='{}')".format(
+            type(self).__name__,
+            self.source,
+            self.binary,
+        )
+
+
+class TryResult:
+    __slots__ = ("variable", "cached", "stdout", "stderr", "exitCode")
+
+    def __init__(self, variable: Optional[str], cached: bool, stdout: Optional[str], stderr: Optional[str],
+                 exitCode: Union[int, str, None]):
+        self.variable = variable
+        self.cached = cached
+        self.stdout = stdout
+        # Only for run results, when the output was not captured together with stdout
+        self.stderr = stderr
+        # "failed_to_run" when the executable could not be run
+        self.exitCode = exitCode
+
+    @classmethod
+    def from_dict(cls, dikt: dict[str, Any]) -> "TryResult":
+        variable = dikt.get("variable")
+        cached = dikt.get("cached", False)
+        stdout = dikt.get("stdout")
+        stderr = dikt.get("stderr")
+        exitCode = dikt.get("exitCode")
+        return cls(variable, cached, stdout, stderr, exitCode)
+
+    def __repr__(self) -> str:
+        return "{}(variable={}, cached={}, exitCode={})".format(
+            type(self).__name__,
+            "'{}'".format(self.variable) if self.variable is not None else None,
+            self.cached,
+            self.exitCode,
+        )
+
+
+class TryCompileEvent(ConfigureLogEvent):
+    __slots__ = ("description", "directories", "cmakeVariables", "buildResult")
+
+    def __init__(self, kind: str, run: int, backtrace: list[str], checks: list[str], description: Optional[str],
+                 directories: TryDirectories, cmakeVariables: dict[str, str], buildResult: TryResult):
+        super().__init__(kind, run, backtrace, checks)
+        self.description = description
+        self.directories = directories
+        self.cmakeVariables = cmakeVariables
+        self.buildResult = buildResult
+
+    @classmethod
+    def from_dict(cls, dikt: dict[str, Any], run: int) -> "TryCompileEvent":
+        kind = dikt["kind"]
+        backtrace = dikt.get("backtrace", [])
+        checks = dikt.get("checks", [])
+        description = dikt.get("description")
+        directories = TryDirectories.from_dict(dikt["directories"])
+        cmakeVariables = dikt.get("cmakeVariables", {})
+        buildResult = TryResult.from_dict(dikt["buildResult"])
+        return cls(kind, run, backtrace, checks, description, directories, cmakeVariables, buildResult)
+
+    def __repr__(self) -> str:
+        return "{}(kind='{}', run={}, checks={}, buildResult={})".format(
+            type(self).__name__,
+            self.kind,
+            self.run,
+            self.checks,
+            self.buildResult,
+        )
+
+
+class TryRunEvent(TryCompileEvent):
+    __slots__ = ("runResult", )
+
+    def __init__(self, kind: str, run: int, backtrace: list[str], checks: list[str], description: Optional[str],
+                 directories: TryDirectories, cmakeVariables: dict[str, str], buildResult: TryResult,
+                 runResult: Optional[TryResult]):
+        super().__init__(kind, run, backtrace, checks, description, directories, cmakeVariables, buildResult)
+        # Missing when the build failed
+        self.runResult = runResult
+
+    @classmethod
+    def from_dict(cls, dikt: dict[str, Any], run: int) -> "TryRunEvent":
+        kind = dikt["kind"]
+        backtrace = dikt.get("backtrace", [])
+        checks = dikt.get("checks", [])
+        description = dikt.get("description")
+        directories = TryDirectories.from_dict(dikt["directories"])
+        cmakeVariables = dikt.get("cmakeVariables", {})
+        buildResult = TryResult.from_dict(dikt["buildResult"])
+        runResult = TryResult.from_dict(dikt["runResult"]) if "runResult" in dikt else None
+        return cls(kind, run, backtrace, checks, description, directories, cmakeVariables, buildResult, runResult)
+
+    def __repr__(self) -> str:
+        return "{}(kind='{}', run={}, checks={}, buildResult={}, runResult={})".format(
+            type(self).__name__,
+            self.kind,
+            self.run,
+            self.checks,
+            self.buildResult,
+            self.runResult,
+        )
+
+
+CONFIGURE_LOG_EVENTS: dict[str, type[ConfigureLogEvent]] = {
+    "message-v1": MessageEvent,
+    "try_compile-v1": TryCompileEvent,
+    "try_run-v1": TryRunEvent,
+}
+
+
+class ConfigureLogRecord:
+    # An unparsed event: where it is in the log, and its text
+    __slots__ = ("kind", "run", "offset", "data")
+
+    def __init__(self, kind: str, run: int, offset: int, data: bytes):
+        self.kind = kind
+        self.run = run
+        self.offset = offset
+        self.data = data
+
+    def parse(self) -> ConfigureLogEvent:
+        if yaml is None:
+            raise ImportError("Reading configure log events requires PyYAML: pip install cmake-file-api[yaml]")
+        # The record is a YAML sequence holding one event
+        dikt = yaml.load(self.data, Loader=_YamlLoader)[0]
+        return CONFIGURE_LOG_EVENTS.get(self.kind, ConfigureLogEvent).from_dict(dikt, self.run)
+
+    def __repr__(self) -> str:
+        return "{}(kind='{}', run={}, offset={}, #bytes={})".format(
+            type(self).__name__,
+            self.kind,
+            self.run,
+            self.offset,
+            len(self.data),
+        )
+
+
+# Lines starting an event, or a document start/end or the events key.
+# Matching the preceding newline is a lot faster than a multiline `^`.
+_RECORD_BOUNDARY = re.compile(rb"\n(?:  -|[^ \r\n])")
+
+# Size of the blocks read from the log
+SCAN_BLOCK_SIZE = 1 << 20
+
+
+def _record_kind(data: bytes) -> Optional[str]:
+    # CMake writes the kind as the first member of an event: `    kind: "try_compile-v1"`
+    for line in data.split(b"\n", 2)[:2]:
+        key, sep, value = line.strip().lstrip(b"- ").partition(b":")
+        if sep and key == b"kind":
+            return value.strip().strip(b"\"'").decode()
+    return None
+
+
+def scan_configure_log(fp: BinaryIO, kinds: Optional[Iterable[str]] = None, offset: int = 0,
+                       run: int = -1) -> Iterator[ConfigureLogRecord]:
+    # CMake appends a YAML document per configure run:
+    #
+    # ---
+    # events:
+    #   -
+    #     kind: "message-v1"
+    #     ...
+    # ...
+    #
+    # Events only start at an indentation of two spaces, block scalars inside events are indented further.
+    # The log is read in blocks, which are only searched for those boundaries: only the text of the requested
+    # kinds is copied out (and parsed by the caller).
+    # A trailing event of a configure run that is still being written is not yielded.
+    # Scanning can resume at the offset of a document or event, `run` is the index of the document before it.
+    kinds = frozenset(kinds) if kinds is not None else None
+    fp.seek(offset)
+    # The buffer always starts with the newline ending the line before it
+    buffer = b"\n"
+    # Log offset of the buffer, start of the pending event in the buffer, and the end of the searched lines
+    base = offset - 1
+    start: Optional[int] = None
+    searched = 1
+    while True:
+        block = fp.read(SCAN_BLOCK_SIZE)
+        if not block:
+            break
+        buffer += block
+        end = buffer.rfind(b"\n") + 1
+        for match in _RECORD_BOUNDARY.finditer(buffer, searched - 1, end):
+            boundary = match.start() + 1
+            if start is not None:
+                kind = _record_kind(buffer[start:min(boundary, start + 512)])
+                if kind is not None and (kinds is None or kind in kinds):
+                    yield ConfigureLogRecord(kind, run, base + start, buffer[start:boundary])
+            if match.group() == b"\n  -":
+                start = boundary
+                continue
+            start = None
+            if buffer.startswith(b"---", boundary):
+                run += 1
+        searched = end
+        keep = (start if start is not None else end) - 1
+        buffer = buffer[keep:]
+        base += keep
+        searched -= keep
+        if start is not None:
+            start = 1
+
+
+def read_configure_log(path: Path, kinds: Optional[Iterable[str]] = None) -> Iterator[ConfigureLogEvent]:
+    # Events are read and parsed one at a time, events of other kinds are never parsed
+    with open(path, "rb") as fp:
+        for record in scan_configure_log(fp, kinds):
+            yield record.parse()
@@ -0,0 +1,243 @@
+import gc
+import hashlib
+import json
+import mmap
+import os
+from pathlib import Path
+import re
+import tempfile
+from typing import Any, BinaryIO, Optional, Union
+
+from cmake_file_api.json_decode import loads_json
+from .events import ConfigureLogEvent, ConfigureLogRecord, scan_configure_log
+
+# Number of bytes at the start of the log used to recognize a log that was replaced instead of appended to
+HEAD_SIZE = 4096
+
+
+# Members of an event, items of the checks, and members of the results
+_SECTION = re.compile(rb"\n    (\w+):")
+_CHECK = re.compile(rb"\n      - ([^\n]*)")
+_RESULT_MEMBER = re.compile(rb"\n      (variable|exitCode): ([^\n]*)")
+
+
+def _scalar(value: bytes) -> Union[str, int, None]:
+    # The scalars written by CMake: double quoted strings, integers and plain words
+    value = value.strip()
+    if value.startswith(b"\""):
+        if b"\\" not in value:
+            return value[1:-1].decode()
+        try:
+            return json.loads(value)  # type: ignore[no-any-return]
+        except ValueError:
+            return value[1:-1].decode()
+    try:
+        return int(value)
+    except ValueError:
+        return value.decode() if value else None
+
+
+class ConfigureLogIndexEntry:
+    __slots__ = ("offset", "length", "run", "kind", "checks", "variable", "exitCode", "runVariable", "runExitCode")
+
+    def __init__(self, offset: int, length: int, run: int, kind: str, checks: list[str], variable: Optional[str],
+                 exitCode: Union[int, str, None], runVariable: Optional[str], runExitCode: Union[int, str, None]):
+        # Location of the event in the log
+        self.offset = offset
+        self.length = length
+        self.run = run
+        self.kind = kind
+        self.checks = checks
+        # Of buildResult and runResult
+        self.variable = variable
+        self.exitCode = exitCode
+        self.runVariable = runVariable
+        self.runExitCode = runExitCode
+
+    @classmethod
+    def from_record(cls, record: ConfigureLogRecord) -> "ConfigureLogIndexEntry":
+        # Only the members needed for lookups are picked from the event text, without a YAML parse.
+        # The members of an event are indented by four spaces, their items (and result members) by six.
+        data = record.data
+        checks: list[str] = []
+        results: dict[bytes, dict[bytes, Any]] = {}
+        sections = list(_SECTION.finditer(data))
+        for section, next_section in zip(sections, sections[1:] + [None]):
+            name = section.group(1)
+            if name not in (b"checks", b"buildResult", b"runResult"):
+                continue
+            end = next_section.start() if next_section is not None else len(data)
+            if name == b"checks":
+                checks = [str(_scalar(m.group(1))) for m in _CHECK.finditer(data, section.end(), end)]
+            else:
+                results[name] = {m.group(1): _scalar(m.group(2)) for m in _RESULT_MEMBER.finditer(data, section.end(), end)}
+        build = results.get(b"buildResult", {})
+        run = results.get(b"runResult", {})
+        variable = build.get(b"variable")
+        runVariable = run.get(b"variable")
+        return cls(record.offset, len(data), record.run, record.kind, checks,
+                   str(variable) if variable is not None else None, build.get(b"exitCode"),
+                   str(runVariable) if runVariable is not None else None, run.get(b"exitCode"))
+
+    @classmethod
+    def from_list(cls, values: list[Any]) -> "ConfigureLogIndexEntry":
+        return cls(*values)
+
+    def to_list(self) -> list[Any]:
+        return [self.offset, self.length, self.run, self.kind, self.checks, self.variable, self.exitCode,
+                self.runVariable, self.runExitCode]
+
+    def __repr__(self) -> str:
+        return "{}(kind='{}', run={}, offset={}, checks={}, variable={}, exitCode={})".format(
+            type(self).__name__,
+            self.kind,
+            self.run,
+            self.offset,
+            self.checks,
+            "'{}'".format(self.variable) if self.variable is not None else None,
+            self.exitCode,
+        )
+
+
+class ConfigureLogIndex:
+    __slots__ = ("log_path", "index_path", "entries", "_head", "_offset", "_run", "_file", "_mmap")
+
+    VERSION = 1
+
+    def __init__(self, log_path: Path, index_path: Optional[Path] = None):
+        self.log_path = log_path
+        self.index_path = index_path if index_path is not None else log_path.with_name(log_path.name + ".index.json")
+        self.entries: list[ConfigureLogIndexEntry] = []
+        # Hash of the start of the indexed log, and where (and in which run) indexing continues
+        self._head = ""
+        self._offset = 0
+        self._run = -1
+        self._file: Optional[BinaryIO] = None
+        self._mmap: Optional[mmap.mmap] = None
+
+    @classmethod
+    def open(cls, log_path: Path, index_path: Optional[Path] = None) -> "ConfigureLogIndex":
+        # Loads the index stored next to the log (or at index_path), and indexes what CMake appended since
+        index = cls(log_path, index_path)
+        index._load()
+        index.update()
+        return index
+
+    def _load(self) -> None:
+        # Creating this many objects at once would otherwise trigger many useless gc passes
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            dikt = loads_json(self.index_path.read_bytes())
+            if dikt["version"] != self.VERSION:
+                return
+            entries = [ConfigureLogIndexEntry.from_list(e) for e in dikt["entries"]]
+            head, offset, run = dikt["head"], dikt["offset"], dikt["run"]
+        except (OSError, ValueError, KeyError, TypeError):
+            # Missing, or written by an incompatible version: the log is indexed again
+            return
+        finally:
+            if gc_enabled:
+                gc.enable()
+        self.entries, self._head, self._offset, self._run = entries, head, offset, run
+
+    def save(self) -> None:
+        dikt = {
+            "version": self.VERSION,
+            "head": self._head,
+            "offset": self._offset,
+            "run": self._run,
+            "entries": [entry.to_list() for entry in self.entries],
+        }
+        fd, tmp_name = tempfile.mkstemp(dir=self.index_path.parent, prefix=self.index_path.name, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                file.write(json.dumps(dikt, separators=(",", ":")))
+            os.replace(tmp_name, self.index_path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+    @staticmethod
+    def _hash_head(fp: BinaryIO, size: int) -> str:
+        fp.seek(0)
+        return "{}:{}".format(size, hashlib.sha256(fp.read(size)).hexdigest())
+
+    def update(self) -> int:
+        # CMake only appends to the log: continue after the last indexed event.
+        # A log that shrank or starts differently was replaced (e.g. a fresh build directory): index it again.
+        self.close()
+        with open(self.log_path, "rb") as fp:
+            size = os.fstat(fp.fileno()).st_size
+            head_size = int(self._head.split(":", 1)[0]) if self._head else 0
+            if size < self._offset or not self._head or self._hash_head(fp, head_size) != self._head:
+                self.entries, self._offset, self._run = [], 0, -1
+            head = self._hash_head(fp, min(size, HEAD_SIZE))
+            count = 0
+            for record in scan_configure_log(fp, offset=self._offset, run=self._run):
+                self.entries.append(ConfigureLogIndexEntry.from_record(record))
+                self._offset = record.offset + len(record.data)
+                self._run = record.run
+                count += 1
+        if count or head != self._head:
+            self._head = head
+            self.save()
+        return count
+
+    @property
+    def runs(self) -> int:
+        # Configure runs that logged events
+        return self.entries[-1].run + 1 if self.entries else 0
+
+    def find(self, kind: Optional[str] = None, check: Optional[str] = None, variable: Optional[str] = None,
+             run: Optional[int] = None) -> list[ConfigureLogIndexEntry]:
+        # A negative run counts from the last run, -1 being the last one
+        if run is not None and run < 0:
+            run += self.runs
+        return [entry for entry in self.entries
+                if (kind is None or entry.kind == kind)
+                and (check is None or check in entry.checks)
+                and (variable is None or variable in (entry.variable, entry.runVariable))
+                and (run is None or entry.run == run)]
+
+    def last(self, kind: Optional[str] = None, check: Optional[str] = None,
+             variable: Optional[str] = None) -> Optional[ConfigureLogIndexEntry]:
+        # The most recent matching event, of any run
+        entries = self.find(kind, check, variable)
+        return entries[-1] if entries else None
+
+    def record(self, entry: ConfigureLogIndexEntry) -> ConfigureLogRecord:
+        # The log is mapped once, events are sliced out of it without reading anything else
+        if self._mmap is None or len(self._mmap) < entry.offset + entry.length:
+            self.close()
+            self._file = open(self.log_path, "rb")
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return ConfigureLogRecord(entry.kind, entry.run, entry.offset, self._mmap[entry.offset:entry.offset + entry.length])
+
+    def read(self, entry: ConfigureLogIndexEntry) -> ConfigureLogEvent:
+        return self.record(entry).parse()
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "ConfigureLogIndex":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __repr__(self) -> str:
+        return "{}(log_path='{}', #entries={}, runs={})".format(
+            type(self).__name__,
+            self.log_path,
+            len(self.entries),
+            self.runs,
+        )
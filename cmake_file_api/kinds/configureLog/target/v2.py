@@ -1,8 +1,8 @@
 import enum
-import json
 from pathlib import Path
 from typing import Any, Optional
 
+from cmake_file_api.json_decode import load_json
 from cmake_file_api.kinds.common import CMakeSourceBuildPaths
 
 
@@ -222,7 +222,7 @@ class TargetSourceGroup:
 
     def __init__(self, name: str, sources: list["TargetSource"]):
         self.name = name
-        self.sources: list[TargetSource] = []
+        self.sources = sources
 
     @classmethod
     def from_dict(cls, dikt: dict[str, Any], target_sources: list["TargetSource"]) -> "TargetSourceGroup":
@@ -424,8 +424,9 @@ class TargetSource:
             self.path,
             self.isGenerated,
             self.backtrace,
-            self.compileGroup,
-            self.sourceGroup,
+            # Only name the groups: their reprs list this source again
+            f"'{self.compileGroup.language}'" if self.compileGroup else None,
+            f"'{self.sourceGroup.name}'" if self.sourceGroup else None,
         )
 
 
@@ -493,13 +494,15 @@ class CodemodelTargetV2:
         sourceGroups = list(TargetSourceGroup.from_dict(tsg, sources) for tsg in dikt.get("sourceGroups", ()))
         compileGroups = list(TargetCompileGroup.from_dict(tsg, sources, backtraceGraph) for tsg in dikt.get("compileGroups", ()))
 
-        return cls(name, id, type, backtrace, folder, paths, nameOnDisk, artifacts,
-                   isGeneratorProvided, install, link, archive, dependencies, sources, sourceGroups, compileGroups)
+        obj = cls(name, id, type, backtrace, folder, paths, nameOnDisk, artifacts,
+                  isGeneratorProvided, install, link, archive, dependencies, sources, sourceGroups, compileGroups)
+        for ts_dikt, source in zip(dikt["sources"], sources):
+            source.update_from_dict(ts_dikt, obj)
+        return obj
 
     @classmethod
     def from_path(cls, path: Path) -> "CodemodelTargetV2":
-        with path.open() as file:
-            dikt = json.load(file)
+        dikt = load_json(path)
         return cls.from_dict(dikt)
 
     def __repr__(self) -> str:
@@ -1,9 +1,11 @@
-import json
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable, Iterator, Optional
 
+from cmake_file_api.json_decode import load_json
 from cmake_file_api.kinds.common import VersionMajorMinor
 from cmake_file_api.kinds.kind import ObjectKind
+from .events import ConfigureLogEvent, read_configure_log
+from .index import ConfigureLogIndex
 
 
 class ConfigureLogV1:
@@ -27,10 +29,17 @@ class ConfigureLogV1:
 
     @classmethod
     def from_path(cls, path: Path, reply_path: Path) -> "ConfigureLogV1":
-        with path.open() as file:
-            dikt = json.load(file)
+        dikt = load_json(path)
         return cls.from_dict(dikt, reply_path)
 
+    def events(self, kinds: Optional[Iterable[str]] = None) -> Iterator[ConfigureLogEvent]:
+        # Streams the events of all configure runs in the log, oldest first
+        return read_configure_log(self.path, kinds)
+
+    def index(self, index_path: Optional[Path] = None) -> ConfigureLogIndex:
+        # Byte offsets of all events, stored next to the log unless index_path is given
+        return ConfigureLogIndex.open(self.path, index_path)
+
     def __repr__(self) -> str:
         return "{}(version={}, paths={}, configurations={})".format(
             type(self).__name__,
@@ -0,0 +1,46 @@
+from pathlib import Path
+from typing import Any, Hashable, TypeVar
+
+T = TypeVar("T", bound=Hashable)
+
+
+class InternTable:
+    __slots__ = ("_paths", "_strings", "_objects")
+
+    def __init__(self) -> None:
+        self._paths: dict[str, Path] = {}
+        self._strings: dict[str, str] = {}
+        self._objects: dict[Any, Any] = {}
+
+    def path(self, text: str) -> Path:
+        # A dict lookup is also a lot cheaper than parsing the same path again
+        try:
+            return self._paths[text]
+        except KeyError:
+            return self._paths.setdefault(text, Path(text))
+
+    def add_path(self, path: Path) -> None:
+        # For paths interned by another table: later lookups of the same text return this object
+        self._paths.setdefault(str(path), path)
+
+    def string(self, text: str) -> str:
+        return self._strings.setdefault(text, text)
+
+    def object(self, obj: T) -> T:
+        # Immutable, hashable model objects (e.g. compile settings)
+        return self._objects.setdefault(obj, obj)  # type: ignore[no-any-return]
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        # Never copy the table to another process (or into a pickle): it starts out empty there
+        return type(self), ()
+
+    def __len__(self) -> int:
+        return len(self._paths) + len(self._strings) + len(self._objects)
+
+    def __repr__(self) -> str:
+        return "{}(#paths={}, #strings={}, #objects={})".format(
+            type(self).__name__,
+            len(self._paths),
+            len(self._strings),
+            len(self._objects),
+        )
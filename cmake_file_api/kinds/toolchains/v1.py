@@ -1,7 +1,9 @@
+import hashlib
 import json
 from pathlib import Path
 from typing import Any, Optional
 
+from cmake_file_api.json_decode import load_json
 from cmake_file_api.kinds.common import VersionMajorMinor
 from cmake_file_api.kinds.kind import ObjectKind
 
@@ -25,9 +27,17 @@ class CMakeToolchainCompilerImplicit:
         if "linkFrameworkDirectories" in dikt:
             res.linkFrameworkDirectories.extend(Path(p) for p in dikt["linkFrameworkDirectories"])
         if "linkLibraries" in dikt:
-            res.linkFrameworkDirectories.extend(dikt["linkLibraries"])
+            res.linkLibraries.extend(dikt["linkLibraries"])
         return res
 
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "includeDirectories": [str(p) for p in self.includeDirectories],
+            "linkDirectories": [str(p) for p in self.linkDirectories],
+            "linkFrameworkDirectories": [str(p) for p in self.linkFrameworkDirectories],
+            "linkLibraries": self.linkLibraries,
+        }
+
 
 class CMakeToolchainCompiler:
     __slots__ = ("id", "path", "target", "version", "implicit")
@@ -48,6 +58,15 @@ class CMakeToolchainCompiler:
         implicit = CMakeToolchainCompilerImplicit.from_dict(dikt.get("implicit", {}))
         return cls(id, path, target, version, implicit)
 
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "path": str(self.path) if self.path is not None else None,
+            "target": self.target,
+            "version": self.version,
+            "implicit": self.implicit.to_dict(),
+        }
+
     def __repr__(self) -> str:
         return "{}(id='{}', path='{}', target='{}', version='{}')".format(
             type(self).__name__,
@@ -74,6 +93,13 @@ class CMakeToolchain:
 
         return cls(language, compiler, sourceFileExtensions)
 
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "language": self.language,
+            "compiler": self.compiler.to_dict(),
+            "sourceFileExtensions": self.sourceFileExtensions,
+        }
+
     def __repr__(self) -> str:
         return "{}(language='{}', compiler='{}')".format(
             type(self).__name__,
@@ -99,10 +125,22 @@ class ToolchainsV1:
 
     @classmethod
     def from_path(cls, path: Path, reply_path: Path) -> "ToolchainsV1":
-        with path.open() as file:
-            dikt = json.load(file)
+        dikt = load_json(path)
         return cls.from_dict(dikt, reply_path)
 
+    def get_toolchain(self, language: str) -> CMakeToolchain:
+        for toolchain in self.toolchains:
+            if toolchain.language == language:
+                return toolchain
+        raise KeyError("Unknown language")
+
+    def fingerprint(self) -> str:
+        # Equal for build trees using the same compilers: only the detected toolchain facts are hashed,
+        # in a canonical form (toolchains sorted by language) that does not depend on the reply version
+        toolchains = sorted((toolchain.to_dict() for toolchain in self.toolchains), key=lambda t: t["language"])
+        data = json.dumps(toolchains, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(data.encode()).hexdigest()
+
     def __repr__(self) -> str:
         return "{}(version={}, inputs={})".format(
             type(self).__name__,
@@ -0,0 +1,249 @@
+from __future__ import annotations
+from pathlib import Path
+import re
+from typing import Iterable, Optional, Union
+
+from .cmake_cache import CMakeCacheFile
+from .kinds.configureLog.events import ConfigureLogEvent, TryCompileEvent, TryRunEvent
+from .kinds.configureLog.v1 import ConfigureLogV1
+from .kinds.toolchains.v1 import ToolchainsV1
+
+PathLike = Union[Path, str]
+
+# Variables set by CMake's own compiler detection, not by configure checks
+CMAKE_VARIABLE_PREFIX = "CMAKE_"
+
+# Start of the check messages of the modules whose whole result is the cached try_compile/try_run variable:
+# check_include_file(s), check_symbol_exists, check_function_exists, check_library_exists, check_variable_exists,
+# check_source_compiles/runs (and the modules using these, like check_compiler_flag) and check_prototype_definition.
+# Other modules also read the result of the build: check_type_size ("Check size of ...") and test_big_endian
+# try_compile(HAVE_<VAR>) and read the size out of the compiled binary. Preloading HAVE_<VAR> would skip that, and
+# leave <VAR> unset.
+SINGLE_RESULT_CHECKS = ("Looking for ", "Performing Test ", "Checking prototype ")
+
+# check_source_compiles (and check_compiler_flag, check_linker_flag, ...) also fail a successful build whose output
+# matches one of its FAIL_REGEX, e.g. for warnings about unknown flags: the exit code alone does not give the result.
+FAIL_REGEX_CHECKS = ("Performing Test ", )
+
+
+def cmake_quote(text: str) -> str:
+    # A quoted argument of the CMake language, without variable references
+    return "\"{}\"".format(text.replace("\\", "\\\\").replace("\"", "\\\"").replace("$", "\\$"))
+
+
+def cache_set(name: str, value: str, type: str, description: str) -> str:
+    return "set({} {} CACHE {} {})".format(name, cmake_quote(value), type, cmake_quote(description))
+
+
+class CheckResult:
+    __slots__ = ("variable", "value", "kind", "checks", "run")
+
+    def __init__(self, variable: str, value: str, kind: str, checks: list[str], run: int):
+        # The cache variable of the check, and the value the check module gives it ("1" or "")
+        self.variable = variable
+        self.value = value
+        self.kind = kind
+        self.checks = checks
+        self.run = run
+
+    @classmethod
+    def from_event(cls, event: ConfigureLogEvent, cache: Optional[CMakeCacheFile] = None) -> Optional[CheckResult]:
+        # The check modules (check_include_file, check_source_compiles, ...) store the try_compile result
+        # variable in the cache, and skip the check when it is defined.
+        # check_source_runs uses try_run(<var>_EXITCODE <var>_COMPILED), and caches <var>.
+        # Pending checks are listed most recent first: the first one is the check that ran the event.
+        # With the CMakeCache.txt of the same build tree, the value is the one the check module stored.
+        if not event.checks or not event.checks[0].startswith(SINGLE_RESULT_CHECKS):
+            return None
+        if isinstance(event, TryRunEvent):
+            runResult = event.runResult
+            variable = event.buildResult.variable
+            if runResult is None or runResult.variable is None or variable is None or not runResult.variable.endswith("_EXITCODE"):
+                return None
+            check_variable = runResult.variable[:-len("_EXITCODE")]
+            if variable != check_variable + "_COMPILED":
+                return None
+            succeeded = event.buildResult.exitCode == 0 and runResult.exitCode == 0
+            variable, value = check_variable, "1" if succeeded else ""
+        elif isinstance(event, TryCompileEvent):
+            variable = event.buildResult.variable
+            if variable is None or not event.buildResult.cached or variable.startswith(CMAKE_VARIABLE_PREFIX):
+                return None
+            if cache is None and event.checks[0].startswith(FAIL_REGEX_CHECKS):
+                return None
+            value = "1" if event.buildResult.exitCode == 0 else ""
+        else:
+            return None
+        if cache is not None:
+            cached_value = cache.get(variable)
+            if cached_value is None:
+                # Removed from the cache since: the check runs again
+                return None
+            value = cached_value
+        return cls(variable, value, event.kind, event.checks, event.run)
+
+    def __repr__(self) -> str:
+        return "{}(variable='{}', value='{}', checks={})".format(
+            type(self).__name__,
+            self.variable,
+            self.value,
+            self.checks,
+        )
+
+
+class CheckPreload:
+    __slots__ = ("results", "fingerprint")
+
+    def __init__(self, results: dict[str, CheckResult], fingerprint: Optional[str] = None):
+        self.results = results
+        # Identifies the toolchain the checks ran with: only preload build trees using the same one
+        self.fingerprint = fingerprint
+
+    @classmethod
+    def from_events(cls, events: Iterable[ConfigureLogEvent], fingerprint: Optional[str] = None,
+                    cache: Optional[CMakeCacheFile] = None) -> CheckPreload:
+        # Events are in log order: the result of the latest run of a check wins
+        results: dict[str, CheckResult] = {}
+        for event in events:
+            result = CheckResult.from_event(event, cache)
+            if result is not None:
+                results.pop(result.variable, None)
+                results[result.variable] = result
+        return cls(results, fingerprint)
+
+    @classmethod
+    def from_configure_log(cls, configure_log: ConfigureLogV1, fingerprint: Optional[str] = None,
+                           cache: Optional[CMakeCacheFile] = None) -> CheckPreload:
+        return cls.from_events(configure_log.events(kinds=("try_compile-v1", "try_run-v1")), fingerprint, cache)
+
+    def script(self) -> str:
+        # An initial cache script, for `cmake -C`
+        lines = ["# Configure check results, preloaded with cmake -C"]
+        if self.fingerprint is not None:
+            lines.append("# Toolchain fingerprint: {}".format(self.fingerprint))
+        for result in self.results.values():
+            description = result.checks[0] if result.checks else result.variable
+            lines.append(cache_set(result.variable, result.value, "INTERNAL", description))
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: PathLike) -> None:
+        with open(path, "w", encoding="utf-8") as fp:
+            fp.write(self.script())
+
+    def __repr__(self) -> str:
+        return "{}(#results={}, fingerprint={})".format(
+            type(self).__name__,
+            len(self.results),
+            "'{}'".format(self.fingerprint) if self.fingerprint is not None else None,
+        )
+
+
+# set() commands outside of blocks, with one (quoted) argument, as written by CMake in CMake<LANG>Compiler.cmake
+_COMPILER_FILE_SET = re.compile(r'set\((\w+) ("(?:[^"\\]|\\.)*"|[^\s"()]*)\)')
+_COMPILER_FILE_BLOCK_START = re.compile(r"(if|foreach|while|function|macro)\s*\(")
+_COMPILER_FILE_BLOCK_END = re.compile(r"end(if|foreach|while|function|macro)\s*\(")
+_ESCAPE = re.compile(r"\\(.)")
+
+# Tools found with find_program, cached as file paths
+COMPILER_FILE_TOOLS = ("CMAKE_AR", "CMAKE_RANLIB", "CMAKE_LINKER", "CMAKE_MT")
+
+
+def read_compiler_file(path: PathLike) -> dict[str, str]:
+    # The results of compiler detection, stored by CMake in CMakeFiles/<version>/CMake<LANG>Compiler.cmake.
+    # The variables set inside blocks are derived from the others.
+    variables: dict[str, str] = {}
+    depth = 0
+    with open(path, encoding="utf-8") as fp:
+        for line in fp:
+            line = line.strip()
+            if _COMPILER_FILE_BLOCK_END.match(line):
+                depth -= 1
+            elif _COMPILER_FILE_BLOCK_START.match(line):
+                depth += 1
+            elif depth == 0:
+                match = _COMPILER_FILE_SET.fullmatch(line)
+                if match is not None:
+                    value = match.group(2)
+                    if value.startswith("\""):
+                        value = _ESCAPE.sub(r"\1", value[1:-1])
+                    variables[match.group(1)] = value
+    return variables
+
+
+class CompilerPreload:
+    __slots__ = ("toolchains", "compilers")
+
+    def __init__(self, toolchains: ToolchainsV1, compilers: Optional[dict[str, dict[str, str]]] = None):
+        self.toolchains = toolchains
+        # Per language, the variables of CMake<LANG>Compiler.cmake of a build tree using these compilers
+        # (see from_build_tree). Compiler detection and checks are skipped for these languages.
+        self.compilers = compilers if compilers is not None else {}
+
+    @classmethod
+    def from_build_tree(cls, toolchains: ToolchainsV1, build_path: PathLike, cmake_version: str) -> CompilerPreload:
+        # cmake_version is the version of CMake that configured the build tree (CMakeReplyFileV1.cmake.version.string)
+        platform_path = Path(build_path) / "CMakeFiles" / cmake_version
+        compilers: dict[str, dict[str, str]] = {}
+        for toolchain in toolchains.toolchains:
+            language = toolchain.language
+            if toolchain.compiler.path is None:
+                continue
+            variables = read_compiler_file(platform_path / f"CMake{language}Compiler.cmake")
+            compiler = variables.get(f"CMAKE_{language}_COMPILER")
+            if compiler is None or Path(compiler) != toolchain.compiler.path:
+                raise ValueError("The {} compiler of the build tree does not match the toolchains reply".format(language))
+            compilers[language] = variables
+        return cls(toolchains, compilers)
+
+    @property
+    def fingerprint(self) -> str:
+        return self.toolchains.fingerprint()
+
+    def script(self) -> str:
+        # An initial cache script, for `cmake -C`. It selects the compilers of the toolchains reply, which skips
+        # looking them up. The toolchains reply does not contain all results of compiler detection (e.g. the default
+        # language standards or the compile features), so detection and the compiler checks still run.
+        # For the languages read from a build tree, all results of compiler detection are preloaded, and the compiler
+        # is forced: CMake then skips detection and the checks. It writes its CMake<LANG>Compiler.cmake from the
+        # preloaded values, so the compile features, CMAKE_SIZEOF_VOID_P, ... are the same as in that build tree.
+        lines = [
+            "# Compiler detection results, preloaded with cmake -C",
+            "# Toolchain fingerprint: {}".format(self.fingerprint),
+        ]
+        # The tools (CMAKE_AR, ...) are shared by the languages
+        preloaded: set[str] = set()
+        for toolchain in self.toolchains.toolchains:
+            language = toolchain.language
+            compiler = toolchain.compiler
+            if compiler.path is None:
+                continue
+            lines.append("# {}: {} {}".format(language, compiler.id, compiler.version))
+            lines.append(cache_set(f"CMAKE_{language}_COMPILER", str(compiler.path), "FILEPATH", f"{language} compiler"))
+            if compiler.target is not None:
+                lines.append(cache_set(f"CMAKE_{language}_COMPILER_TARGET", compiler.target, "STRING", f"{language} compiler target"))
+            variables = self.compilers.get(language)
+            if variables is None:
+                continue
+            lines.append(cache_set(f"CMAKE_{language}_COMPILER_FORCED", "TRUE", "INTERNAL", f"{language} compiler is known to work"))
+            tools = COMPILER_FILE_TOOLS + (f"CMAKE_{language}_COMPILER_AR", f"CMAKE_{language}_COMPILER_RANLIB")
+            for name, value in variables.items():
+                if name == f"CMAKE_{language}_COMPILER" or name in preloaded:
+                    continue
+                preloaded.add(name)
+                if name in tools:
+                    if value:
+                        lines.append(cache_set(name, value, "FILEPATH", name))
+                    continue
+                lines.append(cache_set(name, value, "INTERNAL", f"{language} compiler detection"))
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: PathLike) -> None:
+        with open(path, "w", encoding="utf-8") as fp:
+            fp.write(self.script())
+
+    def __repr__(self) -> str:
+        return "{}(languages={}, detected={})".format(
+            type(self).__name__,
+            [toolchain.language for toolchain in self.toolchains.toolchains],
+            list(self.compilers),
+        )
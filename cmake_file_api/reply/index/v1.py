@@ -1,8 +1,8 @@
-import json
 from pathlib import Path
 import re
 from typing import Any
 
+from cmake_file_api.json_decode import load_json
 from cmake_file_api.kinds.kind import ObjectKind
 from .file.v1 import CMakeReplyFileReferenceV1
 
@@ -157,6 +157,5 @@ class CMakeReplyFileV1:
 
     @classmethod
     def from_path(cls, path: Path) -> "CMakeReplyFileV1":
-        with path.open() as file:
-            dikt = json.load(file)
+        dikt = load_json(path)
         return cls.from_dict(dikt)
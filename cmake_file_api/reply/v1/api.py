@@ -1,11 +1,18 @@
+import asyncio
+import json
+from concurrent.futures import Executor
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Iterator, Optional
 
 from cmake_file_api.errors import CMakeException
 from cmake_file_api.kinds.api import CMakeApiType, OBJECT_KINDS_API
+from cmake_file_api.kinds.cmakeFiles.v1 import CMakeFilesV1
 from cmake_file_api.reply.index.api import INDEX_API
 from cmake_file_api.kinds.kind import ObjectKind
 from cmake_file_api.reply.index.v1 import CMakeReplyFileV1
+from .session import CMakeFileApiSessionV1
+from .snapshot import ReplySnapshot, ReplySnapshotCache
+from .watch import create_reply_directory_watcher
 
 
 class CMakeFileApiV1:
@@ -21,8 +28,12 @@ class CMakeFileApiV1:
             raise NotADirectoryError(f"Query path '{result}' is not a directory")
         return result
 
+    @property
+    def reply_path(self) -> Path:
+        return self._build_path / ".cmake" / "api" / "v1" / "reply"
+
     def _create_reply_path(self) -> Path:
-        result = self._build_path / ".cmake" / "api" / "v1" / "reply"
+        result = self.reply_path
         result.mkdir(parents=True, exist_ok=True)
         if not result.is_dir():
             raise NotADirectoryError(f"Reply path '{result}' is not a directory")
@@ -34,10 +45,8 @@ class CMakeFileApiV1:
 
     @staticmethod
     def _find_index_path(reply_path: Path) -> Optional[Path]:
-        try:
-            return next(reply_path.glob("index-*.json"))
-        except StopIteration:
-            return None
+        # Stale index files can linger while CMake regenerates: the current one has the largest name
+        return max(reply_path.glob("index-*.json"), default=None)
 
     def find_index_path(self) -> Optional[Path]:
         reply_path = self._create_reply_path()
@@ -57,7 +66,10 @@ class CMakeFileApiV1:
         index_path = self._find_index_path(reply_path)
         if index_path is None:
             raise CMakeException("CMake did not generate index file. Maybe your cmake version is too old?")
+        return self._load_index(index_path)
 
+    @staticmethod
+    def _load_index(index_path: Path) -> CMakeReplyFileV1:
         index_api = INDEX_API.get(1)
         if not index_api:
             raise CMakeException("Unknown api version")
@@ -67,27 +79,105 @@ class CMakeFileApiV1:
         reply_path = self._create_reply_path()
         return self._index(reply_path)
 
-    def inspect(self, kind: ObjectKind, kind_version: int) -> Optional[CMakeApiType]:
+    def needs_reconfigure(self, skip_cmake: bool = False, skip_external: bool = False) -> bool:
+        # Whether a CMakeLists.txt or other input of the last configure changed since CMake wrote the reply.
+        # Without a reply, or without the cmakeFiles kind (see instrument), there is nothing to compare with.
+        reply_path = self.reply_path
+        index_path = self._find_index_path(reply_path) if reply_path.is_dir() else None
+        if index_path is None:
+            return True
+        mtime_ns = index_path.stat().st_mtime_ns
+        reply_file_ref = self._load_index(index_path).reply.stateless.get((ObjectKind.CMAKEFILES, 1))
+        if reply_file_ref is None:
+            return True
+        cmake_files = CMakeFilesV1.from_path(reply_path / str(reply_file_ref.jsonFile), reply_path)
+        return cmake_files.needs_reconfigure(mtime_ns, skip_cmake=skip_cmake, skip_external=skip_external)
+
+    def session(self, cache: Optional[ReplySnapshotCache] = None) -> CMakeFileApiSessionV1:
+        return CMakeFileApiSessionV1(self, cache=cache)
+
+    def inspect(self, kind: ObjectKind, kind_version: int, **options: Any) -> Optional[CMakeApiType]:
         reply_path = self._create_reply_path()
         index = self._index(reply_path)
+        return self._inspect(reply_path, index, kind, kind_version, **options)
 
+    @staticmethod
+    def _inspect(reply_path: Path, index: CMakeReplyFileV1, kind: ObjectKind, kind_version: int, **options: Any) -> Optional[CMakeApiType]:
         data_path = index.reply.stateless.get((kind, kind_version), None)
         if data_path is None:
             return None
         api: Optional[CMakeApiType] = OBJECT_KINDS_API.get(kind, {}).get(kind_version, None)
         if api is None:
             return None
-        return api.from_path(reply_path / str(data_path.jsonFile), reply_path)
+        return api.from_path(reply_path / str(data_path.jsonFile), reply_path, **options)
 
-    def inspect_all(self) -> dict[ObjectKind, dict[int, object]]:
-        reply_path = self._create_reply_path()
-        index = self._index(reply_path)
+    @staticmethod
+    def _kind_options(kind: ObjectKind, executor: Optional[Executor]) -> dict[str, Any]:
+        # Only the codemodel consists of many independent reply files worth decoding concurrently
+        if executor is not None and kind == ObjectKind.CODEMODEL:
+            return {"executor": executor}
+        return {}
 
+    @staticmethod
+    def _inspect_all(reply_path: Path, index: CMakeReplyFileV1, executor: Optional[Executor]) -> dict[ObjectKind, dict[int, Any]]:
         result: dict[ObjectKind, dict[int, Any]] = {}
         for (kind, kind_version), reply_file_ref in index.reply.stateless.items():
             api = OBJECT_KINDS_API.get(kind, {}).get(kind_version, None)
             if api is None:
                 continue
-            kind_data = api.from_path(reply_path / str(reply_file_ref.jsonFile), reply_path)
+            kind_data = api.from_path(reply_path / str(reply_file_ref.jsonFile), reply_path, **CMakeFileApiV1._kind_options(kind, executor))
             result.setdefault(kind, {})[kind_version] = kind_data
         return result
+
+    def inspect_all(self, executor: Optional[Executor] = None, cache: Optional[ReplySnapshotCache] = None) -> dict[ObjectKind, dict[int, object]]:
+        if cache is not None:
+            return self.snapshot(cache, executor=executor).objects
+        reply_path = self._create_reply_path()
+        index = self._index(reply_path)
+        return self._inspect_all(reply_path, index, executor)
+
+    def snapshot(self, cache: Optional[ReplySnapshotCache] = None, executor: Optional[Executor] = None) -> ReplySnapshot:
+        reply_path = self._create_reply_path()
+        index_path = self._find_index_path(reply_path)
+        if index_path is None:
+            raise CMakeException("CMake did not generate index file. Maybe your cmake version is too old?")
+        return self._snapshot(reply_path, index_path, cache, executor)
+
+    def _snapshot(self, reply_path: Path, index_path: Path, cache: Optional[ReplySnapshotCache], executor: Optional[Executor]) -> ReplySnapshot:
+        if cache is not None:
+            snapshot = cache.load(index_path)
+            if snapshot is not None:
+                return snapshot
+        index = self._load_index(index_path)
+        snapshot = ReplySnapshot(index, self._inspect_all(reply_path, index, executor))
+        if cache is not None:
+            cache.store(index_path, snapshot)
+        return snapshot
+
+    async def inspect_async(self, kind: ObjectKind, kind_version: int, **options: Any) -> Optional[CMakeApiType]:
+        # File I/O and decoding run in the event loop's default executor
+        return await asyncio.to_thread(self.inspect, kind, kind_version, **options)
+
+    async def inspect_all_async(self, executor: Optional[Executor] = None, cache: Optional[ReplySnapshotCache] = None) -> dict[ObjectKind, dict[int, object]]:
+        return await asyncio.to_thread(self.inspect_all, executor=executor, cache=cache)
+
+    def watch(self, timeout: Optional[float] = None, debounce: float = 0.2, poll_interval: float = 0.5,
+              executor: Optional[Executor] = None, cache: Optional[ReplySnapshotCache] = None) -> Iterator[dict[ObjectKind, dict[int, Any]]]:
+        session = self.session(cache=cache)
+        with create_reply_directory_watcher(self._create_reply_path(), poll_interval=poll_interval) as watcher:
+            changed = True
+            while changed:
+                # CMake writes a burst of files per generate step, with the index last: wait for it to settle
+                while watcher.wait(debounce):
+                    pass
+                if session.is_stale():
+                    try:
+                        yield session.inspect_all(executor=executor)
+                    except CMakeException:
+                        # No reply was generated yet
+                        pass
+                    except (OSError, json.JSONDecodeError, UnicodeDecodeError):
+                        # Reply files were replaced or half written while reading them, a next change is on its way
+                        session.invalidate()
+                changed = watcher.wait(timeout)
+
@@ -0,0 +1,152 @@
+from __future__ import annotations
+from concurrent.futures import Executor
+import os
+from pathlib import Path
+import typing
+from typing import Any, Optional
+
+from cmake_file_api.errors import CMakeException
+from cmake_file_api.kinds.api import CMakeApiType, OBJECT_KINDS_API
+from cmake_file_api.kinds.kind import ObjectKind
+from cmake_file_api.reply.index.v1 import CMakeReplyFileV1
+from .snapshot import ReplySnapshotCache
+
+if typing.TYPE_CHECKING:
+    from .api import CMakeFileApiV1
+
+
+IndexStamp = tuple[str, int, int]
+
+
+class CMakeFileApiSessionV1:
+    __slots__ = ("_api", "_cache", "_reply_dir_mtime", "_index_path", "_index_stamp", "_index", "_objects", "_previous_codemodels")
+
+    def __init__(self, api: CMakeFileApiV1, cache: Optional[ReplySnapshotCache] = None):
+        self._api = api
+        self._cache = cache
+        self._reply_dir_mtime: Optional[int] = None
+        self._index_path: Optional[Path] = None
+        self._index_stamp: Optional[IndexStamp] = None
+        self._index: Optional[CMakeReplyFileV1] = None
+        self._objects: dict[tuple[ObjectKind, int, tuple[tuple[str, Any], ...]], Any] = {}
+        self._previous_codemodels: dict[int, Any] = {}
+
+    @property
+    def api(self) -> CMakeFileApiV1:
+        return self._api
+
+    def invalidate(self) -> None:
+        # Keep the parsed codemodels around, so the next one only needs to parse changed targets
+        for (kind, kind_version, options), kind_data in self._objects.items():
+            if kind == ObjectKind.CODEMODEL and not options:
+                self._previous_codemodels[kind_version] = kind_data
+        self._reply_dir_mtime = None
+        self._index_path = None
+        self._index_stamp = None
+        self._index = None
+        self._objects.clear()
+
+    @staticmethod
+    def _stamp(path: Path) -> Optional[IndexStamp]:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return path.name, stat.st_mtime_ns, stat.st_size
+
+    @staticmethod
+    def _scan_index_path(reply_path: Path) -> Optional[Path]:
+        with os.scandir(reply_path) as it:
+            names = [entry.name for entry in it if entry.name.startswith("index-") and entry.name.endswith(".json")]
+        return reply_path / max(names) if names else None
+
+    def is_stale(self) -> bool:
+        if self._index_path is None:
+            return True
+        reply_path = self._api.reply_path
+        try:
+            reply_dir_mtime = os.stat(reply_path).st_mtime_ns
+        except FileNotFoundError:
+            return True
+        if reply_dir_mtime == self._reply_dir_mtime:
+            # No file was added or removed: only an in-place rewrite of the index could have happened
+            return self._stamp(self._index_path) != self._index_stamp
+        index_path = self._scan_index_path(reply_path)
+        if index_path is None or self._stamp(index_path) != self._index_stamp:
+            return True
+        self._reply_dir_mtime = reply_dir_mtime
+        return False
+
+    def _revalidate(self) -> Path:
+        if not self.is_stale():
+            assert self._index_path is not None
+            return self._index_path
+        self.invalidate()
+        reply_path = self._api.reply_path
+        try:
+            reply_dir_mtime = os.stat(reply_path).st_mtime_ns
+            index_path = self._scan_index_path(reply_path)
+        except FileNotFoundError:
+            index_path = None
+        if index_path is None:
+            raise CMakeException("CMake did not generate index file. Maybe your cmake version is too old?")
+        self._reply_dir_mtime = reply_dir_mtime
+        self._index_path = index_path
+        self._index_stamp = self._stamp(index_path)
+        return index_path
+
+    def index(self) -> CMakeReplyFileV1:
+        index_path = self._revalidate()
+        if self._index is None:
+            self._index = self._api._load_index(index_path)
+        return self._index
+
+    def inspect(self, kind: ObjectKind, kind_version: int, **options: Any) -> Optional[CMakeApiType]:
+        index = self.index()
+        key = (kind, kind_version, tuple(sorted(options.items())))
+        try:
+            return self._objects[key]
+        except KeyError:
+            pass
+        except TypeError:
+            # Unhashable options cannot be memoized
+            return self._inspect(index, kind, kind_version, options)
+        result = self._inspect(index, kind, kind_version, options)
+        self._objects[key] = result
+        return result
+
+    def _inspect(self, index: CMakeReplyFileV1, kind: ObjectKind, kind_version: int, options: dict[str, Any]) -> Optional[CMakeApiType]:
+        previous = self._previous_codemodels.pop(kind_version, None) if kind == ObjectKind.CODEMODEL else None
+        if previous is not None and "previous" not in options:
+            options = dict(options, previous=previous)
+        return self._api._inspect(self._api.reply_path, index, kind, kind_version, **options)
+
+    def inspect_all(self, executor: Optional[Executor] = None) -> dict[ObjectKind, dict[int, Any]]:
+        index = self.index()
+        reply_path = self._api.reply_path
+        kinds = [(kind, kind_version) for kind, kind_version in index.reply.stateless
+                 if kind_version in OBJECT_KINDS_API.get(kind, {})]
+        missing = [(kind, kind_version) for kind, kind_version in kinds if (kind, kind_version, ()) not in self._objects]
+        if missing and self._cache is not None:
+            assert self._index_path is not None
+            snapshot = self._api._snapshot(reply_path, self._index_path, self._cache, executor)
+            for kind, versions in snapshot.objects.items():
+                for kind_version, kind_data in versions.items():
+                    self._objects.setdefault((kind, kind_version, ()), kind_data)
+        else:
+            for kind, kind_version in missing:
+                options = self._api._kind_options(kind, executor)
+                self._objects[(kind, kind_version, ())] = self._inspect(index, kind, kind_version, options)
+
+        result: dict[ObjectKind, dict[int, Any]] = {}
+        for kind, kind_version in kinds:
+            result.setdefault(kind, {})[kind_version] = self._objects[(kind, kind_version, ())]
+        return result
+
+    def __repr__(self) -> str:
+        return "{}(reply_path='{}', index={}, #objects={})".format(
+            type(self).__name__,
+            self._api.reply_path,
+            f"'{self._index_path.name}'" if self._index_path else None,
+            len(self._objects),
+        )
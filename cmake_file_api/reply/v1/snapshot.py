@@ -0,0 +1,150 @@
+import contextlib
+import gc
+import hashlib
+import os
+from pathlib import Path, PosixPath, WindowsPath
+import pickle
+import tempfile
+from typing import Any, BinaryIO, Iterator, Optional
+
+from cmake_file_api.kinds.kind import ObjectKind
+from cmake_file_api.reply.index.v1 import CMakeReplyFileV1
+
+
+class ReplySnapshot:
+    __slots__ = ("index", "objects")
+
+    def __init__(self, index: CMakeReplyFileV1, objects: dict[ObjectKind, dict[int, Any]]):
+        self.index = index
+        self.objects = objects
+
+    def __repr__(self) -> str:
+        return "{}(index={}, objects={})".format(
+            type(self).__name__,
+            self.index,
+            {kind.value: sorted(versions) for kind, versions in self.objects.items()},
+        )
+
+
+@contextlib.contextmanager
+def _gc_paused() -> Iterator[None]:
+    # (Un)pickling creates a huge number of objects at once, which would otherwise trigger many useless gc passes
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+class _SnapshotPickler(pickle.Pickler):
+    # Rebuilding pathlib objects dominates unpickling: store them as strings and parse each distinct one once
+    def persistent_id(self, obj: Any) -> Optional[tuple[str, str]]:
+        if type(obj) in (PosixPath, WindowsPath):
+            return ("path", str(obj))
+        return None
+
+
+class _SnapshotUnpickler(pickle.Unpickler):
+    def __init__(self, file: BinaryIO):
+        super().__init__(file)
+        self._paths: dict[str, Path] = {}
+
+    def persistent_load(self, pid: Any) -> Any:
+        tag, value = pid
+        if tag != "path":
+            raise pickle.UnpicklingError(f"Unsupported persistent id '{tag}'")
+        try:
+            return self._paths[value]
+        except KeyError:
+            path = self._paths[value] = Path(value)
+            return path
+
+
+class ReplySnapshotCache:
+    __slots__ = ("cache_path", "max_snapshots")
+
+    SUFFIX = ".snapshot"
+
+    def __init__(self, cache_path: Path, max_snapshots: int = 8):
+        if max_snapshots < 1:
+            raise ValueError("Need room for at least one snapshot")
+        self.cache_path = cache_path
+        self.max_snapshots = max_snapshots
+
+    @staticmethod
+    def _reply_key(index_path: Path) -> str:
+        return hashlib.sha256(str(index_path.parent.resolve()).encode()).hexdigest()[:16]
+
+    @classmethod
+    def _snapshot_path(cls, cache_path: Path, index_path: Path) -> Path:
+        # A new index file, or a rewritten one, gets a new key: older snapshots are never returned
+        stat = index_path.stat()
+        index_key = hashlib.sha256(f"{index_path.name}\0{stat.st_mtime_ns}\0{stat.st_size}".encode()).hexdigest()[:16]
+        return cache_path / f"{cls._reply_key(index_path)}-{index_key}{cls.SUFFIX}"
+
+    def _snapshot_paths(self) -> list[Path]:
+        try:
+            return list(self.cache_path.glob(f"*{self.SUFFIX}"))
+        except FileNotFoundError:
+            return []
+
+    def load(self, index_path: Path) -> Optional[ReplySnapshot]:
+        snapshot_path = self._snapshot_path(self.cache_path, index_path)
+        try:
+            with snapshot_path.open("rb") as file, _gc_paused():
+                snapshot = _SnapshotUnpickler(file).load()
+        except FileNotFoundError:
+            return None
+        except (EOFError, pickle.UnpicklingError, AttributeError, ImportError, TypeError, ValueError):
+            # Truncated, or written by an incompatible version of this package
+            snapshot_path.unlink(missing_ok=True)
+            return None
+        if not isinstance(snapshot, ReplySnapshot):
+            return None
+        # Mark as recently used for eviction
+        os.utime(snapshot_path)
+        return snapshot
+
+    def store(self, index_path: Path, snapshot: ReplySnapshot) -> None:
+        self.cache_path.mkdir(parents=True, exist_ok=True)
+        snapshot_path = self._snapshot_path(self.cache_path, index_path)
+        fd, tmp_name = tempfile.mkstemp(dir=self.cache_path, prefix=snapshot_path.name, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file, _gc_paused():
+                _SnapshotPickler(file, protocol=pickle.HIGHEST_PROTOCOL).dump(snapshot)
+            os.replace(tmp_name, snapshot_path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        self._evict(snapshot_path)
+
+    def _evict(self, keep: Path) -> None:
+        reply_prefix = keep.name.split("-", 1)[0] + "-"
+        snapshots = []
+        for path in self._snapshot_paths():
+            if path == keep:
+                continue
+            if path.name.startswith(reply_prefix):
+                # Superseded by a newer index of the same reply directory
+                path.unlink(missing_ok=True)
+                continue
+            try:
+                snapshots.append((path.stat().st_mtime_ns, path))
+            except FileNotFoundError:
+                pass
+        snapshots.sort()
+        for _, path in snapshots[:max(0, len(snapshots) + 1 - self.max_snapshots)]:
+            path.unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        for path in self._snapshot_paths():
+            path.unlink(missing_ok=True)
+
+    def __repr__(self) -> str:
+        return "{}(cache_path='{}', max_snapshots={})".format(
+            type(self).__name__,
+            self.cache_path,
+            self.max_snapshots,
+        )
@@ -0,0 +1,142 @@
+import abc
+import ctypes
+import ctypes.util
+import errno
+import os
+from pathlib import Path
+import select
+import struct
+import sys
+import time
+from typing import Optional
+
+
+class ReplyDirectoryWatcher(abc.ABC):
+    __slots__ = ("reply_path", )
+
+    def __init__(self, reply_path: Path):
+        self.reply_path = reply_path
+
+    @abc.abstractmethod
+    def wait(self, timeout: Optional[float]) -> bool:
+        # Returns whether the reply directory changed within timeout seconds (None waits forever)
+        ...
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "ReplyDirectoryWatcher":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+class PollingReplyDirectoryWatcher(ReplyDirectoryWatcher):
+    __slots__ = ("poll_interval", "_stamp")
+
+    def __init__(self, reply_path: Path, poll_interval: float = 0.5):
+        super().__init__(reply_path)
+        self.poll_interval = poll_interval
+        self._stamp = self._directory_stamp()
+
+    def _directory_stamp(self) -> Optional[tuple[int, int]]:
+        # Adding or removing reply files changes the directory's mtime, rewriting the newest index does not
+        try:
+            with os.scandir(self.reply_path) as it:
+                index_entries = [entry for entry in it if entry.name.startswith("index-") and entry.name.endswith(".json")]
+            newest = max(index_entries, key=lambda entry: entry.name, default=None)
+            return os.stat(self.reply_path).st_mtime_ns, newest.stat().st_mtime_ns if newest else 0
+        except FileNotFoundError:
+            return None
+
+    def wait(self, timeout: Optional[float]) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            stamp = self._directory_stamp()
+            if stamp != self._stamp:
+                self._stamp = stamp
+                return True
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                time.sleep(min(self.poll_interval, remaining))
+            else:
+                time.sleep(self.poll_interval)
+
+
+class InotifyReplyDirectoryWatcher(ReplyDirectoryWatcher):
+    __slots__ = ("_libc", "_fd", "_wd")
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+
+    WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+    EVENT_HEADER = struct.Struct("iIII")
+
+    def __init__(self, reply_path: Path):
+        super().__init__(reply_path)
+        if not sys.platform.startswith("linux"):
+            raise OSError(errno.ENOSYS, "inotify is only available on Linux")
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self._wd = -1
+        try:
+            self._add_watch()
+        except OSError:
+            os.close(self._fd)
+            raise
+
+    def _add_watch(self) -> None:
+        self.reply_path.mkdir(parents=True, exist_ok=True)
+        self._wd = self._libc.inotify_add_watch(self._fd, os.fsencode(self.reply_path), self.WATCH_MASK)
+        if self._wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), str(self.reply_path))
+
+    def _drain(self) -> bool:
+        watch_lost = False
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                _, mask, _, name_length = self.EVENT_HEADER.unpack_from(data, offset)
+                offset += self.EVENT_HEADER.size + name_length
+                if mask & (self.IN_IGNORED | self.IN_DELETE_SELF | self.IN_MOVE_SELF):
+                    watch_lost = True
+        return watch_lost
+
+    def wait(self, timeout: Optional[float]) -> bool:
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return False
+        if self._drain():
+            # The reply directory itself was removed or replaced
+            self._add_watch()
+        return True
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def create_reply_directory_watcher(reply_path: Path, poll_interval: float = 0.5) -> ReplyDirectoryWatcher:
+    try:
+        return InotifyReplyDirectoryWatcher(reply_path)
+    except (OSError, AttributeError):
+        # Not on Linux, no libc symbols, or out of inotify watches
+        return PollingReplyDirectoryWatcher(reply_path, poll_interval=poll_interval)
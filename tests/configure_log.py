@@ -0,0 +1,86 @@
+# Two configure runs, as written by CMake to CMakeFiles/CMakeConfigureLog.yaml
+
+FIRST_RUN = """
+---
+events:
+  -
+    kind: "message-v1"
+    backtrace:
+      - "/usr/share/cmake/Modules/CMakeDetermineCompilerId.cmake:17 (message)"
+      - "CMakeLists.txt:2 (project)"
+    message: |
+      The C compiler identification is GNU, found in:
+        /build/CMakeFiles/3.27.0/CompilerIdC/a.out
+
+  -
+    kind: "try_compile-v1"
+    backtrace:
+      - "/usr/share/cmake/Modules/CMakeDetermineCompilerABI.cmake:57 (try_compile)"
+      - "CMakeLists.txt:2 (project)"
+    checks:
+      - "Detecting C compiler ABI info"
+    directories:
+      source: "/build/CMakeFiles/CMakeScratch/TryCompile-aaaaaa"
+      binary: "/build/CMakeFiles/CMakeScratch/TryCompile-aaaaaa"
+    cmakeVariables:
+      CMAKE_C_FLAGS: ""
+    buildResult:
+      variable: "CMAKE_C_ABI_COMPILED"
+      cached: true
+      stdout: |
+        Change Dir: '/build/CMakeFiles/CMakeScratch/TryCompile-aaaaaa'
+        -
+          kind: not an event
+      exitCode: 0
+  -
+    kind: "try_compile-v1"
+    backtrace:
+      - "/usr/share/cmake/Modules/CheckIncludeFile.cmake:90 (try_compile)"
+      - "CMakeLists.txt:4 (check_include_file)"
+    checks:
+      - "Looking for foo.h"
+    directories:
+      source: "/build/CMakeFiles/CMakeScratch/TryCompile-bbbbbb"
+      binary: "/build/CMakeFiles/CMakeScratch/TryCompile-bbbbbb"
+    buildResult:
+      variable: "HAVE_FOO_H"
+      cached: true
+      stdout: |
+        fatal error: foo.h: No such file or directory
+      exitCode: 1
+...
+"""
+
+SECOND_RUN = """
+---
+events:
+  -
+    kind: "try_run-v1"
+    backtrace:
+      - "CMakeLists.txt:6 (try_run)"
+    checks:
+      - "Performing Test HAVE_WORKING_FOO"
+    directories:
+      source: "/build/CMakeFiles/CMakeScratch/TryCompile-cccccc"
+      binary: "/build/CMakeFiles/CMakeScratch/TryCompile-cccccc"
+    buildResult:
+      variable: "HAVE_WORKING_FOO_COMPILED"
+      cached: true
+      stdout: |
+        Linking C executable cmTC_ccccc
+      exitCode: 0
+    runResult:
+      variable: "HAVE_WORKING_FOO_EXITCODE"
+      cached: true
+      stdout: |
+        works
+      stderr: ""
+      exitCode: 0
+  -
+    kind: "find-v1"
+    backtrace:
+      - "CMakeLists.txt:8 (find_program)"
+    mode: "program"
+    variable: "BAR"
+...
+"""
@@ -0,0 +1,122 @@
+import json
+from pathlib import Path
+
+
+def target_name(i):
+    return f"t{i}"
+
+
+def target_id(i):
+    return f"{target_name(i)}::@{i % 97:020x}"
+
+
+def target_json_file(i, salt=""):
+    return f"target-{target_name(i)}-{salt}{i:020x}.json"
+
+
+def target_dependencies(i):
+    # A DAG with a long chain (t[i] -> t[i-1]) and a fan-in towards t0 (t[i] -> t[i//2]).
+    return sorted({d for d in (i - 1, i // 2) if 0 <= d < i})
+
+
+def target_dict(i, n_directories, flags="-O2 -g"):
+    directory = f"dir{i % n_directories}"
+    return {
+        "name": target_name(i),
+        "id": target_id(i),
+        "type": "EXECUTABLE" if i % 10 == 9 else "STATIC_LIBRARY",
+        "backtrace": 1,
+        "backtraceGraph": {
+            "commands": ["add_library", "target_link_libraries"],
+            "files": [f"{directory}/CMakeLists.txt"],
+            "nodes": [
+                {"file": 0},
+                {"file": 0, "command": 0, "line": 1 + i, "parent": 0},
+                {"file": 0, "command": 1, "line": 2 + i, "parent": 0},
+            ],
+        },
+        "paths": {"source": directory, "build": directory},
+        "nameOnDisk": f"lib{target_name(i)}.a",
+        "artifacts": [{"path": f"{directory}/lib{target_name(i)}.a"}],
+        "dependencies": [{"id": target_id(d), "backtrace": 2} for d in target_dependencies(i)],
+        "sources": [
+            {"path": f"{directory}/{target_name(i)}.cpp", "compileGroupIndex": 0, "sourceGroupIndex": 0, "backtrace": 1},
+            {"path": f"{directory}/{target_name(i)}.hpp", "sourceGroupIndex": 1, "backtrace": 1},
+        ],
+        "sourceGroups": [
+            {"name": "Source Files", "sourceIndexes": [0]},
+            {"name": "Header Files", "sourceIndexes": [1]},
+        ],
+        "compileGroups": [
+            {
+                "language": "CXX",
+                "sourceIndexes": [0],
+                "compileCommandFragments": [{"fragment": flags}],
+                "includes": [{"path": "/usr/include/common", "backtrace": 2}, {"path": f"/src/{directory}/include"}],
+                "defines": [{"define": "COMMON=1"}, {"define": f"DIRECTORY_{i % n_directories}"}],
+            }
+        ],
+    }
+
+
+def write_reply(reply_path: Path, n_targets: int, n_directories: int = 16, salt: str = "", changed=None,
+                flags: str = "-O2 -g") -> Path:
+    """Write a synthetic codemodel-v2 reply with `n_targets` targets and return the index path.
+
+    `salt` makes the reply file names unique, for target files only those in `changed` (all if None).
+    Existing target files that did not change are kept, like cmake does.
+    """
+    reply_path.mkdir(parents=True, exist_ok=True)
+    directories = [
+        {
+            "source": "." if d == 0 else f"dir{d}",
+            "build": "." if d == 0 else f"dir{d}",
+            "projectIndex": 0,
+            "targetIndexes": [i for i in range(n_targets) if i % n_directories == d],
+            **({} if d == 0 else {"parentIndex": 0}),
+            **({"childIndexes": list(range(1, n_directories))} if d == 0 else {}),
+        }
+        for d in range(n_directories)
+    ]
+    targets = []
+    for i in range(n_targets):
+        json_file = target_json_file(i, salt if changed is None or i in changed else "")
+        if changed is None or i in changed or not (reply_path / json_file).exists():
+            (reply_path / json_file).write_text(json.dumps(target_dict(i, n_directories, flags)))
+        targets.append({
+            "name": target_name(i),
+            "id": target_id(i),
+            "directoryIndex": i % n_directories,
+            "projectIndex": 0,
+            "jsonFile": json_file,
+        })
+    codemodel = {
+        "kind": "codemodel",
+        "version": {"major": 2, "minor": 4},
+        "paths": {"source": "/src", "build": "/build"},
+        "configurations": [
+            {
+                "name": "Release",
+                "directories": directories,
+                "projects": [{"name": "synthetic", "directoryIndexes": list(range(n_directories)),
+                              "targetIndexes": list(range(n_targets))}],
+                "targets": targets,
+            }
+        ],
+    }
+    codemodel_file = f"codemodel-v2-{salt}{n_targets:020x}.json"
+    (reply_path / codemodel_file).write_text(json.dumps(codemodel))
+    codemodel_ref = {"kind": "codemodel", "version": {"major": 2, "minor": 4}, "jsonFile": codemodel_file}
+    index = {
+        "cmake": {
+            "version": {"major": 3, "minor": 25, "patch": 1, "string": "3.25.1", "suffix": "", "isDirty": False},
+            "paths": {"cmake": "/usr/bin/cmake", "cpack": "/usr/bin/cpack", "ctest": "/usr/bin/ctest",
+                      "root": "/usr/share/cmake"},
+            "generator": {"name": "Ninja", "multiConfig": False},
+        },
+        "objects": [codemodel_ref],
+        "reply": {"codemodel-v2": codemodel_ref},
+    }
+    index_path = reply_path / f"index-{salt}{n_targets:08d}.json"
+    index_path.write_text(json.dumps(index))
+    return index_path
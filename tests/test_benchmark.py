@@ -0,0 +1,112 @@
+import gc
+import json
+import sys
+import tracemalloc
+
+from cmake_file_api.kinds.codemodel.target.v2 import CodemodelTargetV2
+from cmake_file_api.kinds.codemodel.v2 import CodemodelV2
+from cmake_file_api.kinds.intern import InternTable
+
+from .synthetic import target_dependencies, target_dict, target_json_file, target_name, write_reply
+
+
+def load_counting_calls(reply_path):
+    # Counts the function calls made while loading: unlike the time taken, the same on every machine
+    calls = 0
+
+    def profile(frame, event, arg):
+        nonlocal calls
+        if event in ("call", "c_call"):
+            calls += 1
+
+    codemodel_path = next(reply_path.glob("codemodel-v2-*.json"))
+    sys.setprofile(profile)
+    try:
+        codemodel = CodemodelV2.from_path(codemodel_path, reply_path)
+    finally:
+        sys.setprofile(None)
+    return codemodel, calls
+
+
+def test_codemodel_dependency_linking_is_linear(tmp_path):
+    small_n, large_n = 2_500, 10_000
+    write_reply(tmp_path / "small", small_n)
+    write_reply(tmp_path / "large", large_n)
+
+    _, small_calls = load_counting_calls(tmp_path / "small")
+    codemodel, large_calls = load_counting_calls(tmp_path / "large")
+
+    targets = codemodel.configurations[0].targets
+    assert len(targets) == large_n
+    for i in (1, 1234, large_n - 1):
+        dependency_names = sorted(d.target.name for d in targets[i].target.dependencies)
+        assert dependency_names == sorted(target_name(d) for d in target_dependencies(i))
+
+    # All dependencies resolve through one id -> target table of the configuration
+    tables = {id(dependency._lut_id_target) for target in targets for dependency in target.target.dependencies}
+    assert len(tables) == 1
+
+    # Linear loading makes 4x the calls here, building a table per target 16x
+    assert large_calls < 5 * small_calls
+
+
+def traced_memory(load):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = load()
+        gc.collect()
+        return result, tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+
+def test_intern_table_reduces_memory(tmp_path):
+    n = 2_000
+    write_reply(tmp_path, n)
+    json_files = [tmp_path / target_json_file(i) for i in range(n)]
+
+    # A table per target only shares objects within a target, like parsing without interning
+    _, separate = traced_memory(lambda: [CodemodelTargetV2.from_path(p, tmp_path, InternTable()) for p in json_files])
+    interner = InternTable()
+    targets, shared = traced_memory(lambda: [CodemodelTargetV2.from_path(p, tmp_path, interner) for p in json_files])
+
+    includes = [target.compileGroups[0].includes[0].path for target in targets]
+    assert all(include is includes[0] for include in includes)
+    defines = [target.compileGroups[0].defines[0].define for target in targets]
+    assert all(define is defines[0] for define in defines)
+    assert shared < 0.8 * separate
+
+
+def test_lazy_backtraces_reduce_memory(tmp_path):
+    n = 1_000
+    json_files = []
+    for i in range(n):
+        target = target_dict(i, 16)
+        graph = target["backtraceGraph"]
+        # A deep chain of nested function calls, as CMake writes it: every node is referenced
+        graph["files"] += [f"cmake/module{k}.cmake" for k in range(20)]
+        graph["nodes"] += [{"file": 1 + k % 20, "command": 1, "line": 3 * k, "parent": len(graph["nodes"]) + k - 1}
+                           for k in range(80)]
+        for source in target["sources"]:
+            source["backtrace"] = len(graph["nodes"]) - 1
+        json_files.append(tmp_path / f"target-{i}.json")
+        json_files[-1].write_text(json.dumps(target))
+
+    interner = InternTable()
+    targets, lazy = traced_memory(lambda: [CodemodelTargetV2.from_path(p, tmp_path, interner) for p in json_files])
+    _, skipped = traced_memory(lambda: [CodemodelTargetV2.from_path(p, tmp_path, interner, backtraces=False) for p in json_files])
+
+    def materialize():
+        return [target.sources[0].backtrace for target in targets]
+    nodes, materialized = traced_memory(materialize)
+
+    depth = 0
+    node = nodes[0]
+    while node is not None:
+        depth += 1
+        node = node.parent
+    assert depth == 82
+    # The compact tables cost less than the nodes they stand for
+    assert skipped < lazy
+    assert lazy - skipped < materialized
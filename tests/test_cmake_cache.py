@@ -0,0 +1,50 @@
+import textwrap
+
+from cmake_file_api.cmake import CMakeProject
+from cmake_file_api.cmake_cache import CMakeCacheFile
+from cmake_file_api.kinds.cache.v2 import CacheEntryType
+
+
+CACHE_TEXT = textwrap.dedent("""\
+    # This is the CMakeCache file.
+
+    //Path to a program.
+    CMAKE_AR:FILEPATH=/usr/bin/ar
+
+    //Flags used by the CXX compiler during all build types.
+    CMAKE_CXX_FLAGS:STRING=
+    "NAME WITH:COLON":STRING=quoted name
+    PADDED:STRING=' padded '
+    UNTYPED=value
+      INDENTED:STRING=x
+    MULTI:STRING=first line
+    second line
+    CMAKE_HOME_DIRECTORY:INTERNAL=/src/project
+    CMAKE_AR-ADVANCED:INTERNAL=1
+    """)
+
+
+def test_cmake_cache_file_parsing(tmp_path):
+    cache = CMakeCacheFile.from_text(tmp_path / "CMakeCache.txt", CACHE_TEXT)
+    assert cache["CMAKE_AR"] == "/usr/bin/ar"
+    assert cache.entries["CMAKE_AR"].type == CacheEntryType.TYPE_FILEPATH
+    assert cache["CMAKE_CXX_FLAGS"] == ""
+    assert cache["NAME WITH:COLON"] == "quoted name"
+    assert cache["PADDED"] == " padded "
+    assert cache.entries["UNTYPED"].type == CacheEntryType.TYPE_UNINITIALIZED
+    assert cache["INDENTED"] == "x"
+    assert cache["MULTI"] == "first line\nsecond line"
+    assert cache["CMAKE_AR-ADVANCED"] == "1"
+    assert cache.get("MISSING") is None
+    assert "CMAKE_HOME_DIRECTORY" in cache
+
+
+def test_project_cache_is_parsed_once(tmp_path):
+    cache_path = tmp_path / "CMakeCache.txt"
+    cache_path.write_text(CACHE_TEXT)
+    project = CMakeProject(tmp_path)
+    assert project.source_path is not None and project.source_path.name == "project"
+    assert project.cache is project.cache
+
+    cache_path.write_text(CACHE_TEXT + "NEW:BOOL=ON\n")
+    assert project.cache["NEW"] == "ON"
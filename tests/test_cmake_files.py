@@ -0,0 +1,45 @@
+import os
+
+from cmake_file_api.kinds.cmakeFiles.v1 import CMakeFilesV1
+
+
+def cmake_files(source, external):
+    return CMakeFilesV1.from_dict({
+        "kind": "cmakeFiles",
+        "version": {"major": 1, "minor": 0},
+        "paths": {"source": str(source), "build": str(source / "build")},
+        "inputs": [
+            {"path": "CMakeLists.txt"},
+            {"path": "sub/CMakeLists.txt"},
+            {"path": "cmake/Helpers.cmake"},
+            {"path": str(external / "CMakeCInformation.cmake"), "isExternal": True, "isCMake": True},
+            {"path": str(external / "FindFoo.cmake"), "isExternal": True},
+        ],
+    }, None)
+
+
+def test_cmake_files_changed_inputs(tmp_path):
+    source = tmp_path / "src"
+    external = tmp_path / "usr"
+    for path in (source / "CMakeLists.txt", source / "sub" / "CMakeLists.txt", source / "cmake" / "Helpers.cmake",
+                 external / "CMakeCInformation.cmake", external / "FindFoo.cmake"):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.touch()
+        os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+    files = cmake_files(source, external)
+    assert [(i.isExternal, i.isCMake) for i in files.inputs[-2:]] == [(True, True), (True, None)]
+
+    assert not files.needs_reconfigure(2_000_000_000)
+    assert files.needs_reconfigure(500_000_000)
+
+    os.utime(external / "CMakeCInformation.cmake", ns=(3_000_000_000, 3_000_000_000))
+    assert [i.path.name for i in files.changed_inputs(2_000_000_000)] == ["CMakeCInformation.cmake"]
+    assert not files.needs_reconfigure(2_000_000_000, skip_cmake=True)
+
+    # Removed inputs
+    (source / "cmake" / "Helpers.cmake").unlink()
+    (external / "FindFoo.cmake").unlink()
+    assert [str(i.path) for i in files.changed_inputs(2_000_000_000, skip_cmake=True)] == ["cmake/Helpers.cmake",
+                                                                                         str(external / "FindFoo.cmake")]
+    assert [str(i.path) for i in files.changed_inputs(2_000_000_000, skip_cmake=True, skip_external=True)] == \
+        ["cmake/Helpers.cmake"]
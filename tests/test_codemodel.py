@@ -0,0 +1,333 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import gc
+from pathlib import Path
+import pickle
+import tracemalloc
+
+import pytest
+
+from cmake_file_api.errors import FieldNotLoadedError
+from cmake_file_api.kinds.codemodel.v2 import CodemodelV2
+from cmake_file_api.kinds.codemodel.target.v2 import (BacktraceGraph, BacktraceNode, TargetCompileGroup, TargetDependency,
+                                                      TargetSource, TargetType)
+from cmake_file_api.reply.v1.api import CMakeFileApiV1
+from cmake_file_api.kinds.kind import ObjectKind
+
+from .synthetic import target_dependencies, target_name, write_reply
+
+
+def codemodel_path(reply_path):
+    return next(reply_path.glob("codemodel-v2-*.json"))
+
+
+def test_lazy_codemodel_defers_target_files(tmp_path):
+    write_reply(tmp_path, 50)
+    codemodel = CodemodelV2.from_path(codemodel_path(tmp_path), tmp_path, lazy=True)
+    targets = codemodel.configurations[0].targets
+
+    assert [t.name for t in targets] == [target_name(i) for i in range(50)]
+    assert not any(t.loaded for t in targets)
+
+    target = targets[10]
+    assert target.target.type == TargetType.STATIC
+    assert target.loaded
+    assert sum(t.loaded for t in targets) == 1
+
+    # Following a dependency only loads the dependency itself
+    dependency = next(d for d in target.target.dependencies if d.id == targets[9].id)
+    assert dependency.target is not None
+    assert dependency.target.name == target_name(9)
+    assert sum(t.loaded for t in targets) == 2
+
+    codemodel.preload()
+    assert all(t.loaded for t in targets)
+    assert sorted(d.target.name for d in targets[49].target.dependencies) == \
+        sorted(target_name(d) for d in target_dependencies(49))
+
+
+def test_inspect_forwards_lazy_option(tmp_path):
+    reply_path = tmp_path / ".cmake" / "api" / "v1" / "reply"
+    write_reply(reply_path, 5)
+    codemodel = CMakeFileApiV1(tmp_path).inspect(ObjectKind.CODEMODEL, 2, lazy=True)
+    assert isinstance(codemodel, CodemodelV2)
+    assert not any(t.loaded for t in codemodel.configurations[0].targets)
+
+
+def assert_same_codemodel(a, b):
+    for ca, cb in zip(a.configurations, b.configurations, strict=True):
+        assert [t.name for t in ca.targets] == [t.name for t in cb.targets]
+        for ta, tb in zip(ca.targets, cb.targets):
+            assert ta.target.id == tb.target.id
+            assert [d.target.name for d in ta.target.dependencies] == [d.target.name for d in tb.target.dependencies]
+            assert [s.path for s in ta.target.sources] == [s.path for s in tb.target.sources]
+
+
+@pytest.mark.parametrize("executor_type", [ThreadPoolExecutor, ProcessPoolExecutor])
+def test_codemodel_executor(tmp_path, executor_type):
+    write_reply(tmp_path, 200)
+    serial = CodemodelV2.from_path(codemodel_path(tmp_path), tmp_path)
+    with executor_type(max_workers=4) as executor:
+        parallel = CodemodelV2.from_path(codemodel_path(tmp_path), tmp_path, executor=executor)
+    assert_same_codemodel(serial, parallel)
+
+
+def test_codemodel_update_reuses_unchanged_targets(tmp_path):
+    write_reply(tmp_path, 100, salt="a", changed=set())
+    old = CodemodelV2.from_path(codemodel_path(tmp_path), tmp_path)
+    old_targets = {t.name: t.target for t in old.configurations[0].targets}
+
+    for path in tmp_path.glob("codemodel-v2-*.json"):
+        path.unlink()
+    write_reply(tmp_path, 101, salt="b", changed={7, 100})
+    new = old.update(codemodel_path(tmp_path), tmp_path)
+
+    new_targets = {t.name: t.target for t in new.configurations[0].targets}
+    reused = {name for name, target in new_targets.items() if target is old_targets.get(name)}
+    assert reused == set(old_targets) - {target_name(7)}
+    # Dependencies of reused targets now point into the new codemodel
+    assert new_targets[target_name(8)].dependencies[-1].target is new_targets[target_name(7)]
+    assert new_targets[target_name(100)].dependencies[-1].target is new_targets[target_name(99)]
+
+
+def test_codemodel_update_bounds_interned_objects(tmp_path):
+    n = 100
+    write_reply(tmp_path, n, changed=set())
+    codemodel = CodemodelV2.from_path(codemodel_path(tmp_path), tmp_path)
+
+    for update in range(5):
+        # The even targets are built with new flags each time, the odd ones are reused
+        previous = [t.target for t in codemodel.configurations[0].targets]
+        for path in tmp_path.glob("codemodel-v2-*.json"):
+            path.unlink()
+        write_reply(tmp_path, n, salt=f"u{update}", changed=set(range(0, n, 2)), flags=f"-O{update}")
+        codemodel = codemodel.update(codemodel_path(tmp_path), tmp_path)
+        targets = [t.target for t in codemodel.configurations[0].targets]
+        assert [a is b for a, b in zip(previous, targets)] == [False, True] * (n // 2)
+        fresh = CodemodelV2.from_path(codemodel_path(tmp_path), tmp_path)
+        # Only what the current targets refer to, like loading the reply anew
+        assert len(codemodel.interner) == len(fresh.interner)
+
+    # New and reused targets still share their objects
+    includes = [target.compileGroups[0].includes[0].path for target in targets]
+    assert all(include is includes[0] for include in includes)
+    assert {target.compileGroups[0].compileCommandFragments[0].fragment for target in targets} == {"-O2 -g", "-O4"}
+
+
+def test_nested_from_dict_without_interner():
+    # The parts of a target can still be read on their own, as before intern tables were added
+    graph_dikt = {"commands": ["add_library"], "files": ["CMakeLists.txt"],
+                  "nodes": [{"file": 0}, {"file": 0, "command": 0, "line": 3, "parent": 0}]}
+    graph = BacktraceGraph.from_dict(graph_dikt)
+    assert graph.node(1).command == "add_library" and graph.node(1).parent is graph.node(0)
+    nodes = [BacktraceNode.from_dict(d, graph_dikt["commands"], [Path(f) for f in graph_dikt["files"]])
+             for d in graph_dikt["nodes"]]
+    for node, d in zip(nodes, graph_dikt["nodes"]):
+        node.update_from_dict(d, nodes)
+    assert (nodes[1].file, nodes[1].line, nodes[1].parent) == (Path("CMakeLists.txt"), 3, nodes[0])
+
+    sources = [TargetSource.from_dict({"path": "a.cpp", "backtrace": 1}, graph)]
+    assert sources[0].backtrace is graph.node(1)
+    group = TargetCompileGroup.from_dict({"language": "CXX", "sourceIndexes": [0], "defines": [{"define": "A"}]},
+                                         sources, graph)
+    assert group.defines[0].define == "A"
+    assert TargetDependency.from_dict({"id": "a::@1"}, None).id == "a::@1"
+
+
+def test_codemodel_lookups(tmp_path):
+    write_reply(tmp_path, 40, n_directories=4)
+    codemodel = CodemodelV2.from_path(codemodel_path(tmp_path), tmp_path, lazy=True)
+    configuration = codemodel.get_configuration("Release")
+    with pytest.raises(KeyError):
+        codemodel.get_configuration("Debug")
+
+    target = configuration.get_target(target_name(13))
+    assert configuration.get_target_by_id(target.id) is target
+    assert not target.loaded
+    with pytest.raises(KeyError):
+        configuration.get_target("missing")
+
+    executables = configuration.get_targets_by_type(TargetType.EXECUTABLE)
+    assert [t.name for t in executables] == [target_name(i) for i in range(9, 40, 10)]
+    assert configuration.get_targets_by_type(TargetType.SHARED) == []
+
+    assert len(configuration.get_project("synthetic").targets) == 40
+    assert [t.name for t in configuration.get_directory("dir1").targets] == [target_name(i) for i in range(1, 40, 4)]
+
+
+def test_compile_settings_are_shared(tmp_path):
+    write_reply(tmp_path, 40, n_directories=4)
+    codemodel = CodemodelV2.from_path(codemodel_path(tmp_path), tmp_path)
+    configuration = codemodel.get_configuration("Release")
+    groups = [target.target.compileGroups[0] for target in configuration.targets]
+
+    # Targets in the same directory compile with the same flags
+    assert groups[1].settings is groups[5].settings
+    assert groups[1].settings != groups[2].settings
+    assert len(configuration.get_compile_settings()) == 4
+    same_flags = configuration.get_targets_by_compile_settings(groups[1].settings)
+    assert [t.name for t in same_flags] == [target_name(i) for i in range(1, 40, 4)]
+
+    # Backtraces stay per target
+    assert groups[1].includes[0].path is groups[5].includes[0].path
+    assert groups[1].includes[0].backtrace.line == 3
+    assert groups[5].includes[0].backtrace.line == 7
+    assert [d.define for d in groups[1].defines] == ["COMMON=1", "DIRECTORY_1"]
+    # The views of the settings are built once per group
+    assert groups[1].includes is groups[1].includes and groups[1].defines is groups[1].defines
+    assert groups[1].compileCommandFragments is groups[1].compileCommandFragments
+    assert groups[1].includes is not groups[5].includes
+
+    with pytest.raises(AttributeError):
+        groups[1].settings.defines = ()
+
+    # Equal across separately parsed models and processes, with a stable digest
+    other = CodemodelV2.from_path(codemodel_path(tmp_path), tmp_path).configurations[0].targets[1].target.compileGroups[0]
+    assert other.settings is not groups[1].settings
+    assert other.settings == groups[1].settings and hash(other.settings) == hash(groups[1].settings)
+    assert pickle.loads(pickle.dumps(groups[1].settings)) == groups[1].settings
+    assert other.settings.digest == groups[1].settings.digest != groups[2].settings.digest
+
+
+def test_backtraces_are_materialized_on_access(tmp_path):
+    write_reply(tmp_path, 10)
+    codemodel = CodemodelV2.from_path(codemodel_path(tmp_path), tmp_path)
+    target = codemodel.get_configuration("Release").get_target(target_name(3)).target
+    assert repr(target.backtraceGraph) == "BacktraceGraph(#nodes=3, #materialized=0)"
+
+    node = target.sources[0].backtrace
+    assert (node.file, node.line, node.command) == (Path("dir3/CMakeLists.txt"), 4, "add_library")
+    assert node.parent.line is None and node.parent.parent is None
+    assert target.backtrace is node
+    assert target.dependencies[0].backtrace.command == "target_link_libraries"
+    assert target.compileGroups[0].includes[0].backtrace.line == 5
+    assert target.compileGroups[0].includes[1].backtrace is None
+    assert len(target.backtraceGraph.nodes) == 3
+
+
+def test_backtraces_can_be_skipped(tmp_path):
+    write_reply(tmp_path, 10)
+    codemodel = CodemodelV2.from_path(codemodel_path(tmp_path), tmp_path, backtraces=False)
+    target = codemodel.configurations[0].targets[3].target
+    assert target.backtraceGraph is None
+    assert target.backtrace is None and target.sources[0].backtrace is None
+    assert target.dependencies[0].backtrace is None
+    assert target.compileGroups[0].includes[0].backtrace is None
+
+    # Only targets parsed the same way are reused
+    updated = codemodel.update(codemodel_path(tmp_path), tmp_path)
+    assert updated.configurations[0].targets[3].target.backtrace is not None
+
+
+def test_target_fields_projection(tmp_path):
+    reply_path = tmp_path / ".cmake" / "api" / "v1" / "reply"
+    write_reply(reply_path, 10)
+    codemodel = CMakeFileApiV1(tmp_path).inspect(ObjectKind.CODEMODEL, 2, lazy=True, fields=("dependencies", "compileGroups"))
+    cmake_target = codemodel.configurations[0].targets[3]
+    assert not cmake_target.loaded
+    target = cmake_target.target
+    assert target.loaded_fields == {"dependencies", "compileGroups"}
+    assert target.name == target_name(3) and target.paths.build is not None
+    assert {d.target.name for d in target.dependencies} == {target_name(i) for i in target_dependencies(3)}
+    assert target.compileGroups[0].sources[0].compileGroup is target.compileGroups[0]
+    assert target.compileGroups[0].defines
+
+    for field in ("link", "install", "sourceGroups"):
+        assert not hasattr(target, field)
+    with pytest.raises(FieldNotLoadedError, match="sources"):
+        target.sources
+    with pytest.raises(FieldNotLoadedError):
+        target.backtrace
+    with pytest.raises(FieldNotLoadedError):
+        target.compileGroups[0].includes[0].backtrace
+    assert "<not loaded>" in repr(target)
+    assert "<not loaded>" in repr(target.dependencies) and "<not loaded>" in repr(target.compileGroups)
+    assert "<not loaded>" in repr(target.compileGroups[0].includes)
+    assert pickle.loads(pickle.dumps(target)).loaded_fields == target.loaded_fields
+
+    projected = CodemodelV2.from_path(codemodel_path(reply_path), reply_path, fields=("sources", "dependencies"))
+    target = projected.configurations[0].targets[3].target
+    assert "<not loaded>" in repr(target.sources) and "<not loaded>" in repr(target.dependencies)
+
+    with pytest.raises(ValueError, match="Unknown target fields: bogus"):
+        CodemodelV2.from_path(codemodel_path(reply_path), reply_path, fields=["bogus"])
+
+
+def test_target_cache_bounds_resident_targets(tmp_path):
+    write_reply(tmp_path, 10)
+    codemodel = CodemodelV2.from_path(codemodel_path(tmp_path), tmp_path, lazy=True, max_targets=3)
+    cache = codemodel.target_cache
+    targets = codemodel.configurations[0].targets
+
+    for target in targets:
+        assert target.target.name == target.name
+    assert sum(target.loaded for target in targets) == len(cache) == 3
+    assert (cache.hits, cache.misses, cache.evictions) == (0, 10, 7)
+    assert [target.loaded for target in targets[-3:]] == [True] * 3
+
+    # Most recently used targets stay resident, evicted targets are read again
+    targets[7].target
+    targets[0].target
+    assert targets[7].loaded and targets[9].loaded and not targets[8].loaded
+    assert (cache.hits, cache.misses, cache.evictions) == (1, 11, 8)
+
+    # Resolving a dependency goes through the cache as well
+    assert {d.target.name for d in targets[9].target.dependencies} == {target_name(i) for i in target_dependencies(9)}
+    assert len(cache) == 3 and targets[8].loaded
+
+    updated = codemodel.update(codemodel_path(tmp_path), tmp_path, lazy=True, max_targets=3)
+    assert updated.target_cache is cache and len(cache) == 3
+    assert all(target not in cache for target in targets)
+
+    with pytest.raises(ValueError):
+        CodemodelV2.from_path(codemodel_path(tmp_path), tmp_path, max_targets=0)
+
+
+def test_target_cache_hands_over_targets_on_update(tmp_path):
+    write_reply(tmp_path, 10)
+    old = CodemodelV2.from_path(codemodel_path(tmp_path), tmp_path, lazy=True, max_targets=5)
+    cache = old.target_cache
+    old_targets = old.configurations[0].targets
+    for target in old_targets[:5]:
+        target.target
+
+    # The previous targets are handed over to the reused ones, without counting as evictions
+    new = old.update(codemodel_path(tmp_path), tmp_path, lazy=True, max_targets=5)
+    new_targets = new.configurations[0].targets
+    assert [target.loaded for target in new_targets] == [True] * 5 + [False] * 5
+    assert not any(target.loaded for target in old_targets)
+    assert (len(cache), cache.evictions) == (5, 0)
+
+    # The previous codemodel still works, within the same budget
+    assert old_targets[4].target.name == target_name(4)
+    assert len(cache) == 5 and cache.evictions == 1 and not new_targets[0].loaded
+
+
+def test_target_cache_bounds_interned_objects(tmp_path):
+    n = 2_000
+    write_reply(tmp_path, n)
+
+    def touch_all(codemodel):
+        for target in codemodel.configurations[0].targets:
+            target.target.compileGroups[0].includes
+
+    codemodel = CodemodelV2.from_path(codemodel_path(tmp_path), tmp_path, lazy=True, max_targets=10)
+    touch_all(codemodel)
+    # Only the target ids of the codemodel itself are interned in the long-lived table
+    assert len(codemodel.interner) == n
+    codemodel = codemodel.update(codemodel_path(tmp_path), tmp_path, lazy=True, max_targets=10)
+    touch_all(codemodel)
+    assert len(codemodel.interner) == n
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        touch_all(codemodel)
+        gc.collect()
+        before = tracemalloc.get_traced_memory()[0]
+        touch_all(codemodel)
+        gc.collect()
+        grown = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    # Loading every target again leaves nothing behind
+    assert grown < 100_000
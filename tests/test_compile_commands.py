@@ -0,0 +1,69 @@
+import io
+import json
+
+from cmake_file_api.compile_commands import CompileCommandsGenerator
+from cmake_file_api.kinds.codemodel.v2 import CodemodelV2
+from cmake_file_api.kinds.toolchains.v1 import ToolchainsV1
+
+from .synthetic import target_json_file, write_reply
+
+
+def load_codemodel(reply_path, n_targets):
+    write_reply(reply_path, n_targets)
+    return CodemodelV2.from_path(next(reply_path.glob("codemodel-v2-*.json")), reply_path)
+
+
+def toolchains(compiler_id, compiler_path):
+    return ToolchainsV1.from_dict({
+        "kind": "toolchains",
+        "version": {"major": 1, "minor": 0},
+        "toolchains": [{"language": "CXX", "compiler": {"id": compiler_id, "path": compiler_path}}],
+    }, None)
+
+
+def test_compile_commands_arguments(tmp_path):
+    codemodel = load_codemodel(tmp_path, 20)
+    entries = list(CompileCommandsGenerator(codemodel, "Release"))
+
+    # Headers have no compile group and are left out
+    assert len(entries) == 20
+    assert entries[3] == {
+        "directory": "/build/dir3",
+        "arguments": ["c++", "-DCOMMON=1", "-DDIRECTORY_3", "-I/usr/include/common", "-I/src/dir3/include",
+                      "-O2", "-g", "-c", "/src/dir3/t3.cpp"],
+        "file": "/src/dir3/t3.cpp",
+    }
+
+
+def test_compile_commands_toolchains(tmp_path):
+    write_reply(tmp_path, 2)
+    target_path = tmp_path / target_json_file(1)
+    target = json.loads(target_path.read_text())
+    target["compileGroups"][0]["includes"][0]["isSystem"] = True
+    target["compileGroups"][0]["defines"][0]["define"] = 'NAME="a b"'
+    target_path.write_text(json.dumps(target))
+    codemodel = CodemodelV2.from_path(next(tmp_path.glob("codemodel-v2-*.json")), tmp_path)
+
+    gnu = CompileCommandsGenerator(codemodel, "Release", toolchains("GNU", "/usr/bin/g++"), use_command=True)
+    assert list(gnu)[1]["command"] == ("/usr/bin/g++ '-DNAME=\"a b\"' -DDIRECTORY_1 -isystem /usr/include/common "
+                                       "-I/src/dir1/include -O2 -g -c /src/dir1/t1.cpp")
+
+    msvc = CompileCommandsGenerator(codemodel, "Release", toolchains("MSVC", "C:/VS/cl.exe"), use_command=True)
+    assert list(msvc)[1]["command"] == ('C:/VS/cl.exe "/DNAME=\\"a b\\"" /DDIRECTORY_1 /I/usr/include/common '
+                                        '/I/src/dir1/include -O2 -g /c /src/dir1/t1.cpp')
+
+
+def test_compile_commands_dump(tmp_path):
+    codemodel = load_codemodel(tmp_path / "reply", 50)
+    generator = CompileCommandsGenerator(codemodel, "Release")
+
+    fp = io.StringIO()
+    assert generator.dump(fp) == 50
+    assert json.loads(fp.getvalue()) == list(generator)
+
+    assert generator.write(tmp_path / "compile_commands.json") == 50
+    assert json.loads((tmp_path / "compile_commands.json").read_text()) == list(generator)
+
+    fp = io.StringIO()
+    assert CompileCommandsGenerator(load_codemodel(tmp_path / "empty", 0), "Release").dump(fp) == 0
+    assert json.loads(fp.getvalue()) == []
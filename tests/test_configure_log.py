@@ -0,0 +1,90 @@
+import io
+
+import pytest
+
+from cmake_file_api.kinds.common import VersionMajorMinor
+from cmake_file_api.kinds.configureLog.events import ConfigureLogEvent, MessageEvent, TryCompileEvent, TryRunEvent, \
+    scan_configure_log
+from cmake_file_api.kinds.configureLog.index import ConfigureLogIndex
+from cmake_file_api.kinds.configureLog.v1 import ConfigureLogV1
+
+from .configure_log import FIRST_RUN, SECOND_RUN
+
+
+@pytest.fixture
+def configure_log(tmp_path):
+    path = tmp_path / "CMakeConfigureLog.yaml"
+    path.write_text(FIRST_RUN + SECOND_RUN)
+    return ConfigureLogV1(VersionMajorMinor(1, 0), path, ["message-v1", "try_compile-v1", "try_run-v1"])
+
+
+def test_configure_log_events(configure_log):
+    pytest.importorskip("yaml")
+    events = list(configure_log.events())
+    assert [type(event) for event in events] == [MessageEvent, TryCompileEvent, TryCompileEvent, TryRunEvent, ConfigureLogEvent]
+    assert [event.run for event in events] == [0, 0, 0, 1, 1]
+    assert events[0].message.startswith("The C compiler identification is GNU")
+    assert events[0].backtrace[-1] == "CMakeLists.txt:2 (project)"
+
+    # Block scalars looking like events are part of the event
+    abi = events[1]
+    assert abi.checks == ["Detecting C compiler ABI info"] and abi.cmakeVariables == {"CMAKE_C_FLAGS": ""}
+    assert abi.buildResult.stdout.endswith("kind: not an event\n") and abi.buildResult.exitCode == 0
+
+    assert events[2].buildResult.variable == "HAVE_FOO_H" and events[2].buildResult.exitCode == 1
+    assert events[3].runResult.variable == "HAVE_WORKING_FOO_EXITCODE" and events[3].runResult.stdout == "works\n"
+    assert events[4].kind == "find-v1"
+
+
+def test_configure_log_kind_filter(configure_log):
+    pytest.importorskip("yaml")
+    events = list(configure_log.events(kinds=["try_compile-v1", "try_run-v1"]))
+    assert [event.buildResult.variable for event in events] == ["CMAKE_C_ABI_COMPILED", "HAVE_FOO_H", "HAVE_WORKING_FOO_COMPILED"]
+
+
+def test_configure_log_scan_skips_unfinished_run():
+    data = (FIRST_RUN + SECOND_RUN).encode()
+    records = list(scan_configure_log(io.BytesIO(data)))
+    assert [data[r.offset:r.offset + len(r.data)] == r.data for r in records] == [True] * 5
+
+    # CMake is still writing the last event of the second run
+    unfinished = data[:data.index(b"  -\n    kind: \"find-v1\"") + 30]
+    assert [r.kind for r in scan_configure_log(io.BytesIO(unfinished))] == ["message-v1", "try_compile-v1", "try_compile-v1",
+                                                                          "try_run-v1"]
+    # Scanning can resume at a record
+    assert [r.kind for r in scan_configure_log(io.BytesIO(data), offset=records[3].offset, run=1)] == ["try_run-v1", "find-v1"]
+
+
+def test_configure_log_index(configure_log, tmp_path):
+    configure_log.path.write_text(FIRST_RUN)
+    index_path = tmp_path / "log.index.json"
+    with configure_log.index(index_path) as index:
+        assert len(index) == 3 and index.runs == 1
+        entry = index.last(kind="try_compile-v1", variable="HAVE_FOO_H")
+        assert entry.checks == ["Looking for foo.h"] and entry.exitCode == 1
+        assert b"fatal error: foo.h" in index.record(entry).data
+
+    # CMake appends a second run: only that run is indexed
+    with configure_log.path.open("a") as fp:
+        fp.write(SECOND_RUN)
+    with ConfigureLogIndex.open(configure_log.path, index_path) as index:
+        assert len(index) == 5 and index.update() == 0
+        [entry] = index.find(variable="HAVE_WORKING_FOO_EXITCODE", run=-1)
+        assert (entry.variable, entry.exitCode, entry.runExitCode) == ("HAVE_WORKING_FOO_COMPILED", 0, 0)
+        assert index.record(entry).kind == "try_run-v1" and b"works" in index.record(entry).data
+        assert index.find(check="Looking for foo.h", run=-1) == []
+        assert [e.kind for e in index.find(run=1)] == ["try_run-v1", "find-v1"]
+
+    # A log replaced by a new one is indexed again
+    configure_log.path.write_text(SECOND_RUN)
+    with ConfigureLogIndex.open(configure_log.path, index_path) as index:
+        assert [e.run for e in index.entries] == [0, 0]
+        assert index.record(index.entries[1]).kind == "find-v1"
+
+
+def test_configure_log_index_read(configure_log, tmp_path):
+    pytest.importorskip("yaml")
+    with configure_log.index(tmp_path / "log.index.json") as index:
+        event = index.read(index.last(kind="try_compile-v1", variable="HAVE_FOO_H"))
+        assert isinstance(event, TryCompileEvent) and event.buildResult.stdout.startswith("fatal error: foo.h")
+        assert index.read(index.last(kind="try_run-v1")).runResult.stdout == "works\n"
@@ -0,0 +1,64 @@
+import collections
+import pytest
+
+from cmake_file_api.kinds.codemodel.graph import TargetDependencyGraph
+from cmake_file_api.kinds.codemodel.v2 import CodemodelV2
+
+from .synthetic import target_dependencies, target_id, target_name, write_reply
+
+
+FakeTarget = collections.namedtuple("FakeTarget", ("id", ))
+
+
+def names(targets):
+    return [t.id for t in targets]
+
+
+def fake_graph(edges):
+    ids = sorted(set(edges) | {d for ds in edges.values() for d in ds})
+    targets = [FakeTarget(i) for i in ids]
+    return TargetDependencyGraph(targets, [sorted(ids.index(d) for d in edges.get(i, ())) for i in ids])
+
+
+def test_graph_closures_and_order():
+    graph = fake_graph({"app": ["net", "log"], "net": ["log"], "log": [], "test": ["app"]})
+    assert names(graph.dependencies("app")) == ["log", "net"]
+    assert names(graph.dependents("log")) == ["app", "net"]
+    assert names(graph.transitive_dependencies("test")) == ["app", "log", "net"]
+    assert names(graph.transitive_dependents("log")) == ["app", "net", "test"]
+    assert names(graph.transitive_dependents_of(["net"])) == ["app", "net", "test"]
+    order = names(graph.topological_order())
+    assert order.index("log") < order.index("net") < order.index("app") < order.index("test")
+    assert graph.cycles() == []
+    with pytest.raises(KeyError):
+        graph.dependencies("missing")
+
+
+def test_graph_cycles():
+    graph = fake_graph({"a": ["b"], "b": ["c"], "c": ["a"], "d": ["a"], "e": ["e"]})
+    assert sorted(names(c) for c in graph.cycles()) == [["a", "b", "c"], ["e"]]
+    assert names(graph.transitive_dependencies("a")) == ["a", "b", "c"]
+    assert names(graph.transitive_dependents("b")) == ["a", "b", "c", "d"]
+    order = names(graph.topological_order())
+    assert order.index("a") < order.index("d")
+
+
+def test_graph_from_configuration(tmp_path):
+    n = 10_000
+    write_reply(tmp_path, n)
+    codemodel = CodemodelV2.from_path(next(tmp_path.glob("codemodel-v2-*.json")), tmp_path)
+    configuration = codemodel.configurations[0]
+    graph = configuration.get_dependency_graph()
+    assert graph is configuration.get_dependency_graph()
+
+    t = configuration.get_target(target_name(10))
+    assert names(graph.dependencies(t)) == [configuration.get_target(target_name(d)).id for d in target_dependencies(10)]
+    assert len(graph.transitive_dependencies(t)) == 10
+
+    # Ids work too, and a 10k long chain does not hit the recursion limit
+    assert len(graph.transitive_dependents(target_id(0))) == n - 1
+    assert len(graph.transitive_dependencies(target_id(n - 1))) == n - 1
+    closure = graph.transitive_dependencies(target_id(n // 2))
+    assert graph.transitive_dependencies(target_id(n // 2)) == closure
+    assert len(graph.topological_order()) == n
+    assert graph.cycles() == []
@@ -0,0 +1,74 @@
+from cmake_file_api import impact as impact_module
+from cmake_file_api.impact import ImpactAnalysis
+from cmake_file_api.kinds.cmakeFiles.v1 import CMakeFilesV1
+from cmake_file_api.kinds.codemodel.graph import TargetDependencyGraph
+from cmake_file_api.kinds.codemodel.v2 import CodemodelV2
+
+from .synthetic import target_name, write_reply
+
+
+def cmake_files(n_directories):
+    return CMakeFilesV1.from_dict({
+        "kind": "cmakeFiles",
+        "version": {"major": 1, "minor": 0},
+        "paths": {"source": "/src", "build": "/build"},
+        "inputs": [{"path": "CMakeLists.txt"}, {"path": "/usr/share/cmake/Modules/CMakeCXXInformation.cmake",
+                                                "isExternal": True, "isCMake": True}]
+                  + [{"path": f"dir{d}/CMakeLists.txt"} for d in range(1, n_directories)],
+    }, None)
+
+
+def load_analysis(reply_path, n_targets):
+    write_reply(reply_path, n_targets)
+    codemodel = CodemodelV2.from_path(next(reply_path.glob("codemodel-v2-*.json")), reply_path)
+    return ImpactAnalysis.from_codemodel(codemodel, "Release", cmake_files(16))
+
+
+def test_impact_of_changed_sources(tmp_path):
+    analysis = load_analysis(tmp_path, 100)
+
+    # t[i] depends on t[i-1] and t[i//2]: a change in t97 only affects t97, t98 and t99
+    impact = analysis.analyze(["dir1/t97.cpp", "README.md"])
+    assert not impact.reconfigure_required
+    assert [t.name for t in impact.owners] == [target_name(97)]
+    assert [t.name for t in impact.targets] == [target_name(i) for i in (97, 98, 99)]
+    assert impact.unknown == ["/src/README.md"]
+
+    impact = analysis.analyze([])
+    assert impact.targets == [] and impact.sources == [] and not impact.reconfigure_required
+
+    impact = analysis.analyze(["/src/dir3/CMakeLists.txt", "dir50/../dir2/t50.hpp"])
+    assert impact.reconfigure_required
+    assert [str(i.path) for i in impact.cmake_inputs] == ["dir3/CMakeLists.txt"]
+    assert impact.unknown == []
+    assert [t.name for t in impact.owners] == [target_name(50)]
+    assert len(impact.targets) == 50
+
+
+def test_impact_of_many_changed_paths(tmp_path, monkeypatch):
+    analysis = load_analysis(tmp_path, 5_000)
+    changed = [f"dir{i % 16}/t{i}.{'cpp' if i % 2 else 'hpp'}" for i in range(5_000)]
+    changed += [f"docs/page{i}.md" for i in range(95_000)]
+
+    # Counts the work instead of timing it: every changed path is normalized once,
+    # and the dependents of all owners are found in a single graph traversal
+    calls = {"normalize": 0, "traversals": 0}
+    normalize = impact_module.normalize_source_path
+    transitive_dependents_of = TargetDependencyGraph.transitive_dependents_of
+
+    def counting_normalize(path, source_root):
+        calls["normalize"] += 1
+        return normalize(path, source_root)
+
+    def counting_transitive_dependents_of(self, targets):
+        calls["traversals"] += 1
+        return transitive_dependents_of(self, targets)
+
+    monkeypatch.setattr(impact_module, "normalize_source_path", counting_normalize)
+    monkeypatch.setattr(TargetDependencyGraph, "transitive_dependents_of", counting_transitive_dependents_of)
+    impact = analysis.analyze(changed)
+
+    assert len(impact.sources) == 5_000
+    assert len(impact.targets) == 5_000
+    assert len(impact.unknown) == 95_000
+    assert calls == {"normalize": 100_000, "traversals": 1}
@@ -0,0 +1,31 @@
+import os
+
+import pytest
+
+from cmake_file_api.json_decode import JSON_BACKEND, JSON_DECODERS, load_json, loads_json
+
+from .synthetic import write_reply
+
+
+def test_json_backends_agree(tmp_path):
+    # CI installs every backend from requirements-dev.txt, comparing json with itself proves nothing
+    if os.environ.get("CI"):
+        assert set(JSON_DECODERS) == {"orjson", "msgspec", "json"}
+    elif len(JSON_DECODERS) == 1:
+        pytest.skip("only the json backend is installed")
+    write_reply(tmp_path, 3)
+    for path in sorted(tmp_path.glob("*.json")):
+        expected = load_json(path, "json")
+        for backend in JSON_DECODERS:
+            assert load_json(path, backend) == expected
+
+
+def test_json_backend_unicode():
+    data = '{"path": "/src/été/中.cpp", "line": 12, "isSystem": true, "x": null}'.encode()
+    assert loads_json(data) == loads_json(data, "json")
+
+
+def test_json_unknown_backend(tmp_path):
+    assert JSON_BACKEND in JSON_DECODERS
+    with pytest.raises(ValueError):
+        loads_json(b"{}", "unknown")
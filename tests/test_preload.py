@@ -0,0 +1,213 @@
+from pathlib import Path
+
+import pytest
+
+from cmake_file_api.cmake_cache import CMakeCacheFile
+from cmake_file_api.kinds.common import VersionMajorMinor
+from cmake_file_api.kinds.configureLog.v1 import ConfigureLogV1
+from cmake_file_api.kinds.toolchains.v1 import ToolchainsV1
+from cmake_file_api.preload import CheckPreload, CompilerPreload, cmake_quote
+
+from .configure_log import FIRST_RUN, SECOND_RUN
+
+THIRD_RUN = """
+---
+events:
+  -
+    kind: "try_compile-v1"
+    checks:
+      - "Looking for foo.h"
+    directories:
+      source: "/build/CMakeFiles/CMakeScratch/TryCompile-dddddd"
+      binary: "/build/CMakeFiles/CMakeScratch/TryCompile-dddddd"
+    buildResult:
+      variable: "HAVE_FOO_H"
+      cached: true
+      exitCode: 0
+...
+"""
+
+# check_type_size reads the size out of the binary built by try_compile(HAVE_SIZEOF_INT)
+TYPE_SIZE_RUN = """
+---
+events:
+  -
+    kind: "try_compile-v1"
+    checks:
+      - "Looking for stdint.h"
+    directories:
+      source: "/build/CMakeFiles/CMakeScratch/TryCompile-eeeeee"
+      binary: "/build/CMakeFiles/CMakeScratch/TryCompile-eeeeee"
+    buildResult:
+      variable: "HAVE_STDINT_H"
+      cached: true
+      exitCode: 0
+  -
+    kind: "try_compile-v1"
+    checks:
+      - "Check size of int"
+    directories:
+      source: "/build/CMakeFiles/CMakeScratch/TryCompile-ffffff"
+      binary: "/build/CMakeFiles/CMakeScratch/TryCompile-ffffff"
+    buildResult:
+      variable: "HAVE_SIZEOF_INT"
+      cached: true
+      exitCode: 0
+  -
+    kind: "try_compile-v1"
+    directories:
+      source: "/build/CMakeFiles/CMakeScratch/TryCompile-gggggg"
+      binary: "/build/CMakeFiles/CMakeScratch/TryCompile-gggggg"
+    buildResult:
+      variable: "PROJECT_TRY_COMPILE"
+      cached: true
+      exitCode: 0
+...
+"""
+
+
+# check_compiler_flag: the build succeeds, the warning about the flag matches a FAIL_REGEX and the check fails
+FLAG_RUN = """
+---
+events:
+  -
+    kind: "try_compile-v1"
+    backtrace:
+      - "/usr/share/cmake/Modules/Internal/CheckSourceCompiles.cmake:101 (try_compile)"
+      - "CMakeLists.txt:8 (check_compiler_flag)"
+    checks:
+      - "Performing Test HAVE_FLAG_BOGUS"
+    directories:
+      source: "/build/CMakeFiles/CMakeScratch/TryCompile-hhhhhh"
+      binary: "/build/CMakeFiles/CMakeScratch/TryCompile-hhhhhh"
+    buildResult:
+      variable: "HAVE_FLAG_BOGUS"
+      cached: true
+      stdout: |
+        warning: unknown warning option '-Wbogus' [-Wunknown-warning-option]
+      exitCode: 0
+...
+"""
+
+
+@pytest.fixture
+def configure_log(tmp_path):
+    pytest.importorskip("yaml")
+    path = tmp_path / "CMakeConfigureLog.yaml"
+    path.write_text(FIRST_RUN + SECOND_RUN)
+    return ConfigureLogV1(VersionMajorMinor(1, 0), path, ["try_compile-v1", "try_run-v1"])
+
+
+def test_check_preload(configure_log, tmp_path):
+    preload = CheckPreload.from_configure_log(configure_log, fingerprint="abc")
+    # Compiler detection is not a configure check, try_run results are stored in the checked variable
+    assert {name: result.value for name, result in preload.results.items()} == {"HAVE_FOO_H": "", "HAVE_WORKING_FOO": "1"}
+    assert preload.script() == (
+        "# Configure check results, preloaded with cmake -C\n"
+        "# Toolchain fingerprint: abc\n"
+        "set(HAVE_FOO_H \"\" CACHE INTERNAL \"Looking for foo.h\")\n"
+        "set(HAVE_WORKING_FOO \"1\" CACHE INTERNAL \"Performing Test HAVE_WORKING_FOO\")\n"
+    )
+
+    # The latest result of a check wins
+    with configure_log.path.open("a") as fp:
+        fp.write(THIRD_RUN)
+    preload = CheckPreload.from_configure_log(configure_log)
+    assert [(result.variable, result.value, result.run) for result in preload.results.values()] == \
+        [("HAVE_WORKING_FOO", "1", 1), ("HAVE_FOO_H", "1", 2)]
+
+
+def test_check_preload_skips_checks_reading_the_binary(configure_log):
+    configure_log.path.write_text(TYPE_SIZE_RUN)
+    preload = CheckPreload.from_configure_log(configure_log)
+    # Preloading HAVE_SIZEOF_INT would leave SIZEOF_INT unset, a plain try_compile is not a known check either
+    assert list(preload.results) == ["HAVE_STDINT_H"]
+    assert "SIZEOF" not in preload.script()
+
+
+def test_check_preload_fail_regex(configure_log, tmp_path):
+    configure_log.path.write_text(FIRST_RUN + FLAG_RUN)
+    # The exit code does not tell whether the flag is supported
+    preload = CheckPreload.from_configure_log(configure_log)
+    assert list(preload.results) == ["HAVE_FOO_H"]
+
+    # The build tree's cache does
+    cache = CMakeCacheFile.from_text(tmp_path / "CMakeCache.txt", "HAVE_FOO_H:INTERNAL=\nHAVE_FLAG_BOGUS:INTERNAL=\n")
+    preload = CheckPreload.from_configure_log(configure_log, cache=cache)
+    assert {name: result.value for name, result in preload.results.items()} == {"HAVE_FOO_H": "", "HAVE_FLAG_BOGUS": ""}
+
+    # Checks removed from the cache run again
+    cache = CMakeCacheFile.from_text(tmp_path / "CMakeCache.txt", "HAVE_FLAG_BOGUS:INTERNAL=\n")
+    assert list(CheckPreload.from_configure_log(configure_log, cache=cache).results) == ["HAVE_FLAG_BOGUS"]
+
+
+def test_cmake_quote():
+    assert cmake_quote("a \"b\" ${c}\\d") == "\"a \\\"b\\\" \\${c}\\\\d\""
+
+
+def toolchains(version="12.2.0", minor=0, reverse=False):
+    languages = [
+        {"language": "C", "compiler": {"id": "GNU", "path": "/usr/bin/cc", "version": version,
+                                       "implicit": {"includeDirectories": ["/usr/include"], "linkLibraries": ["gcc", "c"]}},
+         "sourceFileExtensions": ["c"]},
+        {"language": "CXX", "compiler": {"id": "GNU", "path": "/usr/bin/c++", "version": version, "target": "x86_64-linux-gnu"}},
+    ]
+    return ToolchainsV1.from_dict({"kind": "toolchains", "version": {"major": 1, "minor": minor},
+                                   "toolchains": languages[::-1] if reverse else languages}, Path())
+
+
+def test_toolchains_fingerprint():
+    fingerprint = toolchains().fingerprint()
+    assert toolchains(minor=1, reverse=True).fingerprint() == fingerprint
+    assert toolchains(version="13.1.0").fingerprint() != fingerprint
+    assert toolchains().get_toolchain("C").compiler.implicit.linkLibraries == ["gcc", "c"]
+    assert toolchains().get_toolchain("C").compiler.implicit.linkFrameworkDirectories == []
+
+
+def test_compiler_preload():
+    preload = CompilerPreload(toolchains())
+    assert preload.script() == (
+        "# Compiler detection results, preloaded with cmake -C\n"
+        f"# Toolchain fingerprint: {preload.fingerprint}\n"
+        "# C: GNU 12.2.0\n"
+        "set(CMAKE_C_COMPILER \"/usr/bin/cc\" CACHE FILEPATH \"C compiler\")\n"
+        "# CXX: GNU 12.2.0\n"
+        "set(CMAKE_CXX_COMPILER \"/usr/bin/c++\" CACHE FILEPATH \"CXX compiler\")\n"
+        "set(CMAKE_CXX_COMPILER_TARGET \"x86_64-linux-gnu\" CACHE STRING \"CXX compiler target\")\n"
+    )
+
+
+C_COMPILER_FILE = """set(CMAKE_C_COMPILER "/usr/bin/cc")
+set(CMAKE_C_COMPILER_ID "GNU")
+set(CMAKE_C_COMPILE_FEATURES "c_std_90;c_function_prototypes")
+set(CMAKE_AR "/usr/bin/ar")
+set(CMAKE_C_SOURCE_FILE_EXTENSIONS c;m)
+set(CMAKE_C_SIZEOF_DATA_PTR "8")
+set(CMAKE_C_COMPILER_WRAPPER "a \\"quoted\\" value")
+
+if(CMAKE_C_SIZEOF_DATA_PTR)
+  set(CMAKE_SIZEOF_VOID_P "${CMAKE_C_SIZEOF_DATA_PTR}")
+endif()
+"""
+
+
+def test_compiler_preload_from_build_tree(tmp_path):
+    platform_path = tmp_path / "CMakeFiles" / "3.26.0"
+    platform_path.mkdir(parents=True)
+    (platform_path / "CMakeCCompiler.cmake").write_text(C_COMPILER_FILE)
+    (platform_path / "CMakeCXXCompiler.cmake").write_text("set(CMAKE_CXX_COMPILER \"/usr/bin/c++\")\nset(CMAKE_AR \"/usr/bin/ar\")\n")
+    preload = CompilerPreload.from_build_tree(toolchains(), tmp_path, "3.26.0")
+    assert preload.compilers["C"]["CMAKE_C_COMPILER_WRAPPER"] == "a \"quoted\" value"
+    assert "CMAKE_SIZEOF_VOID_P" not in preload.compilers["C"]
+
+    # The compilers are forced, with all detection results preloaded
+    lines = preload.script().splitlines()
+    assert "set(CMAKE_C_COMPILER_FORCED \"TRUE\" CACHE INTERNAL \"C compiler is known to work\")" in lines
+    assert "set(CMAKE_C_COMPILE_FEATURES \"c_std_90;c_function_prototypes\" CACHE INTERNAL \"C compiler detection\")" in lines
+    assert "set(CMAKE_C_COMPILER_WRAPPER \"a \\\"quoted\\\" value\" CACHE INTERNAL \"C compiler detection\")" in lines
+    assert lines.count("set(CMAKE_AR \"/usr/bin/ar\" CACHE FILEPATH \"CMAKE_AR\")") == 1
+    assert sum(line.startswith("set(CMAKE_C_COMPILER ") for line in lines) == 1
+
+    (platform_path / "CMakeCCompiler.cmake").write_text("set(CMAKE_C_COMPILER \"/usr/bin/gcc-13\")\n")
+    with pytest.raises(ValueError):
+        CompilerPreload.from_build_tree(toolchains(), tmp_path, "3.26.0")
@@ -1,5 +1,7 @@
+import asyncio
 import collections
 import functools
+import os
 import re
 import subprocess
 import textwrap
@@ -202,3 +204,111 @@ def test_toolchain_kind_cxx(complex_cxx_project, capsys):
     assert isinstance(kind_obj.version, VersionMajorMinor)
     assert kind_obj.version.major == 1
     assert "CXX" in tuple(toolchain.language for toolchain in kind_obj.toolchains)
+
+
+def test_async_configure_and_inspect(simple_cxx_project):
+    project = CMakeProject(simple_cxx_project.build, simple_cxx_project.source, api_version=1)
+    project.cmake_file_api.instrument(ObjectKind.CODEMODEL, 2)
+
+    async def configure_and_inspect():
+        lines = []
+        await project.configure_async(on_stdout=lines.append)
+        data = await project.cmake_file_api.inspect_async(ObjectKind.CODEMODEL, 2)
+        all_data = await project.cmake_file_api.inspect_all_async()
+        return lines, data, all_data
+
+    lines, data, all_data = asyncio.run(configure_and_inspect())
+    assert any("Build files have been written to" in line for line in lines)
+    assert isinstance(data, CODEMODEL_API[2])
+    assert ObjectKind.CODEMODEL in all_data
+
+
+def test_async_configure_failure(build_tree):
+    (build_tree.source / "CMakeLists.txt").write_text("message(FATAL_ERROR \"broken project\")\n")
+    project = CMakeProject(build_tree.build, build_tree.source, api_version=1)
+    errors = []
+    with pytest.raises(subprocess.CalledProcessError):
+        asyncio.run(project.configure_async(quiet=True, on_stderr=errors.append))
+    assert any("broken project" in line for line in errors)
+
+
+def test_check_preload_skips_checks(build_tree):
+    from cmake_file_api.cmake_cache import CMakeCacheFile
+    from cmake_file_api.preload import CheckPreload, CheckResult
+
+    (build_tree.source / "CMakeLists.txt").write_text(textwrap.dedent("""\
+        cmake_minimum_required(VERSION 3.5)
+        project(demoproject C)
+        include(CheckIncludeFile)
+        check_include_file(stdio.h HAVE_STDIO_H)
+        """))
+    # A (wrong) preloaded result is used as is: the check does not run
+    preload = CheckPreload({"HAVE_STDIO_H": CheckResult("HAVE_STDIO_H", "", "try_compile-v1", ["Looking for stdio.h"], 0)})
+    preload.write(build_tree.build / "preload.cmake")
+    project = CMakeProject(build_tree.build, build_tree.source, api_version=1)
+    project.configure(["-C", str(build_tree.build / "preload.cmake")], quiet=True)
+    assert CMakeCacheFile.from_path(build_tree.build / "CMakeCache.txt").entries["HAVE_STDIO_H"].value == ""
+
+
+@pytest.mark.skipif(not CMAKE_SUPPORTS_TOOLCHAINS_V1, reason="CMake does not support toolchains V1 kind")
+def test_compiler_preload_skips_compiler_checks(build_tree, tmp_path):
+    from cmake_file_api.cmake_cache import CMakeCacheFile
+    from cmake_file_api.preload import CompilerPreload
+
+    (build_tree.source / "CMakeLists.txt").write_text(textwrap.dedent("""\
+        cmake_minimum_required(VERSION 3.5)
+        project(demoproject C CXX)
+        include(GNUInstallDirs)
+        add_library(demo STATIC demo.cpp)
+        target_compile_features(demo PUBLIC cxx_std_11)
+        message(STATUS "SIZEOF_VOID_P=${CMAKE_SIZEOF_VOID_P} LIBDIR=${CMAKE_INSTALL_LIBDIR}")
+        """))
+    (build_tree.source / "demo.cpp").write_text("int demo() { return 0; }\n")
+    project = CMakeProject(build_tree.build, build_tree.source, api_version=1)
+    project.cmake_file_api.instrument(ObjectKind.TOOLCHAINS, 1)
+    project.configure(quiet=True)
+    toolchains = project.cmake_file_api.inspect(ObjectKind.TOOLCHAINS, 1)
+    cmake_version = project.cmake_file_api.index().cmake.version.string
+
+    def configure(preload, build_path):
+        preload.write(tmp_path / "compilers.cmake")
+        return subprocess.check_output(["cmake", "-C", str(tmp_path / "compilers.cmake"), "-S", str(build_tree.source),
+                                        "-B", str(build_path)]).decode()
+
+    # Only the compilers of the toolchains reply: detection still runs
+    output = configure(CompilerPreload(toolchains), tmp_path / "selected")
+    assert "Detecting C compiler ABI info" in output
+    entries = CMakeCacheFile.from_path(tmp_path / "selected" / "CMakeCache.txt").entries
+    assert entries["CMAKE_C_COMPILER"].value == str(toolchains.get_toolchain("C").compiler.path)
+
+    # All detection results of the first build tree: detection is skipped, with the same results
+    preload = CompilerPreload.from_build_tree(toolchains, build_tree.build, cmake_version)
+    output = configure(preload, tmp_path / "detected")
+    assert "Detecting C compiler ABI info" not in output and "Detecting CXX compile features" not in output
+    first = subprocess.check_output(["cmake", str(build_tree.build)]).decode()
+    assert [line for line in output.splitlines() if "SIZEOF_VOID_P" in line] == \
+        [line for line in first.splitlines() if "SIZEOF_VOID_P" in line]
+    assert "SIZEOF_VOID_P= " not in output
+
+    # The preloaded build tree uses the same toolchain
+    preloaded = CMakeProject(tmp_path / "detected", api_version=1)
+    preloaded.cmake_file_api.instrument(ObjectKind.TOOLCHAINS, 1)
+    preloaded.reconfigure(quiet=True)
+    assert preloaded.cmake_file_api.inspect(ObjectKind.TOOLCHAINS, 1).fingerprint() == preload.fingerprint
+
+
+def test_needs_reconfigure(simple_cxx_project):
+    project = CMakeProject(simple_cxx_project.build, simple_cxx_project.source, api_version=1)
+    assert project.cmake_file_api.needs_reconfigure()
+    project.cmake_file_api.instrument(ObjectKind.CMAKEFILES, 1)
+    project.configure(quiet=True)
+    assert not project.cmake_file_api.needs_reconfigure()
+
+    cmakelists = simple_cxx_project.source / "CMakeLists.txt"
+    index_mtime = project.cmake_file_api.find_index_path().stat().st_mtime_ns
+    os.utime(cmakelists, ns=(index_mtime + 1_000_000_000, index_mtime + 1_000_000_000))
+    assert project.cmake_file_api.needs_reconfigure()
+    # Back to before the (next) configure
+    os.utime(cmakelists, ns=(index_mtime, index_mtime))
+    project.reconfigure(quiet=True)
+    assert not project.cmake_file_api.needs_reconfigure()
@@ -0,0 +1,65 @@
+import os
+
+from cmake_file_api.kinds.codemodel.v2 import CodemodelV2
+from cmake_file_api.kinds.kind import ObjectKind
+from cmake_file_api.reply.v1.api import CMakeFileApiV1
+
+from .synthetic import write_reply
+
+
+def reply_path(build_path):
+    return build_path / ".cmake" / "api" / "v1" / "reply"
+
+
+def test_session_memoizes_kinds(tmp_path):
+    write_reply(reply_path(tmp_path), 20)
+    session = CMakeFileApiV1(tmp_path).session()
+
+    index = session.index()
+    codemodel = session.inspect(ObjectKind.CODEMODEL, 2)
+    assert isinstance(codemodel, CodemodelV2)
+    assert session.index() is index
+    assert session.inspect(ObjectKind.CODEMODEL, 2) is codemodel
+    assert session.inspect_all() == {ObjectKind.CODEMODEL: {2: codemodel}}
+    assert session.inspect(ObjectKind.CODEMODEL, 2, lazy=True) is not codemodel
+    assert not session.is_stale()
+
+
+def test_session_revalidates_on_new_index(tmp_path):
+    old_index = write_reply(reply_path(tmp_path), 20, salt="a")
+    session = CMakeFileApiV1(tmp_path).session()
+    codemodel = session.inspect(ObjectKind.CODEMODEL, 2)
+
+    # CMake writes a new index file with a larger name, then removes the old one
+    write_reply(reply_path(tmp_path), 30, salt="b")
+    old_index.unlink()
+    assert session.is_stale()
+    new_codemodel = session.inspect(ObjectKind.CODEMODEL, 2)
+    assert new_codemodel is not codemodel
+    assert len(new_codemodel.configurations[0].targets) == 30
+
+
+def test_session_revalidates_rewritten_index(tmp_path):
+    index_path = write_reply(reply_path(tmp_path), 5)
+    session = CMakeFileApiV1(tmp_path).session()
+    index = session.index()
+    stat = index_path.stat()
+    os.utime(index_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert session.index() is not index
+
+
+def test_find_index_path_picks_newest(tmp_path):
+    write_reply(reply_path(tmp_path), 5, salt="a")
+    newest = write_reply(reply_path(tmp_path), 6, salt="b")
+    assert CMakeFileApiV1(tmp_path).find_index_path() == newest
+
+
+def test_session_reloads_codemodel_incrementally(tmp_path):
+    old_index = write_reply(reply_path(tmp_path), 20, salt="a", changed=set())
+    session = CMakeFileApiV1(tmp_path).session()
+    old_targets = [t.target for t in session.inspect(ObjectKind.CODEMODEL, 2).configurations[0].targets]
+
+    write_reply(reply_path(tmp_path), 20, salt="b", changed={3})
+    old_index.unlink()
+    new_targets = [t.target for t in session.inspect(ObjectKind.CODEMODEL, 2).configurations[0].targets]
+    assert [new is old for new, old in zip(new_targets, old_targets)] == [i != 3 for i in range(20)]
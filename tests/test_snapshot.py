@@ -0,0 +1,87 @@
+import os
+import pickle
+
+import pytest
+
+from cmake_file_api.kinds.kind import ObjectKind
+from cmake_file_api.reply.v1.api import CMakeFileApiV1
+from cmake_file_api.reply.v1.snapshot import ReplySnapshot, ReplySnapshotCache
+
+from .synthetic import target_name, write_reply
+
+
+def reply_path(build_path):
+    return build_path / ".cmake" / "api" / "v1" / "reply"
+
+
+def test_snapshot_cache_roundtrip(tmp_path):
+    build = tmp_path / "build"
+    write_reply(reply_path(build), 500)
+    cache = ReplySnapshotCache(tmp_path / "cache")
+    api = CMakeFileApiV1(build)
+
+    first = api.inspect_all(cache=cache)
+    assert len(list(cache.cache_path.iterdir())) == 1
+
+    # An unchanged reply directory is served from the snapshot, without reading any target file
+    for path in reply_path(build).glob("target-*.json"):
+        path.unlink()
+    second = api.inspect_all(cache=cache)
+    targets = second[ObjectKind.CODEMODEL][2].configurations[0].targets
+    assert [t.name for t in targets] == [t.name for t in first[ObjectKind.CODEMODEL][2].configurations[0].targets]
+    assert targets[-1].target.dependencies[-1].target.name == target_name(498)
+
+
+def test_snapshot_cache_invalidation(tmp_path):
+    build = tmp_path / "build"
+    index_path = write_reply(reply_path(build), 10)
+    cache = ReplySnapshotCache(tmp_path / "cache")
+    api = CMakeFileApiV1(build)
+    api.snapshot(cache)
+    old_snapshot = next(cache.cache_path.iterdir())
+
+    # CMake regenerated the reply: the old snapshot is dropped
+    stat = index_path.stat()
+    os.utime(index_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert cache.load(index_path) is None
+    api.snapshot(cache)
+    assert not old_snapshot.exists()
+    assert len(list(cache.cache_path.iterdir())) == 1
+
+
+def test_snapshot_cache_eviction(tmp_path):
+    cache = ReplySnapshotCache(tmp_path / "cache", max_snapshots=2)
+    for i in range(4):
+        build = tmp_path / f"build{i}"
+        write_reply(reply_path(build), 3)
+        CMakeFileApiV1(build).snapshot(cache)
+    snapshots = list(cache.cache_path.iterdir())
+    assert len(snapshots) == 2
+    assert cache.load(next(reply_path(tmp_path / "build3").glob("index-*.json"))) is not None
+
+
+class Incompatible:
+    def __init__(self, *reduced):
+        self.reduced = reduced
+
+    def __reduce__(self):
+        return self.reduced
+
+
+@pytest.mark.parametrize("content", [
+    b"",
+    b"not a pickle",
+    # Renamed enum values and changed constructor signatures of an older version of this package
+    pickle.dumps(Incompatible(ObjectKind, ("codemodel-v1",))),
+    pickle.dumps(Incompatible(ReplySnapshot, ())),
+], ids=["empty", "garbage", "enum", "signature"])
+def test_snapshot_cache_incompatible(tmp_path, content):
+    build = tmp_path / "build"
+    index_path = write_reply(reply_path(build), 3)
+    cache = ReplySnapshotCache(tmp_path / "cache")
+    CMakeFileApiV1(build).snapshot(cache)
+    snapshot_path = next(cache.cache_path.iterdir())
+    snapshot_path.write_bytes(content)
+
+    assert cache.load(index_path) is None
+    assert not snapshot_path.exists()
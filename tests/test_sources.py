@@ -0,0 +1,50 @@
+from pathlib import Path
+
+import pytest
+
+from cmake_file_api.kinds.codemodel.v2 import CodemodelV2
+
+from .synthetic import target_name, write_reply
+
+
+def load_codemodel(reply_path, n_targets, n_directories=16):
+    write_reply(reply_path, n_targets, n_directories=n_directories)
+    return CodemodelV2.from_path(next(reply_path.glob("codemodel-v2-*.json")), reply_path)
+
+
+def test_source_index_owners(tmp_path):
+    codemodel = load_codemodel(tmp_path, 100)
+    index = codemodel.get_source_index("Release")
+    assert index is codemodel.get_source_index("Release")
+    assert len(index) == 200
+
+    # Relative paths are resolved against the top level source directory
+    owners = index.get_owners("dir3/t3.cpp")
+    assert [owner.target.name for owner in owners] == [target_name(3)]
+    assert owners[0].compileGroup is owners[0].target.target.compileGroups[0]
+    assert index.get_owners(Path("/src/dir3/../dir3/t3.cpp")) == owners
+    assert index.get_owners("/src/dir3/t3.hpp")[0].compileGroup is None
+    assert "/src/dir3/t3.cpp" in index
+    assert "/src/dir3/t4.cpp" not in index
+    with pytest.raises(KeyError):
+        index.get_owners("dir3/t4.cpp")
+
+    found = index.find_owners(["dir3/t3.cpp", "/src/dir5/t5.hpp", "/elsewhere/main.cpp"])
+    assert sorted(found) == ["/src/dir3/t3.cpp", "/src/dir5/t5.hpp"]
+
+    with pytest.raises(KeyError):
+        codemodel.get_source_index("Debug")
+
+
+def test_source_index_prefix_queries(tmp_path):
+    codemodel = load_codemodel(tmp_path, 100)
+    index = codemodel.get_source_index("Release")
+
+    targets = index.get_targets_under("dir3/")
+    assert [t.name for t in targets] == [target_name(i) for i in (19, 3, 35, 51, 67, 83, 99)]
+    assert len(index.get_owners_under("/src/dir3")) == 14
+    # Components are matched whole: dir3 is not a prefix of dir30
+    assert index.get_owners_under("/src/dir") == []
+    assert index.get_owners_under("/nowhere") == []
+    assert len(index.get_targets_under("/src")) == 100
+    assert len(index.get_owners_under("/")) == 200
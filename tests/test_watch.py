@@ -0,0 +1,67 @@
+import json
+import sys
+import threading
+
+import pytest
+
+from cmake_file_api.kinds.kind import ObjectKind
+from cmake_file_api.reply.v1 import api as api_module
+from cmake_file_api.reply.v1.api import CMakeFileApiV1
+from cmake_file_api.reply.v1.watch import InotifyReplyDirectoryWatcher, PollingReplyDirectoryWatcher
+
+from .synthetic import target_json_file, write_reply
+
+
+WATCHERS = [
+    pytest.param(lambda path, poll_interval: PollingReplyDirectoryWatcher(path, poll_interval=0.05), id="polling"),
+    pytest.param(lambda path, poll_interval: InotifyReplyDirectoryWatcher(path), id="inotify",
+                 marks=pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux only")),
+]
+
+
+@pytest.mark.parametrize("create_watcher", WATCHERS)
+def test_watch_yields_new_replies(tmp_path, monkeypatch, create_watcher):
+    monkeypatch.setattr(api_module, "create_reply_directory_watcher", create_watcher)
+    reply_path = tmp_path / ".cmake" / "api" / "v1" / "reply"
+    old_index = write_reply(reply_path, 5, salt="a")
+
+    def regenerate():
+        write_reply(reply_path, 8, salt="b")
+        old_index.unlink()
+
+    target_counts = []
+    for result in CMakeFileApiV1(tmp_path).watch(timeout=1, debounce=0.1):
+        target_counts.append(len(result[ObjectKind.CODEMODEL][2].configurations[0].targets))
+        if len(target_counts) == 1:
+            threading.Timer(0.1, regenerate).start()
+    assert target_counts == [5, 8]
+
+
+def test_watch_waits_for_first_reply(tmp_path):
+    reply_path = tmp_path / ".cmake" / "api" / "v1" / "reply"
+    threading.Timer(0.2, lambda: write_reply(reply_path, 3)).start()
+    results = list(CMakeFileApiV1(tmp_path).watch(timeout=1, debounce=0.1, poll_interval=0.05))
+    assert len(results) == 1
+
+
+def test_watch_retries_half_written_replies(tmp_path):
+    reply_path = tmp_path / ".cmake" / "api" / "v1" / "reply"
+    write_reply(reply_path, 3)
+    target_path = reply_path / target_json_file(1)
+    content = target_path.read_text()
+    target_path.write_text(content[:len(content) // 2])
+    threading.Timer(0.3, lambda: target_path.write_text(content)).start()
+    results = list(CMakeFileApiV1(tmp_path).watch(timeout=1, debounce=0.1, poll_interval=0.05))
+    assert len(results) == 1
+    assert len(results[0][ObjectKind.CODEMODEL][2].configurations[0].targets) == 3
+
+
+def test_watch_raises_on_invalid_replies(tmp_path):
+    reply_path = tmp_path / ".cmake" / "api" / "v1" / "reply"
+    write_reply(reply_path, 3)
+    target_path = reply_path / target_json_file(1)
+    target = json.loads(target_path.read_text())
+    del target["name"]
+    target_path.write_text(json.dumps(target))
+    with pytest.raises(KeyError):
+        next(CMakeFileApiV1(tmp_path).watch(timeout=1, debounce=0.1, poll_interval=0.05))